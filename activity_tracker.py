@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+متتبع نشاط المستخدمين
+عدادات لكل (خادم، مستخدم): الرسائل والأوامر والألعاب والانتصارات
+التسجيل لا ينتظر شيئاً، والزيادات تُجمع وتُكتب في الخلفية إلى SQLite
+"""
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from persistence import WriteBehind
+from storage import DATABASE_FILE, connect_database
+
+# مهلة تجميع الزيادات قبل الكتابة (بالثواني)
+FLUSH_DELAY = 5.0
+
+# أقصى عدد مستخدمين تُحفظ مجاميعهم في الذاكرة
+CACHE_SIZE = 10000
+
+# أقصى عدد مستخدمين بزيادات معلقة قبل طلب الكتابة فوراً
+MAX_PENDING = 5000
+
+# ترتيب العدادات داخل كل سجل
+MESSAGES, COMMANDS, GAMES, WINS = range(4)
+
+ActivityStats = namedtuple('ActivityStats', 'messages commands games wins')
+
+_ZERO = (0, 0, 0, 0)
+
+
+class SqliteActivityBackend:
+    """جدول النشاط: الكتابة تضيف الزيادات إلى القيم المخزنة فتعمل مع عدة عمليات"""
+
+    def __init__(self, path=DATABASE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        # الاتصال يُفتح عند أول قراءة أو كتابة (في خيط الخلفية) لا عند التشغيل
+        self._conn = None
+
+    def _connection(self):
+        """الاتصال المفتوح، أو فتحه وإنشاء الجدول عند أول استخدام (داخل القفل)"""
+        if self._conn is None:
+            conn = connect_database(self.path)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS user_activity ('
+                ' guild_id TEXT NOT NULL,'
+                ' user_id TEXT NOT NULL,'
+                ' messages INTEGER NOT NULL DEFAULT 0,'
+                ' commands INTEGER NOT NULL DEFAULT 0,'
+                ' games INTEGER NOT NULL DEFAULT 0,'
+                ' wins INTEGER NOT NULL DEFAULT 0,'
+                ' PRIMARY KEY (guild_id, user_id)'
+                ') WITHOUT ROWID'
+            )
+            self._conn = conn
+        return self._conn
+
+    def load(self, guild_id, user_id):
+        """المجاميع المخزنة لمستخدم واحد"""
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT messages, commands, games, wins FROM user_activity'
+                ' WHERE guild_id = ? AND user_id = ?',
+                (guild_id, user_id)
+            ).fetchone()
+        return row or _ZERO
+
+    def write(self, rows):
+        """إضافة الزيادات في معاملة واحدة (تعمل في خيط منفصل)"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(
+                    'INSERT INTO user_activity (guild_id, user_id, messages, commands, games, wins)'
+                    ' VALUES (?, ?, ?, ?, ?, ?)'
+                    ' ON CONFLICT (guild_id, user_id) DO UPDATE SET'
+                    ' messages = messages + excluded.messages,'
+                    ' commands = commands + excluded.commands,'
+                    ' games = games + excluded.games,'
+                    ' wins = wins + excluded.wins',
+                    rows
+                )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class ActivityTracker:
+    """عدادات النشاط مع ذاكرة LRU محدودة للمجاميع وزيادات معلقة للكتابة"""
+
+    def __init__(self, backend=None, cache_size=CACHE_SIZE, flush_delay=FLUSH_DELAY):
+        self.backend = backend or SqliteActivityBackend(os.getenv('STORAGE_DB', DATABASE_FILE))
+        self.cache_size = cache_size
+        self.writer = WriteBehind(self._snapshot, self.backend.write, flush_delay, self._written)
+        # {(guild_id, user_id): [messages, commands, games, wins]} مجاميع آخر المستخدمين نشاطاً
+        self._totals = OrderedDict()
+        # {(guild_id, user_id): [...]} زيادات لم تُكتب بعد
+        self._pending = {}
+        self._flush_task = None
+
+    def _bump(self, guild_id, user_id, index, amount=1):
+        """زيادة عداد دون أي انتظار أو قراءة من التخزين"""
+        key = (str(guild_id), str(user_id))
+        delta = self._pending.get(key)
+        if delta is None:
+            delta = self._pending[key] = [0, 0, 0, 0]
+            if len(self._pending) >= MAX_PENDING:
+                self._flush_now()
+        delta[index] += amount
+        totals = self._totals.get(key)
+        if totals is not None:
+            totals[index] += amount
+            self._totals.move_to_end(key)
+        self.writer.mark_dirty(key)
+
+    def _flush_now(self):
+        """كتابة مبكرة في مهمة منفصلة عند تراكم الزيادات"""
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self.writer.flush())
+            except RuntimeError:
+                pass
+
+    def record_message(self, guild_id, user_id):
+        self._bump(guild_id, user_id, MESSAGES)
+
+    def record_command(self, guild_id, user_id):
+        self._bump(guild_id, user_id, COMMANDS)
+
+    def record_game(self, guild_id, user_id, won):
+        """تسجيل نتيجة لعبة"""
+        self._bump(guild_id, user_id, GAMES)
+        if won:
+            self._bump(guild_id, user_id, WINS)
+
+    def _snapshot(self, dirty):
+        """الزيادات الحالية للمفاتيح المتغيرة (تبقى معلقة حتى تنجح الكتابة)"""
+        return [
+            (guild_id, user_id, *self._pending[(guild_id, user_id)])
+            for guild_id, user_id in dirty
+            if (guild_id, user_id) in self._pending
+        ]
+
+    def _written(self, rows):
+        """طرح الزيادات المكتوبة، وما أضيف أثناء الكتابة يبقى للمرة القادمة"""
+        for guild_id, user_id, *written in rows:
+            key = (guild_id, user_id)
+            delta = self._pending.get(key)
+            if delta is None:
+                continue
+            for index, amount in enumerate(written):
+                delta[index] -= amount
+            if not any(delta):
+                del self._pending[key]
+
+    async def get_stats(self, guild_id, user_id):
+        """إحصائيات مستخدم: من الذاكرة مباشرة، أو قراءة واحدة من التخزين"""
+        key = (str(guild_id), str(user_id))
+        totals = self._totals.get(key)
+        if totals is None:
+            stored = await self.writer.read(self.backend.load, *key)
+            # لا كتابة جارية أثناء القراءة، فالزيادات المعلقة غير موجودة في المخزن
+            pending = self._pending.get(key, _ZERO)
+            totals = self._totals[key] = [s + p for s, p in zip(stored, pending)]
+            if len(self._totals) > self.cache_size:
+                self._totals.popitem(last=False)
+        else:
+            self._totals.move_to_end(key)
+        return ActivityStats(*totals)
+
+    async def close(self):
+        """كتابة ما تبقى وإغلاق التخزين"""
+        await self.writer.close()
+        self.backend.close()
+
+
+def get_activity_tracker(bot):
+    """إرجاع متتبع النشاط المشترك للبوت، وإنشاؤه عند أول استخدام"""
+    tracker = getattr(bot, 'activity_tracker', None)
+    if tracker is None:
+        tracker = ActivityTracker(cache_size=int(os.getenv('ACTIVITY_CACHE_SIZE', CACHE_SIZE)))
+        bot.activity_tracker = tracker
+    return tracker
@@ -5,15 +5,184 @@ import discord
 from discord.ext import commands
 import random
 import asyncio
+import time
+from collections import namedtuple
 from datetime import datetime
-from responses import ArabicResponses, get_random_emoji
+from responses import ArabicResponses
+from response_engine import (
+    get_response_engine, PACK_TIME, PACK_INTERACTIVE, PACK_EMOTIONS, PACK_EMOJIS, PACK_QUESTIONS, PACK_PRAYERS
+)
+from arabic_text import normalize_arabic, normalize_keywords, get_normalized_content
+from keyword_matcher import KeywordMatcher
+from channel_store import get_channel_store
+from embed_templates import EmbedTemplate, register_template
+from game_sessions import get_game_router
+from game_content import get_game_content
+from activity_tracker import get_activity_tracker
+from leaderboard import get_leaderboard
+
+# كلمات المشاعر بترتيب الأولوية، تُطبّع مرة واحدة عند التحميل
+MOOD_KEYWORDS = {
+    'happy': ['سعيد', 'فرحان', 'مبسوط', 'رائع'],
+    'sad': ['حزين', 'زعلان', 'مكتئب', 'تعبان'],
+    'excited': ['متحمس', 'نشيط', 'حماسي', 'متفائل'],
+    'tired': ['متعب', 'مرهق', 'نعسان', 'كسلان']
+}
+
+MOOD_COLORS = {
+    'happy': 0x2ecc71,
+    'sad': 0x3498db,
+    'excited': 0xe67e22,
+    'tired': 0x95a5a6
+}
+
+mood_matcher = KeywordMatcher(normalize_keywords(MOOD_KEYWORDS))
+
+# نتيجة لعبة: الفوز وزمن الإجابة الصحيحة بالثواني (None إذا لم ينطبق)
+GameResult = namedtuple('GameResult', 'won response_time')
+
+# نسبة الحظ التي تُحتسب فوزاً في لعبة الحظ
+LUCKY_THRESHOLD = 90
+
+# ميداليات المراكز الأولى في لوحة الترتيب
+RANK_MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+# مهلة جولة المسابقة الجماعية (بالثواني)
+QUIZ_ROUND_TIMEOUT = 30
+
+
+class QuizRound:
+    """جولة مسابقة للقناة كلها: أول إجابة صحيحة تفوز، ولكل لاعب محاولة واحدة"""
+
+    def __init__(self, question):
+        self.question = question
+        # الخيارات ونصوصها بعد التطبيع تُحسب مرة واحدة، فكل رسالة تكلف بحثاً واحداً
+        self.choices = question.answers | {normalize_arabic(option) for option in question.options}
+        self.choices |= {str(number) for number in range(1, len(question.options) + 1)}
+        self.players = set()
+
+    def check(self, message):
+        """تسجيل محاولة اللاعب الأولى، ويرجع True إذا كانت صحيحة"""
+        if message.author.bot:
+            return False
+        answer = get_normalized_content(message)
+        if answer not in self.choices or message.author.id in self.players:
+            return False
+        self.players.add(message.author.id)
+        return answer in self.question.answers
+
+# جولات الكلمة واللغز: المهلة الكلية، والفاصل بين التلميحات، ومحاولات كل لاعب
+GUESS_ROUND_TIMEOUT = 60
+HINT_INTERVAL = 15
+GUESS_ATTEMPTS = 3
+
+# الرسالة الأطول من كلمات الإجابة بهذا العدد دردشة لا محاولة، إلا إذا كانت رداً على رسالة الجولة
+GUESS_EXTRA_WORDS = 1
+
+# علامات الترقيم التي تُتجاهل حول الإجابة
+ANSWER_PUNCTUATION = ' .!؟?،,'
+
+
+def _bare_answer(text):
+    """الإجابة الموحدة دون ترقيم أو مسافات زائدة أو "ال" التعريف"""
+    text = ' '.join(text.split()).strip(ANSWER_PUNCTUATION)
+    if text.startswith('ال') and len(text) > 3:
+        text = text[2:]
+    return text
+
+
+def hint_mask(answer, revealed):
+    """نمط الإجابة مع كشف عدد من حروفها بالتناوب من الطرفين، ولا تُكشف كلها أبداً
+
+    "ال" التعريف في أول الإجابة ظاهرة من البداية ولا تُحتسب تلميحاً
+    """
+    article = 2 if answer.startswith('ال') and len(answer) > 3 else 0
+    letters = [index for index, char in enumerate(answer) if index >= article and not char.isspace()]
+    order = []
+    while letters:
+        order.append(letters.pop(0))
+        if letters:
+            order.append(letters.pop())
+    shown = set(range(article)) | set(order[:min(revealed, len(order) - 1)])
+    return ' '.join(
+        char if index in shown or char.isspace() else '_'
+        for index, char in enumerate(answer)
+    )
+
+
+class GuessRound:
+    """جولة كلمة أو لغز للقناة كلها: أول إجابة صحيحة تفوز، ولكل لاعب عدد محدود من المحاولات"""
+
+    def __init__(self, item):
+        self.item = item
+        self.answers = {_bare_answer(answer) for answer in item.answers}
+        self.max_words = max((len(answer.split()) for answer in self.answers), default=1) + GUESS_EXTRA_WORDS
+        # معرّف رسالة الجولة، فالرد عليها يُحتسب محاولة مهما طال
+        self.message_id = None
+        # {user_id: عدد المحاولات} للاعبين الذين خمّنوا فعلاً
+        self.players = {}
+
+    def is_guess(self, message, text):
+        """هل تبدو الرسالة إجابة: قصيرة كالإجابة، أو رد على رسالة الجولة"""
+        if not text:
+            return False
+        if len(text.split()) <= self.max_words:
+            return True
+        reference = message.reference
+        return reference is not None and self.message_id is not None and reference.message_id == self.message_id
+
+    def check(self, message):
+        """احتساب محاولة اللاعب، ويرجع True إذا كانت صحيحة (الدردشة العادية لا تُحتسب)"""
+        if message.author.bot:
+            return False
+        text = _bare_answer(get_normalized_content(message))
+        if not self.is_guess(message, text):
+            return False
+        attempts = self.players.get(message.author.id, 0)
+        if attempts >= GUESS_ATTEMPTS:
+            return False
+        self.players[message.author.id] = attempts + 1
+        return text in self.answers
+
+GAMES_MENU_TEMPLATE = register_template('games_menu', EmbedTemplate(
+    title="🎮 الألعاب المتاحة",
+    description="""
+                `!لعبة تخمين` - لعبة تخمين الرقم
+                `!لعبة سؤال` - أسئلة عامة
+                `!لعبة مسابقة` - مسابقة للقناة كلها
+                `!لعبة كلمة` - خمّن الكلمة من وصفها
+                `!لعبة لغز` - ألغاز مع تلميحات متدرجة
+                `!لعبة حظ` - اختبار الحظ
+                `!ترتيب` - لوحة ترتيب اللاعبين
+                """,
+    color=0xf39c12
+))
 
 class AdvancedCommands(commands.Cog):
     """فئة الأوامر المتقدمة للبوت العربي"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.user_interactions = {}  # لتتبع تفاعلات المستخدمين
+        # تفاعلات المستخدمين: عدادات محدودة الذاكرة تُحفظ في الخلفية
+        self.activity = get_activity_tracker(bot)
+        self.leaderboard = get_leaderboard(bot)
+        self.router = get_game_router(bot)
+        self.content = get_game_content(bot)
+        self.responses = get_response_engine(bot)
+    
+    async def cog_load(self):
+        """بدء مراقبة ملفات الألعاب عند تحميل الإضافة: التحميل الأول يجري في الخلفية خارج الحلقة"""
+        self.content.start_watching()
+    
+    async def cog_unload(self):
+        """إيقاف مراقبة ملفات الألعاب"""
+        self.content.stop_watching()
+    
+    def _release_channel(self):
+        """تحرير القناة في طابور رسائل البوت إن وُجد، فالإجابات تصل للعبة عبر الموجّه"""
+        pipeline = getattr(self.bot, 'pipeline', None)
+        if pipeline is not None:
+            pipeline.release_channel()
     
     @commands.command(name='وقت', aliases=['الوقت', 'الساعة'])
     async def current_time(self, ctx):
@@ -23,7 +192,7 @@ class AdvancedCommands(commands.Cog):
         date_str = now.strftime("%Y-%m-%d")
         
         # تحية حسب الوقت
-        greeting = ArabicResponses.get_time_based_response()
+        greeting = self.responses.pick(PACK_TIME, ArabicResponses.time_period(now.hour), ctx.channel.id)
         
         embed = discord.Embed(
             title="🕐 الوقت الحالي",
@@ -38,8 +207,8 @@ class AdvancedCommands(commands.Cog):
     @commands.command(name='تحفيز', aliases=['حماس', 'دافع'])
     async def motivation(self, ctx):
         """إرسال رسالة تحفيزية"""
-        response = ArabicResponses.get_random_response('motivation')
-        emoji = get_random_emoji('success')
+        response = self.responses.pick(PACK_INTERACTIVE, 'motivation', ctx.channel.id)
+        emoji = self.responses.pick(PACK_EMOJIS, 'success', ctx.channel.id)
         
         embed = discord.Embed(
             title=f"💪 رسالة تحفيزية {emoji}",
@@ -53,8 +222,8 @@ class AdvancedCommands(commands.Cog):
     @commands.command(name='حكمة', aliases=['نصيحة', 'موعظة'])
     async def wisdom(self, ctx):
         """مشاركة حكمة أو نصيحة"""
-        response = ArabicResponses.get_random_response('wisdom')
-        emoji = get_random_emoji('wisdom')
+        response = self.responses.pick(PACK_INTERACTIVE, 'wisdom', ctx.channel.id)
+        emoji = self.responses.pick(PACK_EMOJIS, 'wisdom', ctx.channel.id)
         
         embed = discord.Embed(
             title=f"📚 حكمة اليوم {emoji}",
@@ -69,25 +238,15 @@ class AdvancedCommands(commands.Cog):
     async def mood_check(self, ctx, *, mood=None):
         """التحقق من المزاج والرد المناسب"""
         if not mood:
-            question = ArabicResponses.get_random_question()
+            question = self.responses.pick(PACK_QUESTIONS, 'general', ctx.channel.id)
             await ctx.send(f"{ctx.author.mention} {question}")
             return
         
-        mood = mood.lower()
-        
         # تحديد المشاعر حسب الكلمات
-        if any(word in mood for word in ['سعيد', 'فرحان', 'مبسوط', 'رائع']):
-            response = ArabicResponses.get_emotion_response('happy')
-            color = 0x2ecc71
-        elif any(word in mood for word in ['حزين', 'زعلان', 'مكتئب', 'تعبان']):
-            response = ArabicResponses.get_emotion_response('sad')
-            color = 0x3498db
-        elif any(word in mood for word in ['متحمس', 'نشيط', 'حماسي', 'متفائل']):
-            response = ArabicResponses.get_emotion_response('excited')
-            color = 0xe67e22
-        elif any(word in mood for word in ['متعب', 'مرهق', 'نعسان', 'كسلان']):
-            response = ArabicResponses.get_emotion_response('tired')
-            color = 0x95a5a6
+        emotion = mood_matcher.find_category(normalize_arabic(mood))
+        if emotion:
+            response = self.responses.pick(PACK_EMOTIONS, emotion, ctx.channel.id, "أفهم مشاعرك 💙")
+            color = MOOD_COLORS[emotion]
         else:
             response = "أفهم مشاعرك، وأتمنى لك يوماً أفضل 💙"
             color = 0x9b59b6
@@ -103,43 +262,151 @@ class AdvancedCommands(commands.Cog):
     @commands.command(name='لعبة', aliases=['تسلية', 'ألعاب'])
     async def games(self, ctx, game_type=None):
         """ألعاب تفاعلية بسيطة"""
+        guild_id = ctx.guild.id if ctx.guild else 'dm'
+        if not get_channel_store(self.bot).resolve_settings(guild_id, ctx.channel.id).games_enabled:
+            await ctx.send("🎮 الألعاب معطلة في هذه القناة")
+            return
+        
         if not game_type:
-            embed = discord.Embed(
-                title="🎮 الألعاب المتاحة",
-                description="""
-                `!لعبة تخمين` - لعبة تخمين الرقم
-                `!لعبة سؤال` - أسئلة عامة
-                `!لعبة حظ` - اختبار الحظ
-                """,
-                color=0xf39c12
-            )
-            await ctx.send(embed=embed)
+            await ctx.send(embed=GAMES_MENU_TEMPLATE.build())
             return
         
         if game_type == 'تخمين':
-            await self.guessing_game(ctx)
+            await self.run_session(ctx, self.guessing_game)
         elif game_type == 'سؤال':
-            await self.question_game(ctx)
+            await self.run_session(ctx, self.question_game)
         elif game_type == 'حظ':
-            await self.luck_game(ctx)
+            await self.record_result(ctx, await self.luck_game(ctx))
+        elif game_type == 'مسابقة':
+            await self.quiz_round(ctx)
+        elif game_type == 'كلمة':
+            await self.guess_round(ctx, 'words', "🔤 **خمّن الكلمة!**")
+        elif game_type == 'لغز':
+            await self.guess_round(ctx, 'riddles', "🧩 **لغز للجميع!**")
+    
+    async def run_session(self, ctx, game):
+        """تشغيل لعبة داخل جلسة مسجلة لدى موجّه الجلسات"""
+        session = self.router.open_session(ctx.channel.id, ctx.author.id)
+        if session is None:
+            await ctx.send("⏳ لديك لعبة جارية في هذه القناة")
+            return
+        # الإجابات تصل للجلسة عبر الموجّه، فلا داعي لحجز القناة في طابور الرسائل طوال اللعبة
+        self._release_channel()
+        with session:
+            result = await game(ctx, session)
+        await self.record_result(ctx, result)
     
-    async def guessing_game(self, ctx):
+    async def record_result(self, ctx, result, user_id=None):
+        """تسجيل نتيجة اللعبة في النشاط ولوحة الترتيب (الكتابة مجمعة في الخلفية)"""
+        if result is None:
+            return
+        guild_id = ctx.guild.id if ctx.guild else 'dm'
+        user_id = user_id or ctx.author.id
+        self.activity.record_game(guild_id, user_id, result.won)
+        await self.leaderboard.record(guild_id, user_id, result.won, result.response_time)
+    
+    async def quiz_round(self, ctx):
+        """مسابقة مفتوحة للقناة: جلسة واحدة للقناة تفحص إجابات جميع اللاعبين"""
+        question = self.content.next_item('quiz', ctx.channel.id)
+        if question is None:
+            await ctx.send("📭 لا توجد أسئلة متاحة حالياً")
+            return
+        
+        quiz = QuizRound(question)
+        session = self.router.open_round(ctx.channel.id, quiz.check)
+        if session is None:
+            await ctx.send("⏳ توجد مسابقة جارية في هذه القناة")
+            return
+        
+        self._release_channel()
+        with session:
+            options = "\n".join(f"{number}. {option}" for number, option in enumerate(question.options, 1))
+            await ctx.send(
+                f"🏁 **مسابقة للجميع!** أول إجابة صحيحة تفوز، ولكل لاعب محاولة واحدة\n"
+                f"❓ {question.prompt}\n{options}"
+            )
+            started = time.monotonic()
+            try:
+                winner = await session.wait(QUIZ_ROUND_TIMEOUT)
+                elapsed = time.monotonic() - started
+            except asyncio.TimeoutError:
+                winner = None
+        
+        if winner is None:
+            await ctx.send(f"⏰ انتهى الوقت! الإجابة كانت: {question.answer}")
+        else:
+            await ctx.send(
+                f"🎉 {winner.author.mention} أجاب أولاً: **{question.answer}** "
+                f"({elapsed:.1f} ث، المشاركون: {len(quiz.players)})"
+            )
+        
+        for user_id in quiz.players:
+            if winner is not None and user_id == winner.author.id:
+                await self.record_result(ctx, GameResult(True, elapsed), user_id)
+            else:
+                await self.record_result(ctx, GameResult(False, None), user_id)
+    
+    async def guess_round(self, ctx, kind, title):
+        """جولة كلمة أو لغز للقناة: التلميحات تُكشف عند انتهاء مهل عجلة المؤقتات المشتركة"""
+        item = self.content.next_item(kind, ctx.channel.id)
+        if item is None:
+            await ctx.send("📭 لا يوجد محتوى متاح حالياً")
+            return
+        
+        guess = GuessRound(item)
+        session = self.router.open_round(ctx.channel.id, guess.check)
+        if session is None:
+            await ctx.send("⏳ توجد لعبة جارية في هذه القناة")
+            return
+        
+        self._release_channel()
+        hints = GUESS_ROUND_TIMEOUT // HINT_INTERVAL - 1
+        with session:
+            sent = await ctx.send(
+                f"{title} أول إجابة صحيحة تفوز، ولكل لاعب {GUESS_ATTEMPTS} محاولات "
+                f"(أجب بالكلمة وحدها أو بالرد على هذه الرسالة)\n"
+                f"❓ {item.prompt}\n💡 `{hint_mask(item.answer, 0)}`"
+            )
+            guess.message_id = getattr(sent, 'id', None)
+            started = time.monotonic()
+            winner = None
+            # كل انتظار مؤقت واحد في العجلة، فلا توجد مهمة نائمة لكل لعبة
+            for revealed in range(1, hints + 2):
+                try:
+                    winner = await session.wait(HINT_INTERVAL)
+                    elapsed = time.monotonic() - started
+                    break
+                except asyncio.TimeoutError:
+                    if revealed <= hints:
+                        await ctx.send(f"💡 تلميح: `{hint_mask(item.answer, revealed)}`")
+        
+        if winner is None:
+            await ctx.send(f"⏰ انتهى الوقت! الإجابة كانت: {item.answer}")
+        else:
+            await ctx.send(f"🎉 {winner.author.mention} أجاب: **{item.answer}** ({elapsed:.1f} ث)")
+        
+        for user_id in guess.players:
+            if winner is not None and user_id == winner.author.id:
+                await self.record_result(ctx, GameResult(True, elapsed), user_id)
+            else:
+                await self.record_result(ctx, GameResult(False, None), user_id)
+    
+    async def guessing_game(self, ctx, session):
         """لعبة تخمين الرقم"""
         number = random.randint(1, 10)
         await ctx.send("🎯 خمن رقماً بين 1 و 10! لديك 3 محاولات")
-        
-        def check(message):
-            return message.author == ctx.author and message.channel == ctx.channel
+        started = time.monotonic()
         
         attempts = 3
         while attempts > 0:
             try:
-                msg = await self.bot.wait_for('message', check=check, timeout=30)
+                msg = await session.wait(30)
                 guess = int(msg.content)
                 
                 if guess == number:
+                    elapsed = time.monotonic() - started
                     await ctx.send(f"🎉 أحسنت! الرقم كان {number}")
-                    return
+                    return GameResult(True, elapsed)
                 elif guess < number:
                     await ctx.send(f"📈 أعلى! المحاولات المتبقية: {attempts-1}")
                 else:
@@ -149,34 +416,33 @@ class AdvancedCommands(commands.Cog):
                 
             except (ValueError, asyncio.TimeoutError):
                 await ctx.send("❌ يرجى إدخال رقم صحيح أو انتهت المهلة الزمنية")
-                return
+                return GameResult(False, None)
         
         await ctx.send(f"😔 انتهت المحاولات! الرقم كان {number}")
+        return GameResult(False, None)
     
-    async def question_game(self, ctx):
+    async def question_game(self, ctx, session):
         """لعبة الأسئلة العامة"""
-        questions = [
-            {"q": "ما هي عاصمة السعودية؟", "a": "الرياض"},
-            {"q": "كم عدد أيام السنة؟", "a": "365"},
-            {"q": "ما هو أكبر محيط في العالم؟", "a": "الهادئ"},
-            {"q": "في أي قارة تقع مصر؟", "a": "أفريقيا"},
-            {"q": "كم عدد ألوان قوس قزح؟", "a": "7"}
-        ]
-        
-        question = random.choice(questions)
-        await ctx.send(f"❓ {question['q']}")
+        question = self.content.next_item('quiz', ctx.channel.id)
+        if question is None:
+            await ctx.send("📭 لا توجد أسئلة متاحة حالياً")
+            return None
         
-        def check(message):
-            return message.author == ctx.author and message.channel == ctx.channel
+        options = "\n".join(f"{number}. {option}" for number, option in enumerate(question.options, 1))
+        await ctx.send(f"❓ {question.prompt}\n{options}")
+        started = time.monotonic()
         
         try:
-            msg = await self.bot.wait_for('message', check=check, timeout=30)
-            if question['a'].lower() in msg.content.lower():
+            msg = await session.wait(30)
+            elapsed = time.monotonic() - started
+            answer = get_normalized_content(msg)
+            if answer in question.answers or question.normalized_answer in answer:
                 await ctx.send("🎉 إجابة صحيحة! أحسنت")
-            else:
-                await ctx.send(f"❌ إجابة خاطئة. الإجابة الصحيحة: {question['a']}")
+                return GameResult(True, elapsed)
+            await ctx.send(f"❌ إجابة خاطئة. الإجابة الصحيحة: {question.answer}")
         except asyncio.TimeoutError:
-            await ctx.send(f"⏰ انتهى الوقت! الإجابة كانت: {question['a']}")
+            await ctx.send(f"⏰ انتهى الوقت! الإجابة كانت: {question.answer}")
+        return GameResult(False, None)
     
     async def luck_game(self, ctx):
         """لعبة اختبار الحظ"""
@@ -198,19 +464,12 @@ class AdvancedCommands(commands.Cog):
         )
         
         await ctx.send(embed=embed)
+        return GameResult(percentage >= LUCKY_THRESHOLD, None)
     
     @commands.command(name='دعاء', aliases=['أدعية'])
     async def prayer(self, ctx):
         """مشاركة دعاء"""
-        prayers = [
-            "اللهم اهدنا فيمن هديت 🤲",
-            "ربنا آتنا في الدنيا حسنة وفي الآخرة حسنة وقنا عذاب النار 🙏",
-            "اللهم أعنا على ذكرك وشكرك وحسن عبادتك 💙",
-            "ربنا اغفر لنا ذنوبنا وإسرافنا في أمرنا 🌟",
-            "اللهم بارك لنا فيما رزقتنا ✨"
-        ]
-        
-        prayer = random.choice(prayers)
+        prayer = self.responses.pick(PACK_PRAYERS, 'general', ctx.channel.id)
         
         embed = discord.Embed(
             title="🤲 دعاء",
@@ -221,29 +480,76 @@ class AdvancedCommands(commands.Cog):
         
         await ctx.send(embed=embed)
     
+    async def resolve_member(self, ctx, user):
+        """العضو من الذاكرة، أو من واجهة ديسكورد عند الطلب إذا لم يكن مخزناً"""
+        if ctx.guild is None or isinstance(user, discord.Member):
+            return user
+        member = ctx.guild.get_member(user.id)
+        if member is None:
+            try:
+                member = await ctx.guild.fetch_member(user.id)
+            except discord.HTTPException:
+                return user
+        return member
+    
     @commands.command(name='إحصائيات', aliases=['stats'])
-    async def user_stats(self, ctx, member: discord.Member = None):
+    async def user_stats(self, ctx, user: discord.User = None):
         """عرض إحصائيات المستخدم"""
-        if not member:
-            member = ctx.author
+        # في وضع الذاكرة المنخفضة لا يُخزن الأعضاء، فيُجلب العضو المطلوب وحده
+        member = await self.resolve_member(ctx, user or ctx.author)
+        is_member = isinstance(member, discord.Member)
         
         # حساب بعض الإحصائيات البسيطة
-        join_date = member.joined_at.strftime("%Y-%m-%d") if member.joined_at else "غير معروف"
-        account_age = (datetime.now() - member.created_at).days
+        join_date = member.joined_at.strftime("%Y-%m-%d") if is_member and member.joined_at else "غير معروف"
+        account_age = (discord.utils.utcnow() - member.created_at).days
         
         embed = discord.Embed(
             title=f"📊 إحصائيات {member.display_name}",
             color=member.color
         )
         
-        embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
+        embed.set_thumbnail(url=member.display_avatar.url)
         embed.add_field(name="📅 تاريخ الانضمام", value=join_date, inline=True)
         embed.add_field(name="🎂 عمر الحساب", value=f"{account_age} يوم", inline=True)
-        embed.add_field(name="🏷️ الأدوار", value=len(member.roles)-1, inline=True)
+        embed.add_field(name="🏷️ الأدوار", value=len(member.roles) - 1 if is_member else 0, inline=True)
+        
+        # نشاط المستخدم في هذا الخادم
+        stats = await self.activity.get_stats(ctx.guild.id if ctx.guild else 'dm', member.id)
+        embed.add_field(name="💬 الرسائل", value=stats.messages, inline=True)
+        embed.add_field(name="⌨️ الأوامر", value=stats.commands, inline=True)
+        embed.add_field(name="🎮 الألعاب", value=f"{stats.games} (فوز: {stats.wins})", inline=True)
+        
+        await ctx.send(embed=embed)
+    
+    @commands.command(name='ترتيب', aliases=['المتصدرين', 'leaderboard'])
+    async def leaderboard_command(self, ctx, limit: int = 10):
+        """لوحة ترتيب اللاعبين في الخادم"""
+        limit = max(1, min(limit, 25))
+        guild_id = ctx.guild.id if ctx.guild else 'dm'
+        leaders = await self.leaderboard.top(guild_id, limit)
+        if not leaders:
+            await ctx.send("📭 لم يلعب أحد بعد! ابدأ بـ `!لعبة`")
+            return
+        
+        lines = []
+        for rank, user_id, score in leaders:
+            medal = RANK_MEDALS.get(rank, f"**{rank}.**")
+            fastest = f" • ⚡ {score.best_time:.1f} ث" if score.best_time is not None else ""
+            lines.append(
+                f"{medal} <@{user_id}> — {score.points} نقطة "
+                f"(فوز: {score.wins} • 🔥 {score.best_streak}{fastest})"
+            )
+        
+        embed = discord.Embed(
+            title="🏆 لوحة الترتيب",
+            description="\n".join(lines),
+            color=0xf1c40f
+        )
         
-        # إضافة بعض الإحصائيات المرحة
-        activity_score = random.randint(1, 100)
-        embed.add_field(name="⚡ نشاط الخادم", value=f"{activity_score}%", inline=True)
+        own = await self.leaderboard.rank(guild_id, ctx.author.id)
+        if own is not None:
+            rank, total, score = own
+            embed.set_footer(text=f"ترتيبك: {rank} من {total} • {score.points} نقطة")
         
         await ctx.send(embed=embed)
 
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تطبيع النصوص العربية قبل المطابقة
+يوحّد أشكال الألف والتاء المربوطة والألف المقصورة ويحذف التشكيل والتطويل
+"""
+
+import re
+from collections import OrderedDict
+
+# جدول تحويل واحد: توحيد الحروف وحذف التشكيل والتطويل في مرور واحد
+_FOLD_TABLE = {
+    ord('أ'): 'ا',
+    ord('إ'): 'ا',
+    ord('آ'): 'ا',
+    ord('ٱ'): 'ا',
+    ord('ة'): 'ه',
+    ord('ى'): 'ي',
+    ord('ـ'): None,  # التطويل
+    0x0670: None,    # الألف الخنجرية
+}
+_FOLD_TABLE.update({code: None for code in range(0x064B, 0x0660)})  # الحركات والتنوين
+_FOLD_TABLE.update({code: None for code in range(0x0610, 0x061B)})  # علامات قرآنية
+
+# الحروف المكررة مثل "مرحباااا" (الأرقام لا تُختصر)
+_REPEATED_LETTERS = re.compile(r'(\D)\1+')
+
+# النص الموحد لآخر الرسائل: {message.id: (المحتوى، النص الموحد)}
+# discord.Message يستخدم __slots__ فلا يمكن التخزين عليه مباشرة
+NORMALIZED_CACHE_SIZE = 1024
+_normalized_cache = OrderedDict()
+
+
+def normalize_arabic(text):
+    """إرجاع الصيغة الموحدة للنص"""
+    text = text.translate(_FOLD_TABLE).casefold()
+    return _REPEATED_LETTERS.sub(r'\1', text)
+
+
+def normalize_keywords(keywords):
+    """تطبيع جداول الكلمات المفتاحية مع حذف التكرار والحفاظ على الترتيب"""
+    normalized = {}
+    for category, words in keywords.items():
+        normalized[category] = list(dict.fromkeys(
+            normalize_arabic(word) for word in words if word
+        ))
+    return normalized
+
+
+def get_normalized_content(message):
+    """الصيغة الموحدة لمحتوى الرسالة، تُحسب مرة واحدة لكل رسالة"""
+    content = message.content
+    entry = _normalized_cache.get(message.id)
+    # مقارنة الهوية تكفي: الرسالة المعدلة كائن جديد بمحتوى جديد
+    if entry is not None and entry[0] is content:
+        return entry[1]
+    normalized = normalize_arabic(content)
+    _normalized_cache[message.id] = (content, normalized)
+    if len(_normalized_cache) > NORMALIZED_CACHE_SIZE:
+        _normalized_cache.popitem(last=False)
+    return normalized
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس أداء البوت دون اتصال
+يعيد تشغيل رسائل مصطنعة عبر on_message والإضافات باستخدام كائنات ديسكورد وهمية،
+ويقارن النتائج بخط أساس محفوظ لاكتشاف التراجع في الأداء
+
+الاستخدام:
+    python benchmark.py --messages 20000 --guilds 50 --save-baseline
+    python benchmark.py --baseline benchmark_baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+
+import discord
+from discord.ext import commands
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = 'benchmark_baseline.json'
+
+# نسبة التغير المسموحة قبل اعتبار النتيجة تراجعاً
+DEFAULT_TOLERANCE = 0.15
+
+# الإعادة أسرع من حركة حقيقية بنحو هذا المعامل، فيُسرَّع زمن حدود المعدل بالقدر نفسه
+# حتى تبقى الحدود متناسبة ولا تنتظر ردود الأوامر ثوانيَ حقيقية
+TIME_SCALE = 1000
+
+# {المقياس: True إذا كانت الزيادة أفضل}
+COMPARED_METRICS = {
+    'messages_per_second': True,
+    'p50_ms': False,
+    'p99_ms': False,
+    'peak_kib': False,
+}
+
+# جمل عادية لا تحتوي كلمات مفتاحية
+ARABIC_FILLER = [
+    'كيف كان يومكم يا شباب',
+    'أنا في الطريق إلى البيت الآن',
+    'هل شاهد أحدكم المباراة أمس',
+    'الجو اليوم حار جداً',
+    'سأعود بعد قليل إن شاء الله',
+    'من يريد أن يلعب معي الليلة',
+    'هذا الكتاب جميل جداً وأنصح به',
+    'لا أعرف ماذا أطبخ على العشاء',
+    'الاجتماع تأجل إلى الأسبوع القادم',
+    'وصلتني الرسالة شكراً لكم',
+]
+
+MIXED_FILLER = [
+    'hello everyone, مرحبا بالجميع',
+    'brb, سأعود بعد قليل',
+    'anyone up for a game? من يلعب',
+    'lol هذا مضحك جداً',
+    'the meeting is at 5pm اليوم',
+    'good morning all',
+    'check the pinned message please',
+    'ok شكرا',
+]
+
+# أوامر متنوعة تمر عبر البوت والإضافتين
+BENCH_COMMANDS = [
+    '!مرحبا',
+    '!مساعدة',
+    '!حكمة',
+    '!تحفيز',
+    '!مزاج أنا سعيد اليوم',
+    '!لعبة حظ',
+    '!لعبة',
+    '!قناة',
+    '!قناة إعدادات',
+    '!قناة قائمة',
+    '!قناة تخصيص response_chance 40',
+    '!حالة أداء',
+    '!أمر_غير_موجود',
+]
+
+# حدث في الحمل: kind من chat / command / game_start / game_answer
+Event = namedtuple('Event', 'kind guild channel author content')
+
+
+class SendSink:
+    """مستقبل الرسائل الصادرة: يعدّها فقط دون اتصال بالشبكة"""
+
+    def __init__(self):
+        self.messages = 0
+        self.embeds = 0
+
+    def record(self, content, kwargs):
+        self.messages += 1
+        if kwargs.get('embed') is not None:
+            self.embeds += 1
+
+
+def user_payload(user_id, name, bot=False):
+    """حمولة مستخدم كما ترسلها البوابة"""
+    return {
+        'id': str(user_id), 'username': name, 'global_name': name,
+        'discriminator': '0', 'avatar': None, 'bot': bot
+    }
+
+
+class FakeGuild:
+    """خادم وهمي"""
+
+    def __init__(self, guild_id, member_count):
+        self.id = guild_id
+        self.name = f'guild-{guild_id}'
+        self.member_count = member_count
+
+
+class FakeChannel:
+    """قناة نصية وهمية ترسل إلى SendSink"""
+
+    type = discord.ChannelType.text
+
+    def __init__(self, channel_id, guild, sink):
+        self.id = channel_id
+        self.guild = guild
+        self.name = f'channel-{channel_id}'
+        self.mention = f'<#{channel_id}>'
+        self.sink = sink
+
+    async def send(self, content=None, **kwargs):
+        self.sink.record(content, kwargs)
+        return content
+
+    def permissions_for(self, member):
+        return discord.Permissions.all()
+
+
+def message_payload(message_id, content, channel, author):
+    """حمولة رسالة كما ترسلها البوابة، تُبنى منها discord.Message حقيقية دون اتصال"""
+    return {
+        'id': str(message_id), 'channel_id': str(channel.id), 'guild_id': str(channel.guild.id),
+        'author': author, 'content': content, 'type': 0,
+        'timestamp': '2024-01-01T00:00:00+00:00', 'edited_timestamp': None,
+        'tts': False, 'pinned': False, 'mention_everyone': False,
+        'mentions': [], 'mention_roles': [], 'attachments': [], 'embeds': []
+    }
+
+
+def build_keywords(base_keywords, extra, rng):
+    """إضافة extra كلمة مفتاحية مصطنعة موزعة على الفئات الحالية"""
+    keywords = {category: list(words) for category, words in base_keywords.items()}
+    categories = list(keywords)
+    letters = 'ابتثجحخدذرزسشصضطظعغفقكلمنهوي'
+    for number in range(extra):
+        word = ''.join(rng.choice(letters) for _ in range(rng.randint(4, 8)))
+        keywords[categories[number % len(categories)]].append(f'{word}{number}')
+    return keywords
+
+
+def generate_workload(args, keywords, seed):
+    """توليد الأحداث: محادثة عربية ومختلطة وأوامر وألعاب متزامنة"""
+    rng = random.Random(seed)
+    phrases = [word for words in keywords.values() for word in words]
+    chatters = [1000 + number for number in range(max(1, args.users))]
+    # لاعبون مخصصون حتى لا تُستهلك رسائل المحادثة كإجابات
+    players = [900000 + number for number in range(args.games)]
+
+    def chat_content():
+        roll = rng.random()
+        if roll < args.keyword_ratio:
+            filler = rng.choice(ARABIC_FILLER)
+            # تنويعات الكتابة: تشكيل وتطويل وتكرار حروف
+            keyword = rng.choice(phrases)
+            variant = rng.choice((keyword, keyword[0] + '\u064e' + keyword[1:], keyword + 'ـــ', keyword + keyword[-1] * 2))
+            return f'{filler} {variant}' if rng.random() < 0.5 else f'{variant} {filler}'
+        if roll < args.keyword_ratio + args.mixed_ratio:
+            return rng.choice(MIXED_FILLER)
+        return rng.choice(ARABIC_FILLER)
+
+    positioned = []
+    for position in range(args.messages):
+        guild = rng.randrange(args.guilds)
+        channel = rng.randrange(args.channels)
+        author = rng.choice(chatters)
+        if rng.random() < args.command_ratio:
+            positioned.append((position, Event('command', guild, channel, author, rng.choice(BENCH_COMMANDS))))
+        else:
+            positioned.append((position, Event('chat', guild, channel, author, chat_content())))
+
+    # الألعاب تبدأ في النصف الأول وتتداخل إجاباتها مع المحادثة
+    for player in players:
+        guild = rng.randrange(args.guilds)
+        channel = rng.randrange(args.channels)
+        start = rng.uniform(0, args.messages / 2)
+        if rng.random() < 0.5:
+            positioned.append((start, Event('game_start', guild, channel, player, '!لعبة تخمين')))
+            answers = [str(rng.randint(1, 10)) for _ in range(3)]
+        else:
+            positioned.append((start, Event('game_start', guild, channel, player, '!لعبة سؤال')))
+            answers = [str(rng.randint(1, 4))]
+        offset = start
+        for answer in answers:
+            offset += rng.uniform(1, max(2, args.messages / (4 * len(answers))))
+            positioned.append((offset, Event('game_answer', guild, channel, player, answer)))
+
+    positioned.sort(key=lambda item: item[0])
+    return [event for _, event in positioned]
+
+
+class Harness:
+    """يربط الكائنات الوهمية بوحدة البوت ويعيد تشغيل الأحداث"""
+
+    def __init__(self, bot_module, args):
+        self.module = bot_module
+        self.bot = bot_module.bot
+        self.args = args
+        self.sink = SendSink()
+        self._message_ids = 0
+        self._users = {}
+        rng = random.Random(args.seed)
+        self.guilds = [FakeGuild(10 ** 6 + number, rng.randint(10, 5000)) for number in range(args.guilds)]
+        self.channels = [
+            [FakeChannel(guild.id * 1000 + number, guild, self.sink) for number in range(args.channels)]
+            for guild in self.guilds
+        ]
+        # أخطاء تنفيذ الأوامر (لا تشمل الأوامر غير الموجودة أو نقص الصلاحيات)
+        self.command_errors = 0
+
+    async def _command_error(self, ctx, error):
+        if isinstance(error, commands.CommandInvokeError):
+            self.command_errors += 1
+
+    async def setup(self):
+        """تحميل الإضافات وتفعيل M قناة في كل خادم"""
+        from game_content import GameContent, GAMES_DATA_DIR
+
+        state = self.bot._connection
+        state.user = discord.ClientUser(state=state, data={**user_payload(1, 'bench-bot', bot=True), 'verified': True, 'mfa_enabled': False})
+        # محتوى الألعاب من مجلد المشروع، لأن التشغيل داخل مجلد مؤقت
+        self.bot.game_content = GameContent(os.path.join(ROOT, GAMES_DATA_DIR))
+        outbound = self.module.outbound
+        outbound.rate *= TIME_SCALE
+        outbound.reply_cooldown /= TIME_SCALE
+        self.bot.add_listener(self._command_error, 'on_command_error')
+        await self.module.load_extensions()
+        # الإضافة تبدأ التحميل في الخلفية، والقياس ينتظره حتى تجد الألعاب محتواها
+        await self.bot.game_content.load()
+
+        store = self.module.channel_store
+        for guild, channels in zip(self.guilds, self.channels):
+            for channel in channels[:self.args.active]:
+                store.activate_channel(guild.id, channel.id)
+
+    def user(self, user_id):
+        """حمولة المستخدم (تُبنى مرة واحدة لكل مستخدم)"""
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = user_payload(user_id, f'user-{user_id}')
+        return user
+
+    def messages(self, events):
+        """تحويل الأحداث إلى رسائل discord.Message حقيقية قبل بدء القياس
+
+        الرسائل الحقيقية تستخدم __slots__، فأي كتابة عليها في مسار البوت تفشل هنا كما تفشل في الإنتاج
+        """
+        state = self.bot._connection
+        built = []
+        for event in events:
+            self._message_ids += 1
+            channel = self.channels[event.guild][event.channel]
+            payload = message_payload(self._message_ids, event.content, channel, self.user(event.author))
+            built.append((event.kind, discord.Message(state=state, channel=channel, data=payload)))
+        return built
+
+    async def replay(self, messages):
+        """تشغيل الرسائل بالترتيب، ويرجع أزمنة المعالجة بالثواني (من الاستلام حتى انتهاء العامل)"""
+        on_message = self.module.on_message
+        pipeline = self.module.pipeline
+        latencies = []
+        perf_counter = time.perf_counter
+        for _, message in messages:
+            # أوامر الألعاب تمر بالطابور أيضاً، وتحرر قناتها بعد فتح الجلسة فلا يُنتظر اللاعب
+            started = perf_counter()
+            await on_message(message)
+            await pipeline.join()
+            latencies.append(perf_counter() - started)
+            # إتاحة الفرصة لمهام الألعاب والحفظ المؤجل
+            await asyncio.sleep(0)
+        return latencies
+
+    async def finish(self):
+        """إنهاء الألعاب المعلقة وحفظ الحالة"""
+        # إغلاق الطابور يلغي الألعاب التي ما زالت تنتظر اللاعبين
+        await self.module.pipeline.close()
+        self.bot.game_content.stop_watching()
+        await self.module.channel_store.close()
+        await self.module.activity.close()
+        await self.module.leaderboard.close()
+
+
+def percentile(sorted_values, q):
+    """الكمّية من قائمة مرتبة"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def run_benchmark(bot_module, args):
+    """تشغيل القياس كاملاً وإرجاع النتائج"""
+    # تهيئة حلقة العميل دون تسجيل دخول، كما يفعل bot.start
+    await bot_module.bot.__aenter__()
+    harness = Harness(bot_module, args)
+    await harness.setup()
+
+    keywords = build_keywords(bot_module.KEYWORDS, args.keywords, random.Random(args.seed))
+    if args.keywords:
+        bot_module.KEYWORDS = keywords
+        bot_module.rebuild_keyword_matcher()
+
+    warmup_args = argparse.Namespace(**{**vars(args), 'messages': args.warmup, 'games': 0})
+    await harness.replay(harness.messages(generate_workload(warmup_args, keywords, args.seed + 1)))
+
+    # تمريرات التوقيت: تُعتمد أسرعها لتقليل أثر الضوضاء
+    result = None
+    for _ in range(max(1, args.repeat)):
+        messages = harness.messages(generate_workload(args, keywords, args.seed))
+        sent_before = harness.sink.messages
+        started = time.perf_counter()
+        latencies = await harness.replay(messages)
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        run = {
+            'messages': len(messages),
+            'elapsed_seconds': round(elapsed, 4),
+            'messages_per_second': round(len(messages) / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+            'max_ms': round(latencies[-1] * 1000, 4) if latencies else 0.0,
+            'sent': harness.sink.messages - sent_before,
+        }
+        if result is None or run['messages_per_second'] > result['messages_per_second']:
+            result = run
+    result['outbound'] = bot_module.outbound.stats()
+    result['pipeline'] = bot_module.pipeline.stats()
+
+    # تمريرة الذاكرة منفصلة لأن tracemalloc يبطئ التنفيذ
+    if not args.no_memory:
+        messages = harness.messages(generate_workload(args, keywords, args.seed + 2))
+        tracemalloc.start()
+        baseline_size, _ = tracemalloc.get_traced_memory()
+        await harness.replay(messages)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_kib'] = round((peak - baseline_size) / 1024, 1)
+        result['retained_kib'] = round((current - baseline_size) / 1024, 1)
+        result['bytes_per_message'] = round((peak - baseline_size) / max(1, len(messages)), 1)
+
+    await harness.finish()
+    # أي خطأ يعني أن القياس مرّ على مسار يفشل في الإنتاج
+    result['errors'] = bot_module.pipeline.errors + harness.command_errors
+    result['workload'] = {
+        key: getattr(args, key) for key in (
+            'messages', 'guilds', 'channels', 'active', 'users', 'keywords',
+            'games', 'command_ratio', 'keyword_ratio', 'mixed_ratio', 'seed'
+        )
+    }
+    return result
+
+
+def compare(result, baseline, tolerance):
+    """مقارنة النتائج بخط الأساس، ويرجع [(المقياس، الأساس، الحالي، التغير، تراجع؟)]"""
+    rows = []
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        old = baseline.get(metric)
+        new = result.get(metric)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else 0.0
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        rows.append((metric, old, new, change, regressed))
+    return rows
+
+
+def print_report(result):
+    """طباعة النتائج"""
+    print("\n📊 نتائج القياس")
+    print(f"   الرسائل: {result['messages']} خلال {result['elapsed_seconds']} ث")
+    print(f"   الإنتاجية: {result['messages_per_second']} رسالة/ث")
+    print(f"   زمن المعالجة: p50 {result['p50_ms']}ms | p99 {result['p99_ms']}ms | أقصى {result['max_ms']}ms")
+    print(f"   الرسائل المرسلة: {result['sent']}")
+    if result['errors']:
+        print(f"   ❌ أخطاء المعالجة: {result['errors']}")
+    if 'peak_kib' in result:
+        print(f"   الذاكرة: ذروة {result['peak_kib']} KiB | متبقية {result['retained_kib']} KiB"
+              f" | {result['bytes_per_message']} بايت/رسالة")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='قياس أداء البوت دون اتصال')
+    parser.add_argument('--messages', type=int, default=20000, help='عدد الرسائل المقاسة')
+    parser.add_argument('--warmup', type=int, default=1000, help='رسائل الإحماء قبل القياس')
+    parser.add_argument('--guilds', type=int, default=20, help='عدد الخوادم')
+    parser.add_argument('--channels', type=int, default=10, help='عدد القنوات في كل خادم')
+    parser.add_argument('--active', type=int, default=3, help='القنوات النشطة في كل خادم (0 = الكل)')
+    parser.add_argument('--users', type=int, default=500, help='عدد المستخدمين المتحدثين')
+    parser.add_argument('--keywords', type=int, default=0, help='كلمات مفتاحية إضافية مصطنعة')
+    parser.add_argument('--games', type=int, default=20, help='عدد الألعاب المتزامنة')
+    parser.add_argument('--command-ratio', type=float, default=0.05, help='نسبة الأوامر')
+    parser.add_argument('--keyword-ratio', type=float, default=0.3, help='نسبة الرسائل التي تحتوي كلمة مفتاحية')
+    parser.add_argument('--mixed-ratio', type=float, default=0.2, help='نسبة الرسائل المختلطة بالإنجليزية')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3, help='عدد تمريرات التوقيت (تُعتمد الأسرع)')
+    parser.add_argument('--no-memory', action='store_true', help='تخطي تمريرة tracemalloc')
+    parser.add_argument('--json', action='store_true', help='طباعة النتائج بصيغة JSON')
+    parser.add_argument('--baseline', help='ملف خط أساس للمقارنة')
+    parser.add_argument('--save-baseline', nargs='?', const=BASELINE_FILE, help='حفظ النتائج كخط أساس')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='نسبة التغير المسموحة')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """نقطة الدخول، وترجع 1 عند اكتشاف تراجع أو أخطاء في المعالجة"""
+    args = parse_args(argv)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    save_path = os.path.abspath(args.save_baseline) if args.save_baseline else None
+
+    # التشغيل داخل مجلد مؤقت حتى لا تُمس ملفات حالة القنوات الحقيقية
+    sys.path.insert(0, ROOT)
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        import bot as bot_module
+        result = asyncio.run(run_benchmark(bot_module, args))
+        os.chdir(ROOT)
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_report(result)
+
+    if save_path:
+        with open(save_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"💾 تم حفظ خط الأساس في {save_path}")
+
+    if result['errors']:
+        print("❌ فشلت معالجة بعض الرسائل، النتائج غير صالحة")
+        return 1
+
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('workload') != result['workload']:
+            print("⚠️ إعدادات الحمل تختلف عن خط الأساس، المقارنة تقريبية")
+        rows = compare(result, baseline, args.tolerance)
+        print(f"\n📈 المقارنة مع {baseline_path} (السماحية {args.tolerance:.0%})")
+        for metric, old, new, change, regressed in rows:
+            mark = '❌' if regressed else '✅'
+            print(f"   {mark} {metric}: {old} → {new} ({change:+.1%})")
+        if any(row[4] for row in rows):
+            print("❌ تم اكتشاف تراجع في الأداء")
+            return 1
+        print("✅ لا يوجد تراجع")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
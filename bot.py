@@ -1,16 +1,38 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import time
+
+# بداية التشغيل البارد، قبل استيراد المكتبات الثقيلة
+STARTUP_BEGAN = time.perf_counter()
+
 import discord
 from discord.ext import commands
 import os
-import json
+import sys
 import random
 import asyncio
 from dotenv import load_dotenv
-from keep_alive import keep_alive
+from keyword_matcher import KeywordMatcher
+from arabic_text import normalize_keywords, get_normalized_content
+from channel_store import get_channel_store
+from guild_triggers import get_guild_triggers
+from outbound import OutboundScheduler, ScheduledContext
+from embed_templates import EmbedTemplate, register_template
+from game_sessions import get_game_router
+from health_server import HealthServer, DEFAULT_PORT
+from instrumentation import get_metrics, format_report, StartupProfile
+from sharding import create_bot, shard_stats, format_shard_stats, latency_ms, EXIT_OK, EXIT_FAILURE, EXIT_CONFIG_ERROR
+from activity_tracker import get_activity_tracker
+from leaderboard import get_leaderboard
+from response_engine import get_response_engine, PACK_REPLIES
+from message_pipeline import (
+    MessagePipeline, PRIORITY_HIGH, PRIORITY_LOW, DEFAULT_WORKERS, DEFAULT_QUEUE_SIZE, MAX_DETACHED
+)
 
-keep_alive()    
+# ملف أزمنة التشغيل: الاستيراد، الإعداد، الإضافات، الاتصال
+startup = StartupProfile(STARTUP_BEGAN)
+startup.mark('imports')
 
 # تحميل متغيرات البيئة
 load_dotenv()
@@ -19,12 +41,56 @@ load_dotenv()
 intents = discord.Intents.default()
 intents.message_content = True
 intents.guilds = True
-intents.members = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+# وضع الذاكرة المنخفضة (LOW_MEMORY=1): بدون صلاحية الأعضاء ولا تخزين مؤقت لهم ولا للرسائل
+LOW_MEMORY = os.getenv('LOW_MEMORY', '0') == '1'
+intents.members = not LOW_MEMORY
+bot_options = {}
+if LOW_MEMORY:
+    bot_options = {
+        'member_cache_flags': discord.MemberCacheFlags.none(),
+        'chunk_guilds_at_startup': False,
+        'max_messages': None
+    }
+
+# بادئة الأوامر، تُفحص قبل أي معالجة لتحديد مسار الرسالة
+COMMAND_PREFIX = '!'
+
+# مسارات الرسائل: كل رسالة تمر على مسار واحد فقط
+ROUTE_COMMAND = 'command'
+ROUTE_GAME = 'game'
+ROUTE_AUTO_REPLY = 'auto_reply'
+ROUTE_IGNORE = 'ignore'
+
+# SHARD_COUNT / SHARD_IDS يفعّلان وضع الشظايا (AutoShardedBot)
+bot = create_bot(command_prefix=COMMAND_PREFIX, intents=intents, **bot_options)
+bot.startup_profile = startup
+
+# مخزن حالة القنوات المشترك مع مدير القنوات (يُحمّل مرة واحدة)
+channel_store = get_channel_store(bot)
+
+# الردود المخصصة لكل خادم (مطابق مُجمّع لكل خادم يُبنى عند الحاجة)
+guild_triggers = get_guild_triggers(bot)
+
+# جدولة الرسائل الصادرة: حد معدل لكل قناة ودمج الردود التلقائية المتكررة
+outbound = OutboundScheduler(
+    rate=float(os.getenv('AUTO_REPLY_RATE', '1')),
+    burst=int(os.getenv('AUTO_REPLY_BURST', '5')),
+    reply_cooldown=float(os.getenv('AUTO_REPLY_COOLDOWN', '2'))
+)
+bot.outbound = outbound
+
+# مقاييس زمن المعالجة (METRICS_ENABLED=0 لتعطيلها)
+metrics = get_metrics(bot)
+
+# عدادات نشاط المستخدمين (تسجيل فوري دون انتظار، وحفظ في الخلفية)
+activity = get_activity_tracker(bot)
 
-# ملف لحفظ إعدادات القنوات
-CHANNELS_FILE = 'active_channels.json'
+# نقاط الألعاب وترتيب اللاعبين لكل خادم
+leaderboard = get_leaderboard(bot)
+
+# موجّه جلسات الألعاب: رسائل اللاعبين تصل لجلساتهم ببحث واحد
+game_router = get_game_router(bot)
 
 # قاموس الردود العربية مع الإيموجي
 ARABIC_RESPONSES = {
@@ -71,31 +137,68 @@ ARABIC_RESPONSES = {
     ]
 }
 
-# كلمات مفتاحية للتفاعل
+# كلمات مفتاحية للتفاعل (تُطبّع عند التحميل، فلا حاجة لتكرار أشكال الكتابة)
 KEYWORDS = {
-    'greetings': ['مرحبا', 'أهلا', 'السلام عليكم', 'هلا', 'اهلين', 'مرحباً', 'أهلاً'],
-    'thanks': ['شكرا', 'شكراً', 'مشكور', 'يعطيك العافية', 'الله يعطيك العافية'],
+    'greetings': ['مرحبا', 'أهلا', 'السلام عليكم', 'هلا', 'اهلين'],
+    'thanks': ['شكرا', 'مشكور', 'يعطيك العافية'],
     'good_morning': ['صباح الخير', 'صباح النور', 'صباحكم خير'],
     'good_evening': ['مساء الخير', 'مساء النور', 'مساءكم خير'],
     'encouragement': ['أحسنت', 'ممتاز', 'رائع', 'جميل', 'مبدع'],
-    'help': ['مساعدة', 'ساعدني', 'أحتاج مساعدة', 'كيف']
+    'help': ['مساعدة', 'ساعدني', 'كيف']
 }
 
-def load_active_channels():
-    """تحميل قائمة القنوات النشطة"""
-    try:
-        with open(CHANNELS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+# محرك الردود: جداول مُجمّعة ودوران دون تكرار لكل قناة، وحزم إضافية من RESPONSES_DATA_DIR
+response_engine = get_response_engine(bot)
+response_engine.add_pack(PACK_REPLIES, ARABIC_RESPONSES)
+for category, words in response_engine.keywords.items():
+    KEYWORDS.setdefault(category, []).extend(words)
+
+# فئات تحيات الوقت التي يتحكم بها إعداد time_greetings
+TIME_GREETING_CATEGORIES = {'good_morning', 'good_evening'}
 
-def save_active_channels(channels):
-    """حفظ قائمة القنوات النشطة"""
-    with open(CHANNELS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(channels, f, ensure_ascii=False, indent=2)
+# مطابق الكلمات المفتاحية المُجمّع (يُعاد بناؤه عند تغيير KEYWORDS)
+keyword_matcher = KeywordMatcher(normalize_keywords(KEYWORDS))
 
-# متغير لحفظ القنوات النشطة
-active_channels = load_active_channels()
+def rebuild_keyword_matcher():
+    """إعادة بناء مطابق الكلمات بعد تعديل الجداول"""
+    global keyword_matcher
+    keyword_matcher = KeywordMatcher(normalize_keywords(KEYWORDS))
+
+# قوالب الإمبد: تُبنى الأجزاء الثابتة مرة واحدة
+HELP_TEMPLATE = register_template('help', EmbedTemplate(
+    title="🤖 أوامر البوت العربي",
+    description="قائمة بجميع الأوامر المتاحة",
+    color=0x00ff00,
+    fields=[
+        ("🎯 الأوامر الأساسية", """
+        `!مرحبا` - ترحيب
+        `!مساعدة` - عرض هذه القائمة
+        `!حالة` - عرض حالة البوت
+        `!حالة أداء` - زمن المعالجة والعدادات
+        `!تفعيل_القناة` - تفعيل التفاعل في هذه القناة
+        `!إلغاء_القناة` - إلغاء التفاعل في هذه القناة
+        `!القنوات_النشطة` - عرض القنوات النشطة
+        """, False),
+        ("💬 التفاعل التلقائي",
+         "البوت يتفاعل تلقائياً مع الكلمات العربية مثل: مرحبا، شكراً، صباح الخير، مساء الخير", False)
+    ],
+    footer="البوت العربي التفاعلي 🇸🇦"
+))
+
+STATUS_TEMPLATE = register_template('status', EmbedTemplate(
+    title="📊 حالة البوت",
+    color=0x0099ff,
+    fields=[
+        ("🟢 الحالة", "متصل وجاهز", True),
+        ("📡 زمن الاستجابة", "{latency}", True),
+        ("🏠 الخوادم", "{guilds}", True),
+        ("👥 المستخدمين", "{users}", True),
+        ("📺 القنوات النشطة", "{active_channels}", True),
+        ("🧩 الشظايا", "{shards}", False),
+        ("📤 الردود التلقائية",
+         "مرسلة: {sent} | مدمجة: {coalesced} | مُسقطة: {dropped} | بالانتظار: {queue_depth}", False)
+    ]
+))
 
 @bot.event
 async def on_ready():
@@ -103,6 +206,11 @@ async def on_ready():
     print(f'🤖 البوت {bot.user} جاهز للعمل!')
     print(f'📊 متصل بـ {len(bot.guilds)} خادم')
     
+    # ملف التشغيل يُطبع عند أول جاهزية فقط، لا عند إعادة الاتصال
+    if startup.finished is None:
+        startup.finish('gateway')
+        print(startup.report())
+    
     # تعيين حالة البوت
     await bot.change_presence(
         activity=discord.Activity(
@@ -111,6 +219,11 @@ async def on_ready():
         )
     )
 
+@bot.event
+async def on_shard_ready(shard_id):
+    """عند جاهزية شظية (في وضع الشظايا فقط)"""
+    print(f'🧩 الشظية {shard_id} جاهزة')
+
 @bot.event
 async def on_message(message):
     """التعامل مع الرسائل"""
@@ -118,106 +231,172 @@ async def on_message(message):
     if message.author == bot.user:
         return
     
-    # التحقق من أن القناة نشطة
-    guild_id = str(message.guild.id) if message.guild else 'dm'
-    channel_id = str(message.channel.id)
-    
-    if guild_id in active_channels and channel_id not in active_channels[guild_id]:
-        # القناة غير نشطة، لا تتفاعل
-        await bot.process_commands(message)
-        return
-    
-    # إذا لم يتم تحديد قنوات نشطة، تفاعل في جميع القنوات
-    if guild_id not in active_channels:
-        active_channels[guild_id] = []
+    metrics.inc('messages')
+    route = route_message(message)
+    metrics.inc('routes', route)
     
-    # التفاعل مع الرسائل العربية
-    content = message.content.lower()
+    if not message.author.bot:
+        activity.record_message(str(message.guild.id) if message.guild else 'dm', message.author.id)
     
-    # البحث عن كلمات مفتاحية والرد عليها
-    for category, keywords in KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in content:
-                response = random.choice(ARABIC_RESPONSES[category])
-                await message.channel.send(response)
-                break
+    # المعالجة في طابور محدود، فلا ينتظر حدث البوابة أي إرسال
+    if route is ROUTE_COMMAND:
+        submitted = pipeline.submit(message.channel.id, PRIORITY_HIGH, message, route)
+    elif route is ROUTE_AUTO_REPLY:
+        submitted = pipeline.submit(message.channel.id, PRIORITY_LOW, message, route)
+    else:
+        return
+    if not submitted:
+        metrics.inc('shed', route)
+
+def route_message(message):
+    """فحص مبدئي رخيص يحدد مسار الرسالة قبل أي معالجة ثقيلة
+
+    إجابات الألعاب تُسلَّم لجلساتها هنا، فلا تمر على الردود التلقائية
+    """
+    content = message.content
+    if content.startswith(COMMAND_PREFIX):
+        # أوامر البوتات الأخرى لا تُنفذ
+        return ROUTE_IGNORE if message.author.bot else ROUTE_COMMAND
+    if game_router.dispatch(message):
+        return ROUTE_GAME
+    if not content:
+        return ROUTE_IGNORE
+    return ROUTE_AUTO_REPLY
+
+async def handle_message(message, route):
+    """معالجة الرسالة داخل عامل الطابور: الأوامر أو الرد التلقائي"""
+    guild_id = str(message.guild.id) if message.guild else 'dm'
+    started = time.perf_counter()
+    try:
+        if route is ROUTE_COMMAND:
+            # Context وتحليل الأمر يُبنيان لرسائل الأوامر فقط، وردودها تمر عبر جدولة القناة
+            with metrics.timer('stage', 'commands'):
+                await bot.invoke(await bot.get_context(message, cls=ScheduledContext))
         else:
-            continue
-        break
+            await auto_reply(message, guild_id, str(message.channel.id))
+    finally:
+        if metrics.enabled:
+            elapsed = time.perf_counter() - started
+            metrics.observe('handler', None, elapsed)
+            metrics.observe_guild(guild_id, elapsed)
+
+# طابور المعالجة: عمال ثابتون، ورسائل القناة الواحدة بالترتيب حتى بعد فصل معالجها
+pipeline = MessagePipeline(
+    handle_message,
+    workers=int(os.getenv('MESSAGE_WORKERS', DEFAULT_WORKERS)),
+    queue_size=int(os.getenv('MESSAGE_QUEUE_SIZE', DEFAULT_QUEUE_SIZE)),
+    max_detached=int(os.getenv('MESSAGE_MAX_DETACHED', MAX_DETACHED)),
+    metrics=metrics if metrics.enabled else None
+)
+bot.pipeline = pipeline
+
+async def auto_reply(message, guild_id, channel_id):
+    """مراحل الرد التلقائي: البوابة، مسح الكلمات، الإرسال"""
+    with metrics.timer('stage', 'gate'):
+        # إذا لم يتم تحديد قنوات نشطة، تفاعل في جميع القنوات
+        active = channel_store.is_channel_active(guild_id, channel_id)
+        settings = channel_store.resolve_settings(guild_id, channel_id) if active else None
     
-    # معالجة الأوامر
-    await bot.process_commands(message)
+    # إعدادات القناة ونسبة الرد تُفحص قبل أي مسح للكلمات
+    if active and settings.auto_react and random.randint(1, 100) <= settings.response_chance:
+        with metrics.timer('stage', 'scan'):
+            # التفاعل مع الرسائل العربية (النص الموحد يُحسب مرة واحدة لكل رسالة)
+            content = get_normalized_content(message)
+            
+            # الردود المخصصة للخادم تسبق الكلمات العامة
+            trigger, response = guild_triggers.pick(guild_id, content)
+            
+            # البحث عن كلمات مفتاحية والرد عليها
+            category = keyword_matcher.find_category(content) if trigger is None else None
+        
+        if trigger is not None:
+            metrics.inc('matches', 'custom')
+            with metrics.timer('stage', 'send'):
+                sent = await outbound.send_auto_reply(message.channel, response, key=f'custom:{trigger}')
+            if sent is not None:
+                metrics.inc('replies')
+        elif category and (settings.time_greetings or category not in TIME_GREETING_CATEGORIES):
+            metrics.inc('matches', category)
+            response = response_engine.pick(PACK_REPLIES, category, message.channel.id)
+            if response is None:
+                # كلمة بلا ردود (فئة من حزمة أخرى): لا يُرسل شيء
+                return
+            with metrics.timer('stage', 'send'):
+                sent = await outbound.send_auto_reply(message.channel, response, key=category)
+            if sent is not None:
+                metrics.inc('replies')
+
+@bot.before_invoke
+async def before_command(ctx):
+    """انتظار تحميل حالة الخادم قبل أي تعديل"""
+    if ctx.guild is not None:
+        await channel_store.load_guild(ctx.guild.id)
+    if metrics.enabled:
+        ctx.metrics_started = time.perf_counter()
+
+@bot.after_invoke
+async def after_command(ctx):
+    """تسجيل عدد الأوامر وزمن تنفيذها"""
+    activity.record_command(ctx.guild.id if ctx.guild else 'dm', ctx.author.id)
+    started = getattr(ctx, 'metrics_started', None)
+    if started is not None:
+        name = ctx.command.qualified_name
+        metrics.inc('commands', name)
+        metrics.observe('command', name, time.perf_counter() - started)
 
 @bot.command(name='مرحبا', aliases=['اهلا', 'هلا'])
 async def hello_command(ctx):
     """أمر الترحيب"""
-    response = random.choice(ARABIC_RESPONSES['greetings'])
+    response = response_engine.pick(PACK_REPLIES, 'greetings', ctx.channel.id)
     await ctx.send(f'{response} {ctx.author.mention}')
 
 @bot.command(name='مساعدة', aliases=['help_ar'])
 async def help_arabic(ctx):
     """عرض قائمة الأوامر بالعربية"""
-    embed = discord.Embed(
-        title="🤖 أوامر البوت العربي",
-        description="قائمة بجميع الأوامر المتاحة",
-        color=0x00ff00
-    )
-    
-    embed.add_field(
-        name="🎯 الأوامر الأساسية",
-        value="""
-        `!مرحبا` - ترحيب
-        `!مساعدة` - عرض هذه القائمة
-        `!حالة` - عرض حالة البوت
-        `!تفعيل_القناة` - تفعيل التفاعل في هذه القناة
-        `!إلغاء_القناة` - إلغاء التفاعل في هذه القناة
-        `!القنوات_النشطة` - عرض القنوات النشطة
-        """,
-        inline=False
-    )
-    
-    embed.add_field(
-        name="💬 التفاعل التلقائي",
-        value="البوت يتفاعل تلقائياً مع الكلمات العربية مثل: مرحبا، شكراً، صباح الخير، مساء الخير",
-        inline=False
-    )
-    
-    embed.set_footer(text="البوت العربي التفاعلي 🇸🇦")
-    
-    await ctx.send(embed=embed)
+    await ctx.send(embed=HELP_TEMPLATE.build())
 
 @bot.command(name='حالة')
-async def status_command(ctx):
-    """عرض حالة البوت"""
-    embed = discord.Embed(
-        title="📊 حالة البوت",
-        color=0x0099ff
-    )
-    
-    embed.add_field(name="🟢 الحالة", value="متصل وجاهز", inline=True)
-    embed.add_field(name="📡 زمن الاستجابة", value=f"{round(bot.latency * 1000)}ms", inline=True)
-    embed.add_field(name="🏠 الخوادم", value=len(bot.guilds), inline=True)
-    embed.add_field(name="👥 المستخدمين", value=len(bot.users), inline=True)
+async def status_command(ctx, section=None):
+    """عرض حالة البوت (أو تقرير الأداء مع: !حالة أداء)"""
+    if section in ('أداء', 'perf'):
+        await ctx.send(embed=performance_embed())
+        return
     
-    guild_id = str(ctx.guild.id)
-    active_count = len(active_channels.get(guild_id, []))
-    embed.add_field(name="📺 القنوات النشطة", value=active_count, inline=True)
+    stats = outbound.stats()
+    # زمن الاستجابة inf قبل أول نبضة
+    latency = latency_ms(bot.latency)
+    embed = STATUS_TEMPLATE.render(
+        latency=f"{latency}ms" if latency is not None else "—",
+        guilds=len(bot.guilds),
+        users=count_users(),
+        active_channels=len(channel_store.get_active_channels(ctx.guild.id if ctx.guild else 'dm')),
+        shards=format_shard_stats(shard_stats(bot)),
+        **stats
+    )
     
     await ctx.send(embed=embed)
 
+def count_users():
+    """عدد المستخدمين: من الذاكرة، أو تقريبياً من بيانات الخوادم في وضع الذاكرة المنخفضة"""
+    if not LOW_MEMORY:
+        return len(bot.users)
+    return f"~{sum(guild.member_count or 0 for guild in bot.guilds)}"
+
+def performance_embed():
+    """تقرير زمن المعالجة والعدادات"""
+    embed = discord.Embed(title="📈 أداء البوت", color=0x0099ff)
+    if not metrics.enabled:
+        embed.description = "القياس معطل (METRICS_ENABLED=0)"
+        return embed
+    for name, value in format_report(metrics):
+        embed.add_field(name=name, value=value[:1024], inline=False)
+    return embed
+
 @bot.command(name='تفعيل_القناة')
 @commands.has_permissions(manage_channels=True)
 async def activate_channel(ctx):
     """تفعيل التفاعل في القناة الحالية"""
-    guild_id = str(ctx.guild.id)
-    channel_id = str(ctx.channel.id)
-    
-    if guild_id not in active_channels:
-        active_channels[guild_id] = []
-    
-    if channel_id not in active_channels[guild_id]:
-        active_channels[guild_id].append(channel_id)
-        save_active_channels(active_channels)
+    if channel_store.activate_channel(ctx.guild.id, ctx.channel.id):
         await ctx.send(f"✅ تم تفعيل التفاعل في قناة {ctx.channel.mention}")
     else:
         await ctx.send(f"ℹ️ القناة {ctx.channel.mention} مفعلة مسبقاً")
@@ -226,12 +405,7 @@ async def activate_channel(ctx):
 @commands.has_permissions(manage_channels=True)
 async def deactivate_channel(ctx):
     """إلغاء التفاعل في القناة الحالية"""
-    guild_id = str(ctx.guild.id)
-    channel_id = str(ctx.channel.id)
-    
-    if guild_id in active_channels and channel_id in active_channels[guild_id]:
-        active_channels[guild_id].remove(channel_id)
-        save_active_channels(active_channels)
+    if channel_store.deactivate_channel(ctx.guild.id, ctx.channel.id):
         await ctx.send(f"❌ تم إلغاء التفاعل في قناة {ctx.channel.mention}")
     else:
         await ctx.send(f"ℹ️ القناة {ctx.channel.mention} غير مفعلة")
@@ -239,9 +413,9 @@ async def deactivate_channel(ctx):
 @bot.command(name='القنوات_النشطة')
 async def list_active_channels(ctx):
     """عرض قائمة القنوات النشطة"""
-    guild_id = str(ctx.guild.id)
+    active_channels = channel_store.get_active_channels(ctx.guild.id)
     
-    if guild_id not in active_channels or not active_channels[guild_id]:
+    if not active_channels:
         await ctx.send("📭 لا توجد قنوات نشطة حالياً")
         return
     
@@ -252,7 +426,7 @@ async def list_active_channels(ctx):
     )
     
     channels_list = []
-    for channel_id in active_channels[guild_id]:
+    for channel_id in sorted(active_channels):
         channel = bot.get_channel(int(channel_id))
         if channel:
             channels_list.append(f"• {channel.mention}")
@@ -275,6 +449,7 @@ async def list_active_channels(ctx):
 @bot.event
 async def on_command_error(ctx, error):
     """التعامل مع أخطاء الأوامر"""
+    metrics.inc('errors', type(error).__name__)
     if isinstance(error, commands.MissingPermissions):
         await ctx.send("❌ ليس لديك الصلاحيات المطلوبة لتنفيذ هذا الأمر")
     elif isinstance(error, commands.CommandNotFound):
@@ -283,36 +458,73 @@ async def on_command_error(ctx, error):
         print(f"خطأ: {error}")
         await ctx.send("❌ حدث خطأ أثناء تنفيذ الأمر")
 
+# الإضافات المطلوبة لجاهزية البوت
+EXTENSIONS = ['advanced_commands', 'channel_manager']
+
 # تحميل الإضافات
-async def load_extensions():
-    """تحميل جميع الإضافات"""
+async def load_extension(name):
+    """تحميل إضافة واحدة وتسجيل زمنها، وفشلها لا يمنع تحميل غيرها"""
+    started = time.perf_counter()
     try:
-        await bot.load_extension('advanced_commands')
-        print("✅ تم تحميل الأوامر المتقدمة")
-        
-        await bot.load_extension('channel_manager')
-        print("✅ تم تحميل مدير القنوات")
+        await bot.load_extension(name)
     except Exception as e:
-        print(f"❌ خطأ في تحميل الإضافات: {e}")
+        print(f"❌ خطأ في تحميل الإضافة {name}: {e}")
+        return False
+    finally:
+        startup.record(name, time.perf_counter() - started, parent='extensions')
+    print(f"✅ تم تحميل {name}")
+    return True
+
+async def load_extensions():
+    """تحميل جميع الإضافات معاً، ويرجع عدد ما تم تحميله"""
+    startup.mark('setup')
+    loaded = await asyncio.gather(*(load_extension(name) for name in EXTENSIONS))
+    startup.mark('extensions')
+    return sum(loaded)
 
 # تشغيل البوت
 async def main():
-    """الدالة الرئيسية لتشغيل البوت"""
+    """الدالة الرئيسية لتشغيل البوت، وترجع رمز الخروج"""
     await load_extensions()
     
     token = os.getenv('DISCORD_TOKEN')
     if not token:
         print("❌ خطأ: لم يتم العثور على توكن البوت في ملف .env")
         print("يرجى إضافة DISCORD_TOKEN=your_token_here في ملف .env")
-        return
+        return EXIT_CONFIG_ERROR
+    
+    # خادم الصحة والمقاييس على حلقة الأحداث نفسها
+    health_server = HealthServer(bot, EXTENSIONS, port=int(os.getenv('PORT', DEFAULT_PORT)))
+    try:
+        await health_server.start()
+    except OSError as e:
+        print(f"⚠️ تعذر تشغيل خادم الصحة: {e}")
+    startup.mark('health_server')
+    
+    # متابعة تغييرات العمليات الأخرى عند مشاركة قاعدة SQLite (وضع العنقود)
+    channel_store.start_sync()
     
+    code = EXIT_OK
     try:
         await bot.start(token)
     except discord.LoginFailure:
         print("❌ خطأ في تسجيل الدخول: تحقق من صحة التوكن")
+        code = EXIT_CONFIG_ERROR
+    except discord.PrivilegedIntentsRequired:
+        print("❌ يجب تفعيل Message Content Intent للبوت في بوابة المطورين")
+        code = EXIT_CONFIG_ERROR
     except Exception as e:
         print(f"❌ خطأ في تشغيل البوت: {e}")
+        code = EXIT_FAILURE
+    finally:
+        await health_server.stop()
+        await pipeline.close()
+        # حفظ حالة القنوات المعلقة قبل الخروج
+        await channel_store.close()
+        await activity.close()
+        await leaderboard.close()
+    return code
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
 
@@ -3,116 +3,99 @@
 
 import discord
 from discord.ext import commands
-import json
-import os
 from datetime import datetime
+from channel_store import get_channel_store
+from guild_triggers import normalize_trigger, MAX_TRIGGERS, MAX_RESPONSES, MAX_TRIGGER_LENGTH, MAX_RESPONSE_LENGTH
+from embed_templates import EmbedTemplate, register_template
+
+# قوالب الإمبد الخاصة بإدارة القنوات
+CHANNEL_HELP_TEMPLATE = register_template('channel_help', EmbedTemplate(
+    title="📺 إدارة القنوات",
+    description="أوامر إدارة القنوات والتحكم في التفاعل",
+    color=0x3498db,
+    fields=[
+        ("🔧 الأوامر المتاحة", """
+            `!قناة تفعيل` - تفعيل التفاعل في هذه القناة
+            `!قناة إلغاء` - إلغاء التفاعل في هذه القناة
+            `!قناة قائمة` - عرض القنوات النشطة
+            `!قناة إعدادات` - عرض إعدادات القناة
+            `!قناة تخصيص` - تخصيص إعدادات القناة
+            `!قناة رد` - الردود المخصصة للخادم
+            `!قناة مسح` - مسح جميع الإعدادات
+            """, False)
+    ]
+))
+
+SETTINGS_TEMPLATE = register_template('channel_settings', EmbedTemplate(
+    title="⚙️ إعدادات {channel_name}",
+    color=0xf39c12,
+    fields=[
+        ("🤖 التفاعل التلقائي", "{auto_react}", True),
+        ("🎲 نسبة الرد", "{response_chance}%", True),
+        ("👋 رسائل الترحيب", "{welcome_messages}", True),
+        ("🕐 تحيات الوقت", "{time_greetings}", True),
+        ("🎮 الألعاب", "{games_enabled}", True)
+    ],
+    footer="استخدم !قناة تخصيص لتعديل الإعدادات"
+))
+
+CUSTOMIZE_HELP_TEMPLATE = register_template('channel_customize_help', EmbedTemplate(
+    title="⚙️ الإعدادات المتاحة",
+    description="استخدم: `!قناة تخصيص <الإعداد> <القيمة>`",
+    color=0xf39c12,
+    fields=[
+        ("📝 الإعدادات", """
+                `auto_react` - التفاعل التلقائي (true/false)
+                `response_chance` - نسبة الرد (1-100)
+                `welcome_messages` - رسائل الترحيب (true/false)
+                `time_greetings` - تحيات الوقت (true/false)
+                `games_enabled` - الألعاب (true/false)
+                """, False)
+    ]
+))
+
+TRIGGERS_HELP_TEMPLATE = register_template('channel_triggers_help', EmbedTemplate(
+    title="💬 الردود المخصصة",
+    description="ردود خاصة بهذا الخادم تسبق الردود العامة",
+    color=0x1abc9c,
+    fields=[
+        ("🔧 الأوامر", """
+                `!قناة رد إضافة <الكلمة> | <الرد>` - إضافة رد (تكرارها يضيف ردوداً بديلة)
+                `!قناة رد حذف <الكلمة>` - حذف الكلمة وكل ردودها
+                """, False)
+    ]
+))
+
+def _status(enabled):
+    """نص حالة الإعداد"""
+    return "✅ مفعل" if enabled else "❌ معطل"
 
 class ChannelManager(commands.Cog):
     """مدير القنوات للبوت العربي"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.channels_file = 'active_channels.json'
-        self.settings_file = 'channel_settings.json'
-        self.active_channels = self.load_active_channels()
-        self.channel_settings = self.load_channel_settings()
-    
-    def load_active_channels(self):
-        """تحميل قائمة القنوات النشطة"""
-        try:
-            with open(self.channels_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-    
-    def save_active_channels(self):
-        """حفظ قائمة القنوات النشطة"""
-        with open(self.channels_file, 'w', encoding='utf-8') as f:
-            json.dump(self.active_channels, f, ensure_ascii=False, indent=2)
-    
-    def load_channel_settings(self):
-        """تحميل إعدادات القنوات"""
-        try:
-            with open(self.settings_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-    
-    def save_channel_settings(self):
-        """حفظ إعدادات القنوات"""
-        with open(self.settings_file, 'w', encoding='utf-8') as f:
-            json.dump(self.channel_settings, f, ensure_ascii=False, indent=2)
+        # نفس المخزن الذي يستخدمه البوت الأساسي، دون تحميل ثانٍ للملفات
+        self.store = get_channel_store(bot)
     
     def is_channel_active(self, guild_id, channel_id):
         """التحقق من نشاط القناة"""
-        guild_str = str(guild_id)
-        channel_str = str(channel_id)
-        
-        # إذا لم يتم تحديد قنوات للخادم، فجميع القنوات نشطة
-        if guild_str not in self.active_channels:
-            return True
-        
-        # إذا كانت القائمة فارغة، فجميع القنوات نشطة
-        if not self.active_channels[guild_str]:
-            return True
-        
-        return channel_str in self.active_channels[guild_str]
+        return self.store.is_channel_active(guild_id, channel_id)
     
     def get_channel_settings(self, guild_id, channel_id):
         """الحصول على إعدادات القناة"""
-        guild_str = str(guild_id)
-        channel_str = str(channel_id)
-        
-        if guild_str in self.channel_settings and channel_str in self.channel_settings[guild_str]:
-            return self.channel_settings[guild_str][channel_str]
-        
-        # الإعدادات الافتراضية
-        return {
-            'auto_react': True,
-            'response_chance': 30,  # نسبة الرد التلقائي
-            'welcome_messages': True,
-            'time_greetings': True,
-            'games_enabled': True
-        }
+        return self.store.get_channel_settings(guild_id, channel_id)
     
     @commands.group(name='قناة', aliases=['channel'], invoke_without_command=True)
     async def channel_group(self, ctx):
         """مجموعة أوامر إدارة القنوات"""
-        embed = discord.Embed(
-            title="📺 إدارة القنوات",
-            description="أوامر إدارة القنوات والتحكم في التفاعل",
-            color=0x3498db
-        )
-        
-        embed.add_field(
-            name="🔧 الأوامر المتاحة",
-            value="""
-            `!قناة تفعيل` - تفعيل التفاعل في هذه القناة
-            `!قناة إلغاء` - إلغاء التفاعل في هذه القناة
-            `!قناة قائمة` - عرض القنوات النشطة
-            `!قناة إعدادات` - عرض إعدادات القناة
-            `!قناة تخصيص` - تخصيص إعدادات القناة
-            `!قناة مسح` - مسح جميع الإعدادات
-            """,
-            inline=False
-        )
-        
-        await ctx.send(embed=embed)
+        await ctx.send(embed=CHANNEL_HELP_TEMPLATE.build())
     
     @channel_group.command(name='تفعيل', aliases=['activate', 'enable'])
     @commands.has_permissions(manage_channels=True)
     async def activate_channel(self, ctx):
         """تفعيل التفاعل في القناة الحالية"""
-        guild_id = str(ctx.guild.id)
-        channel_id = str(ctx.channel.id)
-        
-        if guild_id not in self.active_channels:
-            self.active_channels[guild_id] = []
-        
-        if channel_id not in self.active_channels[guild_id]:
-            self.active_channels[guild_id].append(channel_id)
-            self.save_active_channels()
-            
+        if self.store.activate_channel(ctx.guild.id, ctx.channel.id):
             embed = discord.Embed(
                 title="✅ تم التفعيل",
                 description=f"تم تفعيل التفاعل في قناة {ctx.channel.mention}",
@@ -120,7 +103,7 @@ class ChannelManager(commands.Cog):
             )
             embed.add_field(
                 name="📊 الإحصائيات",
-                value=f"القنوات النشطة: {len(self.active_channels[guild_id])}",
+                value=f"القنوات النشطة: {len(self.store.get_active_channels(ctx.guild.id))}",
                 inline=True
             )
         else:
@@ -136,13 +119,7 @@ class ChannelManager(commands.Cog):
     @commands.has_permissions(manage_channels=True)
     async def deactivate_channel(self, ctx):
         """إلغاء التفاعل في القناة الحالية"""
-        guild_id = str(ctx.guild.id)
-        channel_id = str(ctx.channel.id)
-        
-        if guild_id in self.active_channels and channel_id in self.active_channels[guild_id]:
-            self.active_channels[guild_id].remove(channel_id)
-            self.save_active_channels()
-            
+        if self.store.deactivate_channel(ctx.guild.id, ctx.channel.id):
             embed = discord.Embed(
                 title="❌ تم الإلغاء",
                 description=f"تم إلغاء التفاعل في قناة {ctx.channel.mention}",
@@ -160,14 +137,14 @@ class ChannelManager(commands.Cog):
     @channel_group.command(name='قائمة', aliases=['list', 'show'])
     async def list_channels(self, ctx):
         """عرض قائمة القنوات النشطة"""
-        guild_id = str(ctx.guild.id)
+        active_channels = self.store.get_active_channels(ctx.guild.id)
         
         embed = discord.Embed(
             title="📺 القنوات النشطة",
             color=0x9b59b6
         )
         
-        if guild_id not in self.active_channels or not self.active_channels[guild_id]:
+        if not active_channels:
             embed.description = "🌐 جميع القنوات نشطة (لم يتم تحديد قنوات محددة)"
             embed.add_field(
                 name="💡 نصيحة",
@@ -176,11 +153,11 @@ class ChannelManager(commands.Cog):
             )
         else:
             channels_list = []
-            for channel_id in self.active_channels[guild_id]:
+            for channel_id in sorted(active_channels):
                 channel = self.bot.get_channel(int(channel_id))
                 if channel:
-                    settings = self.get_channel_settings(ctx.guild.id, channel_id)
-                    status = "🟢" if settings['auto_react'] else "🟡"
+                    settings = self.store.resolve_settings(ctx.guild.id, channel_id)
+                    status = "🟢" if settings.auto_react else "🟡"
                     channels_list.append(f"{status} {channel.mention}")
             
             if channels_list:
@@ -199,45 +176,17 @@ class ChannelManager(commands.Cog):
     @channel_group.command(name='إعدادات', aliases=['settings', 'config'])
     async def channel_settings(self, ctx):
         """عرض إعدادات القناة الحالية"""
-        settings = self.get_channel_settings(ctx.guild.id, ctx.channel.id)
-        
-        embed = discord.Embed(
-            title=f"⚙️ إعدادات {ctx.channel.name}",
-            color=0xf39c12
-        )
-        
-        embed.add_field(
-            name="🤖 التفاعل التلقائي",
-            value="✅ مفعل" if settings['auto_react'] else "❌ معطل",
-            inline=True
+        settings = self.store.resolve_settings(ctx.guild.id, ctx.channel.id)
+        
+        embed = SETTINGS_TEMPLATE.render(
+            channel_name=ctx.channel.name,
+            auto_react=_status(settings.auto_react),
+            response_chance=settings.response_chance,
+            welcome_messages=_status(settings.welcome_messages),
+            time_greetings=_status(settings.time_greetings),
+            games_enabled=_status(settings.games_enabled)
         )
         
-        embed.add_field(
-            name="🎲 نسبة الرد",
-            value=f"{settings['response_chance']}%",
-            inline=True
-        )
-        
-        embed.add_field(
-            name="👋 رسائل الترحيب",
-            value="✅ مفعل" if settings['welcome_messages'] else "❌ معطل",
-            inline=True
-        )
-        
-        embed.add_field(
-            name="🕐 تحيات الوقت",
-            value="✅ مفعل" if settings['time_greetings'] else "❌ معطل",
-            inline=True
-        )
-        
-        embed.add_field(
-            name="🎮 الألعاب",
-            value="✅ مفعل" if settings['games_enabled'] else "❌ معطل",
-            inline=True
-        )
-        
-        embed.set_footer(text="استخدم !قناة تخصيص لتعديل الإعدادات")
-        
         await ctx.send(embed=embed)
     
     @channel_group.command(name='تخصيص', aliases=['customize', 'set'])
@@ -245,45 +194,16 @@ class ChannelManager(commands.Cog):
     async def customize_channel(self, ctx, setting=None, value=None):
         """تخصيص إعدادات القناة"""
         if not setting:
-            embed = discord.Embed(
-                title="⚙️ الإعدادات المتاحة",
-                description="استخدم: `!قناة تخصيص <الإعداد> <القيمة>`",
-                color=0xf39c12
-            )
-            
-            embed.add_field(
-                name="📝 الإعدادات",
-                value="""
-                `auto_react` - التفاعل التلقائي (true/false)
-                `response_chance` - نسبة الرد (1-100)
-                `welcome_messages` - رسائل الترحيب (true/false)
-                `time_greetings` - تحيات الوقت (true/false)
-                `games_enabled` - الألعاب (true/false)
-                """,
-                inline=False
-            )
-            
-            await ctx.send(embed=embed)
+            await ctx.send(embed=CUSTOMIZE_HELP_TEMPLATE.build())
             return
         
-        guild_str = str(ctx.guild.id)
-        channel_str = str(ctx.channel.id)
-        
-        # إنشاء الإعدادات إذا لم تكن موجودة
-        if guild_str not in self.channel_settings:
-            self.channel_settings[guild_str] = {}
-        if channel_str not in self.channel_settings[guild_str]:
-            self.channel_settings[guild_str][channel_str] = self.get_channel_settings(ctx.guild.id, ctx.channel.id)
-        
-        settings = self.channel_settings[guild_str][channel_str]
-        
         # تحديث الإعداد
         if setting in ['auto_react', 'welcome_messages', 'time_greetings', 'games_enabled']:
             if value.lower() in ['true', '1', 'نعم', 'مفعل']:
-                settings[setting] = True
+                new_value = True
                 status = "✅ مفعل"
             elif value.lower() in ['false', '0', 'لا', 'معطل']:
-                settings[setting] = False
+                new_value = False
                 status = "❌ معطل"
             else:
                 await ctx.send("❌ قيمة غير صحيحة. استخدم: true/false أو نعم/لا")
@@ -293,7 +213,7 @@ class ChannelManager(commands.Cog):
             try:
                 chance = int(value)
                 if 1 <= chance <= 100:
-                    settings[setting] = chance
+                    new_value = chance
                     status = f"{chance}%"
                 else:
                     await ctx.send("❌ النسبة يجب أن تكون بين 1 و 100")
@@ -307,7 +227,7 @@ class ChannelManager(commands.Cog):
             return
         
         # حفظ الإعدادات
-        self.save_channel_settings()
+        self.store.set_channel_setting(ctx.guild.id, ctx.channel.id, setting, new_value)
         
         embed = discord.Embed(
             title="✅ تم التحديث",
@@ -317,25 +237,75 @@ class ChannelManager(commands.Cog):
         
         await ctx.send(embed=embed)
     
+    @channel_group.group(name='رد', aliases=['trigger', 'triggers'], invoke_without_command=True)
+    async def triggers_group(self, ctx):
+        """عرض الردود المخصصة للخادم"""
+        pack = self.store.get_triggers(ctx.guild.id)
+        if not pack:
+            await ctx.send(embed=TRIGGERS_HELP_TEMPLATE.build())
+            return
+        
+        embed = discord.Embed(
+            title="💬 الردود المخصصة",
+            color=0x1abc9c
+        )
+        embed.description = "\n".join(
+            f"`{trigger}` ← {len(responses)} رد" for trigger, responses in sorted(pack.items())
+        )
+        embed.set_footer(text=f"{len(pack)}/{MAX_TRIGGERS} كلمة")
+        await ctx.send(embed=embed)
+    
+    @triggers_group.command(name='إضافة', aliases=['add'])
+    @commands.has_permissions(manage_channels=True)
+    async def add_trigger(self, ctx, *, text=None):
+        """إضافة رد مخصص: الكلمة | الرد"""
+        trigger, _, response = (text or '').partition('|')
+        trigger = normalize_trigger(trigger)
+        response = response.strip()
+        if not trigger or not response:
+            await ctx.send("❌ الصيغة: `!قناة رد إضافة <الكلمة> | <الرد>`")
+            return
+        if len(trigger) > MAX_TRIGGER_LENGTH or len(response) > MAX_RESPONSE_LENGTH:
+            await ctx.send(f"❌ الحد الأقصى {MAX_TRIGGER_LENGTH} حرفاً للكلمة و{MAX_RESPONSE_LENGTH} للرد")
+            return
+        
+        pack = self.store.get_triggers(ctx.guild.id) or {}
+        if trigger not in pack and len(pack) >= MAX_TRIGGERS:
+            await ctx.send(f"❌ وصل الخادم للحد الأقصى ({MAX_TRIGGERS} كلمة)")
+            return
+        if len(pack.get(trigger, ())) >= MAX_RESPONSES:
+            await ctx.send(f"❌ وصلت الكلمة للحد الأقصى ({MAX_RESPONSES} ردود)")
+            return
+        
+        count = self.store.add_trigger(ctx.guild.id, trigger, response)
+        embed = discord.Embed(
+            title="✅ تمت الإضافة",
+            description=f"`{trigger}` ← {response}",
+            color=0x2ecc71
+        )
+        embed.set_footer(text=f"عدد ردود الكلمة: {count}")
+        await ctx.send(embed=embed)
+    
+    @triggers_group.command(name='حذف', aliases=['remove', 'delete'])
+    @commands.has_permissions(manage_channels=True)
+    async def remove_trigger(self, ctx, *, text=None):
+        """حذف كلمة مخصصة بكل ردودها"""
+        trigger = normalize_trigger(text or '')
+        if self.store.remove_trigger(ctx.guild.id, trigger):
+            await ctx.send(f"🗑️ تم حذف الرد المخصص `{trigger}`")
+        else:
+            await ctx.send("❌ لا يوجد رد مخصص بهذه الكلمة")
+    
     @channel_group.command(name='مسح', aliases=['reset', 'clear'])
     @commands.has_permissions(administrator=True)
     async def reset_settings(self, ctx):
         """مسح جميع إعدادات الخادم"""
-        guild_str = str(ctx.guild.id)
-        
-        # مسح القنوات النشطة
-        if guild_str in self.active_channels:
-            del self.active_channels[guild_str]
-            self.save_active_channels()
-        
-        # مسح إعدادات القنوات
-        if guild_str in self.channel_settings:
-            del self.channel_settings[guild_str]
-            self.save_channel_settings()
+        # مسح القنوات النشطة وإعدادات القنوات
+        self.store.reset_guild(ctx.guild.id)
         
         embed = discord.Embed(
             title="🗑️ تم المسح",
-            description="تم مسح جميع إعدادات القنوات والتفاعل في الخادم",
+            description="تم مسح جميع إعدادات القنوات والتفاعل والردود المخصصة في الخادم",
             color=0xe74c3c
         )
         embed.add_field(
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+مخزن حالة القنوات المشترك
+نسخة واحدة في الذاكرة يقرأ منها البوت الأساسي ومدير القنوات
+"""
+
+import asyncio
+import os
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+
+from persistence import WriteBehind
+from storage import create_backend
+
+# مهلة تجميع التغييرات قبل الحفظ (بالثواني)
+FLUSH_DELAY = 2.0
+
+# الفاصل بين فحوصات تغييرات العمليات الأخرى على التخزين المشترك (بالثواني)
+SYNC_INTERVAL = 2.0
+
+# عدد الخوادم التي تبقى إعدادات قنواتها المدمجة في الذاكرة
+RESOLVED_CACHE_SIZE = 1000
+
+# الإعدادات الافتراضية لكل قناة
+DEFAULT_CHANNEL_SETTINGS = {
+    'auto_react': True,
+    'response_chance': 30,  # نسبة الرد التلقائي
+    'welcome_messages': True,
+    'time_greetings': True,
+    'games_enabled': True
+}
+
+# نسخة للقراءة فقط تُعاد للقنوات غير المخصصة بدل إنشاء قاموس جديد كل مرة
+_DEFAULT_SETTINGS_VIEW = MappingProxyType(DEFAULT_CHANNEL_SETTINGS)
+
+# إعدادات القناة بعد دمجها مع الافتراضية، كائن ثابت يُقرأ في مسار الرسائل
+ResolvedSettings = namedtuple('ResolvedSettings', list(DEFAULT_CHANNEL_SETTINGS))
+
+_DEFAULT_RESOLVED = ResolvedSettings(**DEFAULT_CHANNEL_SETTINGS)
+
+
+class ChannelStore:
+    """حالة القنوات النشطة وإعداداتها لكل خادم"""
+
+    def __init__(self, backend=None, flush_delay=FLUSH_DELAY, resolved_cache_size=RESOLVED_CACHE_SIZE):
+        self.backend = backend or create_backend()
+        self.writer = WriteBehind(self._snapshot, self.backend.write, flush_delay)
+        # {guild_id: set(channel_id)} للتحقق من العضوية بزمن ثابت
+        self.active_channels = {}
+        self.channel_settings = {}
+        # {guild_id: {channel_id: ResolvedSettings}} بترتيب آخر استخدام، ويُمسح عند تعديل الإعدادات
+        self._resolved = OrderedDict()
+        self.resolved_cache_size = resolved_cache_size
+        # {guild_id: {trigger: (ردود)}} الردود المخصصة لكل خادم
+        # يُستبدل قاموس الخادم كاملاً عند كل تعديل، فتكفي مقارنة الهوية لاكتشاف التغيير
+        self.custom_triggers = {}
+        # الخوادم المحملة من واجهة التخزين (عند التحميل الكسول فقط)
+        self._loaded_guilds = set()
+        # {guild_id: Task} تحميلات جارية في خيط منفصل
+        self._loading = {}
+        self._lazy = self.backend.lazy
+        # جاهزية المخزن لـ /readyz: التحميل الكسول لا يحتاج قراءة أولية، وغيره بعد اكتمال قراءة الكل
+        self.loaded = self._lazy
+        if not self._lazy:
+            self.active_channels, self.channel_settings, triggers = self.backend.load_all()
+            self.custom_triggers = {
+                guild_str: {trigger: tuple(responses) for trigger, responses in pack.items()}
+                for guild_str, pack in triggers.items()
+            }
+            self.loaded = True
+        # تتبع تغييرات العمليات الأخرى (التخزين المشترك فقط)
+        self._shared = getattr(self.backend, 'shared', False)
+        self._seen_version = self.backend.current_version() if self._shared else 0
+        self._data_version = None
+        self._stale_guilds = set()
+        self._sync_task = None
+
+    def _ensure_guild(self, guild_str):
+        """تحميل الخادم من واجهة التخزين عند أول طلب
+
+        داخل حلقة الأحداث يُقرأ في خيط منفصل، ويُعامل الخادم بالإعدادات الافتراضية حتى يكتمل
+        """
+        if not self._lazy or guild_str in self._loaded_guilds:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # لا توجد حلقة أحداث (سكربتات وأدوات): تحميل فوري
+            self._apply_guild(guild_str, self.backend.load_guild(guild_str))
+            return
+        if guild_str not in self._loading:
+            self._loading[guild_str] = loop.create_task(self._load_guild(guild_str))
+
+    def _require_guild(self, guild_str):
+        """تحميل الخادم فوراً قبل تعديله (الأوامر تنتظر load_guild مسبقاً فلا يُستخدم عادة)"""
+        if self._lazy and guild_str not in self._loaded_guilds:
+            self._loading.pop(guild_str, None)
+            self._apply_guild(guild_str, self.backend.load_guild(guild_str))
+
+    def _apply_guild(self, guild_str, loaded):
+        """وضع بيانات الخادم المحملة في الذاكرة"""
+        channels, settings, triggers = loaded
+        if channels:
+            self.active_channels[guild_str] = channels
+        if settings:
+            self.channel_settings[guild_str] = settings
+        if triggers:
+            self.custom_triggers[guild_str] = {
+                trigger: tuple(responses) for trigger, responses in triggers.items()
+            }
+        # الإعدادات المحسوبة قبل التحميل كانت الافتراضية
+        self._resolved.pop(guild_str, None)
+        self._loaded_guilds.add(guild_str)
+
+    async def _load_guild(self, guild_str):
+        """قراءة الخادم في خيط منفصل دون تداخل مع حفظ جارٍ"""
+        task = asyncio.current_task()
+        try:
+            loaded = await self.writer.read(self.backend.load_guild, guild_str)
+        except Exception as e:
+            print(f"❌ خطأ في تحميل الخادم {guild_str}: {e}")
+            loaded = None
+        # أُسقط الخادم أثناء التحميل (مزامنة) أو حُمّل فوراً قبل تعديل
+        if self._loading.get(guild_str) is not task:
+            return
+        del self._loading[guild_str]
+        if loaded is not None and guild_str not in self._loaded_guilds:
+            self._apply_guild(guild_str, loaded)
+
+    async def load_guild(self, guild_id):
+        """انتظار تحميل الخادم، يُستدعى قبل الأوامر حتى لا تُعدّل بيانات لم تُقرأ بعد"""
+        guild_str = str(guild_id)
+        self._ensure_guild(guild_str)
+        task = self._loading.get(guild_str)
+        if task is not None:
+            await asyncio.shield(task)
+
+    def _snapshot(self, dirty):
+        """نسخة ثابتة من البيانات المتغيرة، تؤخذ داخل حلقة الأحداث"""
+        return self.backend.snapshot(dirty, self.active_channels, self.channel_settings, self.custom_triggers)
+
+    def _mark_dirty(self, kind, guild_str, channel_str=None):
+        """جدولة حفظ التغيير"""
+        self.writer.mark_dirty((kind, guild_str, channel_str))
+
+    async def flush(self):
+        """حفظ جميع التغييرات المعلقة فوراً"""
+        await self.writer.flush()
+
+    async def close(self):
+        """حفظ ما تبقى عند إيقاف البوت"""
+        self.loaded = False
+        self.stop_sync()
+        for task in self._loading.values():
+            task.cancel()
+        self._loading.clear()
+        await self.writer.close()
+        self.backend.close()
+
+    def _forget_guild(self, guild_str):
+        """إسقاط خادم من الذاكرة ليُعاد تحميله عند الطلب التالي"""
+        self._loaded_guilds.discard(guild_str)
+        self._loading.pop(guild_str, None)
+        self.active_channels.pop(guild_str, None)
+        self.channel_settings.pop(guild_str, None)
+        self.custom_triggers.pop(guild_str, None)
+        self._resolved.pop(guild_str, None)
+
+    async def sync(self):
+        """تطبيق تغييرات العمليات الأخرى، ويرجع عدد الخوادم التي أُعيد تحميلها
+
+        الخوادم التي لديها تغييرات محلية لم تُحفظ بعد تنتظر حتى الحفظ، وإلا
+        لضاعت هذه التغييرات عند إعادة التحميل
+        """
+        if not self._shared:
+            return 0
+        data_version, latest, changed = await asyncio.to_thread(
+            self.backend.poll_changes, self._seen_version, self._data_version
+        )
+        self._data_version = data_version
+        self._seen_version = latest
+        # الخوادم التي يجري تحميلها قد تكون قرأت النسخة السابقة
+        self._stale_guilds |= changed & (self._loaded_guilds | self._loading.keys())
+        if not self._stale_guilds or self.writer.busy:
+            return 0
+
+        pending = {guild_str for _, guild_str, _ in self.writer.pending_keys}
+        refreshed = self._stale_guilds - pending
+        self._stale_guilds -= refreshed
+        # التحميل الجاري يُلغى ليبدأ من جديد عند الطلب التالي
+        loaded = refreshed & self._loaded_guilds
+        for guild_str in refreshed - loaded:
+            self._forget_guild(guild_str)
+        if not loaded:
+            return len(refreshed)
+
+        # الخوادم المحملة تُقرأ في خيط منفصل، وتبقى بياناتها الحالية حتى تكتمل القراءة
+        fresh = await self.writer.read(self._read_guilds, sorted(loaded))
+        pending = {guild_str for _, guild_str, _ in self.writer.pending_keys}
+        for guild_str, guild_data in fresh.items():
+            if guild_str not in self._loaded_guilds:
+                continue
+            if guild_str in pending:
+                # تعديل محلي أثناء القراءة: إعادة المحاولة بعد حفظه
+                self._stale_guilds.add(guild_str)
+                continue
+            self._forget_guild(guild_str)
+            self._apply_guild(guild_str, guild_data)
+        return len(refreshed)
+
+    def _read_guilds(self, guilds):
+        """قراءة عدة خوادم من واجهة التخزين (تعمل في خيط منفصل)"""
+        return {guild_str: self.backend.load_guild(guild_str) for guild_str in guilds}
+
+    async def _sync_loop(self, interval):
+        """فحص دوري لتغييرات العمليات الأخرى"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"❌ خطأ في مزامنة حالة القنوات: {e}")
+
+    def start_sync(self, interval=SYNC_INTERVAL):
+        """بدء المزامنة مع العمليات الأخرى (لا تفعل شيئاً مع التخزين غير المشترك)"""
+        if self._shared and (self._sync_task is None or self._sync_task.done()):
+            self._sync_task = asyncio.get_running_loop().create_task(self._sync_loop(interval))
+
+    def stop_sync(self):
+        """إيقاف المزامنة"""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+    def is_channel_active(self, guild_id, channel_id):
+        """التحقق من نشاط القناة"""
+        guild_str = str(guild_id)
+        self._ensure_guild(guild_str)
+        channels = self.active_channels.get(guild_str)
+        # إذا لم يتم تحديد قنوات للخادم، فجميع القنوات نشطة
+        if not channels:
+            return True
+        return str(channel_id) in channels
+
+    def get_active_channels(self, guild_id):
+        """القنوات النشطة المحددة للخادم (فارغة إذا كانت جميع القنوات نشطة)"""
+        guild_str = str(guild_id)
+        self._ensure_guild(guild_str)
+        return self.active_channels.get(guild_str, set())
+
+    def activate_channel(self, guild_id, channel_id):
+        """تفعيل قناة، ويرجع False إذا كانت مفعلة مسبقاً"""
+        guild_str = str(guild_id)
+        self._require_guild(guild_str)
+        channels = self.active_channels.setdefault(guild_str, set())
+        channel_str = str(channel_id)
+        if channel_str in channels:
+            return False
+        channels.add(channel_str)
+        self._mark_dirty('channels', guild_str, channel_str)
+        return True
+
+    def deactivate_channel(self, guild_id, channel_id):
+        """إلغاء تفعيل قناة، ويرجع False إذا لم تكن مفعلة"""
+        guild_str = str(guild_id)
+        self._require_guild(guild_str)
+        channels = self.active_channels.get(guild_str)
+        channel_str = str(channel_id)
+        if not channels or channel_str not in channels:
+            return False
+        channels.discard(channel_str)
+        if not channels:
+            del self.active_channels[guild_str]
+        self._mark_dirty('channels', guild_str, channel_str)
+        return True
+
+    def get_channel_settings(self, guild_id, channel_id):
+        """الحصول على إعدادات القناة أو الإعدادات الافتراضية (للقراءة فقط)"""
+        guild_str = str(guild_id)
+        self._ensure_guild(guild_str)
+        guild_settings = self.channel_settings.get(guild_str)
+        if guild_settings:
+            settings = guild_settings.get(str(channel_id))
+            if settings is not None:
+                return settings
+        return _DEFAULT_SETTINGS_VIEW
+
+    def resolve_settings(self, guild_id, channel_id):
+        """إعدادات القناة ككائن ثابت محفوظ في الذاكرة"""
+        guild_str = str(guild_id)
+        channel_str = str(channel_id)
+        guild_cache = self._resolved.get(guild_str)
+        if guild_cache is not None:
+            self._resolved.move_to_end(guild_str)
+            resolved = guild_cache.get(channel_str)
+            if resolved is not None:
+                return resolved
+        else:
+            guild_cache = self._resolved[guild_str] = {}
+            # الخوادم الخاملة تُسقط ويُعاد دمج إعداداتها عند رسالتها التالية
+            if len(self._resolved) > self.resolved_cache_size:
+                self._resolved.popitem(last=False)
+
+        settings = self.get_channel_settings(guild_str, channel_str)
+        if settings is _DEFAULT_SETTINGS_VIEW:
+            resolved = _DEFAULT_RESOLVED
+        else:
+            resolved = _DEFAULT_RESOLVED._replace(
+                **{key: value for key, value in settings.items() if key in DEFAULT_CHANNEL_SETTINGS}
+            )
+        guild_cache[channel_str] = resolved
+        return resolved
+
+    def set_channel_setting(self, guild_id, channel_id, setting, value):
+        """تحديث إعداد واحد للقناة وحفظه"""
+        guild_str = str(guild_id)
+        channel_str = str(channel_id)
+        self._require_guild(guild_str)
+        guild_settings = self.channel_settings.setdefault(guild_str, {})
+        settings = guild_settings.setdefault(channel_str, dict(DEFAULT_CHANNEL_SETTINGS))
+        settings[setting] = value
+        self._resolved.get(guild_str, {}).pop(channel_str, None)
+        self._mark_dirty('settings', guild_str, channel_str)
+
+    def reset_guild(self, guild_id):
+        """مسح القنوات النشطة والإعدادات الخاصة بالخادم"""
+        guild_str = str(guild_id)
+        self._require_guild(guild_str)
+        had_channels = self.active_channels.pop(guild_str, None) is not None
+        had_settings = self.channel_settings.pop(guild_str, None) is not None
+        had_triggers = self.custom_triggers.pop(guild_str, None) is not None
+        self._resolved.pop(guild_str, None)
+        if had_channels or had_settings or had_triggers:
+            self._mark_dirty('guild', guild_str)
+
+    def get_triggers(self, guild_id):
+        """الردود المخصصة للخادم {trigger: (ردود)}، أو None إذا لم تكن له ردود"""
+        guild_str = str(guild_id)
+        self._ensure_guild(guild_str)
+        return self.custom_triggers.get(guild_str)
+
+    def add_trigger(self, guild_id, trigger, response):
+        """إضافة رد لكلمة مخصصة، ويرجع عدد ردودها بعد الإضافة"""
+        guild_str = str(guild_id)
+        self._require_guild(guild_str)
+        pack = dict(self.custom_triggers.get(guild_str, {}))
+        pack[trigger] = pack.get(trigger, ()) + (response,)
+        self.custom_triggers[guild_str] = pack
+        self._mark_dirty('triggers', guild_str)
+        return len(pack[trigger])
+
+    def remove_trigger(self, guild_id, trigger):
+        """حذف كلمة مخصصة بكل ردودها، ويرجع False إذا لم تكن موجودة"""
+        guild_str = str(guild_id)
+        self._require_guild(guild_str)
+        pack = self.custom_triggers.get(guild_str)
+        if not pack or trigger not in pack:
+            return False
+        pack = {key: responses for key, responses in pack.items() if key != trigger}
+        if pack:
+            self.custom_triggers[guild_str] = pack
+        else:
+            del self.custom_triggers[guild_str]
+        self._mark_dirty('triggers', guild_str)
+        return True
+
+
+def get_channel_store(bot):
+    """إرجاع مخزن القنوات المشترك للبوت، وإنشاؤه عند أول استخدام"""
+    store = getattr(bot, 'channel_store', None)
+    if store is None:
+        store = ChannelStore(resolved_cache_size=int(os.getenv('SETTINGS_CACHE_SIZE', RESOLVED_CACHE_SIZE)))
+        bot.channel_store = store
+    return store
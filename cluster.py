@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+مشغّل العنقود: عدة عمليات للبوت، كل عملية تتولى مجموعة من الشظايا
+يعيد تشغيل العمليات المتعطلة، وتتشارك العمليات حالة القنوات عبر قاعدة SQLite واحدة
+
+الاستخدام:
+    CLUSTER_WORKERS=4 SHARD_COUNT=16 python cluster.py
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import time
+
+import aiohttp
+from dotenv import load_dotenv
+
+from health_server import DEFAULT_PORT
+from sharding import EXIT_OK, EXIT_CONFIG_ERROR
+from storage import DATABASE_FILE
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GATEWAY_URL = 'https://discord.com/api/v10/gateway/bot'
+
+# المهلة بين بدء الشظايا المتتالية، كما يشترطها ديسكورد عند التعريف (بالثواني)
+IDENTIFY_DELAY = 5.0
+
+# مهلة إعادة التشغيل بعد التعطل: تتضاعف حتى الحد الأقصى
+RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 60.0
+
+# عملية تعمل أطول من هذه المدة تُعتبر مستقرة فتُصفّر مهلة إعادة التشغيل
+STABLE_AFTER = 60.0
+
+# مهلة الإيقاف اللطيف قبل القتل
+SHUTDOWN_TIMEOUT = 15.0
+
+
+def split_shards(shard_count, workers):
+    """توزيع الشظايا على العمليات بنطاقات متصلة: [[0, 1], [2, 3], ...]
+
+    لا تُنشأ عملية بلا شظايا، فعند زيادة العمليات عن الشظايا تأخذ كل عملية شظية واحدة
+    """
+    if shard_count < 1:
+        raise ValueError(f'عدد الشظايا غير صالح: {shard_count}')
+    workers = max(1, min(workers, shard_count))
+    size, extra = divmod(shard_count, workers)
+    groups = []
+    start = 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        groups.append(list(range(start, end)))
+        start = end
+    return groups
+
+
+async def fetch_recommended_shards(token):
+    """عدد الشظايا الذي يوصي به ديسكورد، وعدد التعريفات المتزامنة المسموح"""
+    headers = {'Authorization': f'Bot {token}'}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_URL, headers=headers) as response:
+            response.raise_for_status()
+            data = await response.json()
+    return data['shards'], data['session_start_limit'].get('max_concurrency', 1)
+
+
+class Worker:
+    """عملية بوت واحدة تتولى مجموعة شظايا"""
+
+    def __init__(self, index, shard_ids, shard_count, env):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.env = dict(env)
+        self.env.update({
+            'SHARD_COUNT': str(shard_count),
+            'SHARD_IDS': f'{shard_ids[0]}-{shard_ids[-1]}',
+            'CLUSTER_WORKER': str(index),
+        })
+        self.process = None
+        self.restarts = 0
+        self.delay = RESTART_DELAY
+        self.started_at = 0.0
+
+    def __str__(self):
+        return f"العملية {self.index} (الشظايا {self.shard_ids[0]}-{self.shard_ids[-1]})"
+
+    async def start(self):
+        """تشغيل bot.py بمتغيرات البيئة الخاصة بهذه العملية"""
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.join(ROOT, 'bot.py'),
+            cwd=ROOT,
+            env=self.env,
+            # مجموعة عمليات منفصلة: Ctrl+C يصل للمشرف وحده فيوقفها بالترتيب
+            start_new_session=True
+        )
+        self.started_at = time.monotonic()
+        print(f"🚀 بدء {self} (pid {self.process.pid})")
+
+    def stop(self):
+        """طلب إيقاف لطيف: SIGINT يجعل البوت يحفظ حالته قبل الخروج"""
+        if self.process is not None and self.process.returncode is None:
+            self.process.send_signal(signal.SIGINT)
+
+    async def wait_stopped(self, timeout):
+        """انتظار الخروج، ثم القتل بعد المهلة"""
+        if self.process is None or self.process.returncode is not None:
+            return
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ {self} لم تتوقف، سيتم إنهاؤها")
+            self.process.kill()
+            await self.process.wait()
+
+
+class Cluster:
+    """مشرف العمليات: تشغيل متدرج وإعادة تشغيل عند التعطل"""
+
+    def __init__(self, workers, identify_delay=IDENTIFY_DELAY):
+        self.workers = workers
+        self.identify_delay = identify_delay
+        self._stopping = asyncio.Event()
+
+    async def _supervise(self, worker, start_delay):
+        """تشغيل عملية ومراقبتها حتى الإيقاف"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), start_delay)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        while not self._stopping.is_set():
+            await worker.start()
+            code = await worker.process.wait()
+            if self._stopping.is_set():
+                break
+            if code == EXIT_OK:
+                print(f"ℹ️ {worker} خرجت بشكل طبيعي ولن يُعاد تشغيلها")
+                break
+            if code == EXIT_CONFIG_ERROR:
+                # توكن أو صلاحيات غير صالحة: إعادة التشغيل لن تفيد
+                print(f"❌ {worker} توقفت بسبب خطأ في الإعدادات ولن يُعاد تشغيلها")
+                break
+
+            if time.monotonic() - worker.started_at >= STABLE_AFTER:
+                worker.delay = RESTART_DELAY
+            worker.restarts += 1
+            print(f"❌ {worker} تعطلت (رمز {code})، إعادة التشغيل بعد {worker.delay:g} ث")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), worker.delay)
+                break
+            except asyncio.TimeoutError:
+                pass
+            worker.delay = min(worker.delay * 2, MAX_RESTART_DELAY)
+
+    def stop(self):
+        """إيقاف جميع العمليات"""
+        if not self._stopping.is_set():
+            print("🛑 إيقاف العنقود...")
+            self._stopping.set()
+            for worker in self.workers:
+                worker.stop()
+
+    async def run(self):
+        """تشغيل العمليات بالتدرج حسب عدد شظايا كل منها، والانتظار حتى الإيقاف"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                pass
+
+        tasks = []
+        start_delay = 0.0
+        for worker in self.workers:
+            tasks.append(asyncio.create_task(self._supervise(worker, start_delay)))
+            start_delay += len(worker.shard_ids) * self.identify_delay
+        await asyncio.gather(*tasks)
+
+        for worker in self.workers:
+            worker.stop()
+        await asyncio.gather(*(worker.wait_stopped(SHUTDOWN_TIMEOUT) for worker in self.workers))
+
+
+async def main():
+    """قراءة الإعدادات وتشغيل العنقود"""
+    load_dotenv()
+    token = os.getenv('DISCORD_TOKEN')
+    if not token:
+        print("❌ خطأ: لم يتم العثور على توكن البوت في ملف .env")
+        return
+
+    identify_delay = IDENTIFY_DELAY
+    # SHARD_COUNT الفارغ يعني auto كما في غيابه
+    shard_count = os.getenv('SHARD_COUNT', '').strip().lower() or 'auto'
+    if shard_count == 'auto':
+        shard_count, max_concurrency = await fetch_recommended_shards(token)
+        identify_delay = IDENTIFY_DELAY / max_concurrency
+        print(f"🧩 عدد الشظايا الموصى به: {shard_count}")
+    shard_count = int(shard_count)
+
+    workers = int(os.getenv('CLUSTER_WORKERS', os.cpu_count() or 1))
+    base_port = int(os.getenv('PORT', DEFAULT_PORT))
+
+    # حالة القنوات مشتركة بين العمليات عبر SQLite، وكل عملية لها منفذ صحة خاص
+    env = dict(os.environ)
+    env['STORAGE_BACKEND'] = 'sqlite'
+    env['STORAGE_DB'] = os.path.abspath(os.getenv('STORAGE_DB', os.path.join(ROOT, DATABASE_FILE)))
+    env.pop('SHARD_IDS', None)
+
+    cluster_workers = []
+    for index, shard_ids in enumerate(split_shards(shard_count, workers)):
+        worker_env = dict(env, PORT=str(base_port + index))
+        cluster_workers.append(Worker(index, shard_ids, shard_count, worker_env))
+
+    print(f"🏗️ تشغيل {len(cluster_workers)} عملية لـ {shard_count} شظية")
+    await Cluster(cluster_workers, identify_delay).run()
+    print("👋 تم إيقاف العنقود")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
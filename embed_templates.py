@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+سجل قوالب الإمبد
+الإمبد الثابتة تُبنى مرة واحدة، وشبه الثابتة تُملأ حقولها المتغيرة فقط
+"""
+
+import discord
+
+# {name: EmbedTemplate}
+TEMPLATES = {}
+
+
+class EmbedTemplate:
+    """قالب إمبد: الأجزاء الثابتة محسوبة مسبقاً، و{المتغيرات} تُملأ عند العرض"""
+
+    def __init__(self, title=None, description=None, color=None, fields=(), footer=None):
+        self._data = {'type': 'rich'}
+        self._templated = []
+        for key, value in (('title', title), ('description', description)):
+            if value is not None:
+                self._data[key] = value
+                if '{' in value:
+                    self._templated.append(key)
+        if color is not None:
+            self._data['color'] = color
+        if footer is not None:
+            self._data['footer'] = {'text': footer}
+        # (name, value, inline, يحتوي متغيرات؟)
+        self._fields = [
+            (name, value, inline, '{' in value)
+            for name, value, inline in fields
+        ]
+        self._static = None
+
+    def build(self):
+        """الإمبد الثابت، يُبنى عند أول طلب ثم يُعاد نفسه (لا تعدّله)"""
+        if self._static is None:
+            self._static = self.render()
+        return self._static
+
+    def render(self, **values):
+        """إنشاء إمبد جديد مع ملء الحقول المتغيرة فقط"""
+        data = dict(self._data)
+        for key in self._templated:
+            data[key] = data[key].format_map(values)
+        data['fields'] = [
+            {'name': name, 'value': value.format_map(values) if templated else value, 'inline': inline}
+            for name, value, inline, templated in self._fields
+        ]
+        return discord.Embed.from_dict(data)
+
+
+def register_template(name, template):
+    """تسجيل قالب بالاسم وإرجاعه"""
+    TEMPLATES[name] = template
+    return template
+
+
+def get_template(name):
+    """الحصول على قالب مسجل"""
+    return TEMPLATES[name]
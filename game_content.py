@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+محرك محتوى الألعاب
+يحمّل ملفات games_data في الخلفية خارج حلقة الأحداث، ويتحقق منها، ويقدّم الأسئلة دون تكرار لكل قناة
+الأوامر تقرأ ما حُمّل فقط ولا تلمس القرص أبداً
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+from collections import OrderedDict, namedtuple
+
+from arabic_text import normalize_arabic
+
+GAMES_DATA_DIR = 'games_data'
+
+# الفاصل بين فحوصات تغيّر الملفات (بالثواني)
+RELOAD_INTERVAL = 30.0
+
+# عدد مؤشرات القنوات التي تبقى في الذاكرة
+CACHE_SIZE = 10000
+
+# عنصر لعبة جاهز: الإجابات الموحدة محسوبة مسبقاً
+# answers: مجموعة الإجابات المقبولة بعد التطبيع (مع أرقام الخيارات في المسابقة)
+GameItem = namedtuple('GameItem', 'prompt answer options hint category normalized_answer answers')
+
+
+def _parse_quiz(entry):
+    """سؤال مسابقة: question و options و correct_answer"""
+    options = tuple(str(option) for option in entry['options'])
+    answer = str(entry['correct_answer'])
+    if answer not in options:
+        raise ValueError('correct_answer ليست من الخيارات')
+    answers = {normalize_arabic(answer), str(options.index(answer) + 1)}
+    return entry['question'], answer, options, None, answers
+
+
+def _parse_riddle(entry):
+    """لغز: riddle و answer"""
+    answer = str(entry['answer'])
+    return entry['riddle'], answer, (), None, {normalize_arabic(answer)}
+
+
+def _parse_word(entry):
+    """كلمة: word و hint"""
+    word = str(entry['word'])
+    return entry['hint'], word, (), entry['hint'], {normalize_arabic(word)}
+
+
+# {النوع: (الملف، مفتاح القائمة، دالة التحليل)}
+CONTENT_TYPES = {
+    'quiz': ('quiz.json', 'questions', _parse_quiz),
+    'riddles': ('riddles.json', 'riddles', _parse_riddle),
+    'words': ('word_guessing.json', 'words', _parse_word),
+}
+
+
+class GameContent:
+    """محتوى الألعاب في الذاكرة مع فهرس حسب النوع والفئة"""
+
+    def __init__(self, data_dir=GAMES_DATA_DIR, reload_interval=RELOAD_INTERVAL, cache_size=CACHE_SIZE):
+        self.data_dir = data_dir
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        # {(kind, category): [GameItem]}، الفئة None تعني كل العناصر
+        self._index = {}
+        self._mtimes = {}
+        # {(channel_id, kind, category): [start, stride, position, size]} بترتيب آخر استخدام
+        self._cursors = OrderedDict()
+        self._watch_task = None
+
+    def _path(self, kind):
+        return os.path.join(self.data_dir, CONTENT_TYPES[kind][0])
+
+    def _read(self, kind):
+        """قراءة ملف نوع واحد والتحقق منه، ويرجع (العناصر، وقت التعديل)"""
+        path = self._path(kind)
+        _, list_key, parse = CONTENT_TYPES[kind]
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)[list_key]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ خطأ في تحميل {path}: {e}")
+            return None, None
+
+        items = []
+        for number, entry in enumerate(entries, 1):
+            try:
+                prompt, answer, options, hint, answers = parse(entry)
+                category = entry.get('category')
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                print(f"⚠️ تم تجاهل العنصر {number} في {path}: {e}")
+                continue
+            items.append(GameItem(
+                prompt=prompt,
+                answer=answer,
+                options=options,
+                hint=hint,
+                category=category,
+                normalized_answer=normalize_arabic(answer),
+                answers=frozenset(answers)
+            ))
+        return items, mtime
+
+    def _reload(self, kind, items, mtime):
+        """استبدال فهرس نوع واحد (يُستدعى داخل الحلقة)"""
+        if items is None:
+            return
+        for key in [key for key in self._index if key[0] == kind]:
+            del self._index[key]
+        self._index[(kind, None)] = items
+        for item in items:
+            if item.category:
+                self._index.setdefault((kind, item.category), []).append(item)
+        self._mtimes[kind] = mtime
+        # المؤشرات القديمة لم تعد صالحة لحجم القائمة الجديد
+        for key in [key for key in self._cursors if key[1] == kind]:
+            del self._cursors[key]
+
+    def count(self, kind, category=None):
+        """عدد العناصر المتاحة (0 قبل انتهاء التحميل)"""
+        return len(self._index.get((kind, category), ()))
+
+    def categories(self, kind):
+        """الفئات المتاحة لنوع معين"""
+        return sorted(category for k, category in self._index if k == kind and category)
+
+    def next_item(self, kind, channel_id, category=None):
+        """العنصر التالي للقناة دون تكرار حتى تنفد القائمة، أو None (ومنها قبل انتهاء التحميل)"""
+        items = self._index.get((kind, category))
+        if not items:
+            return None
+        size = len(items)
+        key = (channel_id, kind, category)
+        cursor = self._cursors.get(key)
+        if cursor is None or cursor[2] >= size or cursor[3] != size:
+            # تبديل عشوائي بخطوة أولية مع الحجم: يمر على كل العناصر دون تخزينها
+            stride = random.randrange(1, size) if size > 1 else 1
+            while math.gcd(stride, size) != 1:
+                stride = random.randrange(1, size)
+            cursor = self._cursors[key] = [random.randrange(size), stride, 0, size]
+            # القناة المُسقطة تبدأ دورة جديدة عند لعبتها التالية
+            if len(self._cursors) > self.cache_size:
+                self._cursors.popitem(last=False)
+        self._cursors.move_to_end(key)
+        start, stride, position, _ = cursor
+        cursor[2] = position + 1
+        return items[(start + position * stride) % size]
+
+    async def _check_for_changes(self):
+        """تحميل الملفات الجديدة أو التي تغيرت على القرص (القراءة خارج الحلقة)"""
+        for kind in CONTENT_TYPES:
+            try:
+                mtime = await asyncio.to_thread(os.path.getmtime, self._path(kind))
+            except OSError as e:
+                if kind not in self._mtimes:
+                    print(f"❌ خطأ في تحميل {self._path(kind)}: {e}")
+                    self._mtimes[kind] = None
+                continue
+            if mtime != self._mtimes.get(kind):
+                first = kind not in self._mtimes
+                items, new_mtime = await asyncio.to_thread(self._read, kind)
+                if items is None:
+                    # ملف تالف: الإبقاء على المحتوى الحالي وعدم إعادة المحاولة حتى يتغير
+                    self._mtimes[kind] = mtime
+                    continue
+                self._reload(kind, items, new_mtime)
+                if not first:
+                    print(f"🔄 تم تحديث محتوى {kind}: {len(items)} عنصر")
+
+    async def load(self):
+        """تحميل جميع الأنواع الآن خارج الحلقة (مهمة المراقبة تبدأ به)"""
+        await self._check_for_changes()
+
+    async def _watch(self):
+        """التحميل الأول ثم مراقبة الملفات دورياً"""
+        await self.load()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            await self._check_for_changes()
+
+    def start_watching(self):
+        """بدء مراقبة التغييرات (يتطلب حلقة أحداث)"""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch())
+
+    def stop_watching(self):
+        """إيقاف المراقبة"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+
+def get_game_content(bot):
+    """إرجاع محتوى الألعاب المشترك للبوت (الملفات تُقرأ في مهمة المراقبة لا عند الإنشاء)"""
+    content = getattr(bot, 'game_content', None)
+    if content is None:
+        content = GameContent(cache_size=int(os.getenv('GAME_CURSOR_CACHE_SIZE', CACHE_SIZE)))
+        bot.game_content = content
+    return content
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+موجّه جلسات الألعاب
+يوصل كل رسالة إلى جلستها ببحث واحد في قاموس، وتُدار المهل بعجلة مؤقتات واحدة
+"""
+
+import asyncio
+import math
+
+# دقة عجلة المؤقتات وعدد خاناتها
+TIMER_TICK = 0.5
+TIMER_SLOTS = 128
+
+
+class TimerHandle:
+    """مؤقت مجدول في العجلة، يمكن إلغاؤه"""
+
+    __slots__ = ('callback', 'rounds', 'slot', 'wheel')
+
+    def __init__(self, wheel, slot, rounds, callback):
+        self.wheel = wheel
+        self.slot = slot
+        self.rounds = rounds
+        self.callback = callback
+
+    def cancel(self):
+        """إلغاء المؤقت إذا لم يُنفذ بعد"""
+        if self.wheel is not None:
+            self.wheel._remove(self)
+
+
+class TimerWheel:
+    """عجلة مؤقتات: مهمة واحدة تدور بدل مؤقت منفصل لكل لعبة"""
+
+    def __init__(self, tick=TIMER_TICK, slots=TIMER_SLOTS):
+        self.tick = tick
+        self._slots = [set() for _ in range(slots)]
+        self._cursor = 0
+        self._count = 0
+        self._task = None
+
+    def __len__(self):
+        return self._count
+
+    def schedule(self, delay, callback):
+        """تنفيذ callback() بعد delay ثانية تقريباً (بدقة tick)"""
+        ticks = max(1, math.ceil(delay / self.tick))
+        slot = (self._cursor + ticks) % len(self._slots)
+        handle = TimerHandle(self, slot, (ticks - 1) // len(self._slots), callback)
+        self._slots[slot].add(handle)
+        self._count += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return handle
+
+    def _remove(self, handle):
+        """حذف مؤقت من خانته"""
+        self._slots[handle.slot].discard(handle)
+        handle.wheel = None
+        self._count -= 1
+
+    async def _run(self):
+        """الدوران ما دامت هناك مؤقتات مجدولة"""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while self._count:
+            next_tick += self.tick
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            self._advance()
+
+    def _advance(self):
+        """التقدم خانة واحدة وتنفيذ المؤقتات المستحقة"""
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        due = []
+        for handle in self._slots[self._cursor]:
+            if handle.rounds:
+                handle.rounds -= 1
+            else:
+                due.append(handle)
+        for handle in due:
+            self._remove(handle)
+            try:
+                handle.callback()
+            except Exception as e:
+                print(f"❌ خطأ في مؤقت: {e}")
+
+
+class GameSession:
+    """جلسة لعبة تنتظر رسائل لاعب واحد في قناة واحدة"""
+
+    __slots__ = ('router', 'key', '_waiter', '_timer')
+
+    def __init__(self, router, key):
+        self.router = router
+        self.key = key
+        self._waiter = None
+        self._timer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def wait(self, timeout):
+        """انتظار الرسالة التالية، أو asyncio.TimeoutError بعد المهلة"""
+        self._waiter = asyncio.get_running_loop().create_future()
+        self._timer = self.router.wheel.schedule(timeout, self._expire)
+        try:
+            return await self._waiter
+        finally:
+            self._timer.cancel()
+            self._timer = None
+            self._waiter = None
+
+    def _expire(self):
+        """انتهاء المهلة"""
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(asyncio.TimeoutError())
+
+    def feed(self, message):
+        """تسليم رسالة للجلسة، ويرجع True إذا كانت بانتظارها"""
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(message)
+            return True
+        return False
+
+    def close(self):
+        """إنهاء الجلسة وإزالتها من الموجّه"""
+        if self.router.sessions.get(self.key) is self:
+            del self.router.sessions[self.key]
+
+
+class RoundSession(GameSession):
+    """جولة مفتوحة لجميع من في القناة، تنتهي بأول رسالة تقبلها check
+
+    تُفحص كل رسالة فور وصولها، فلا تستيقظ الجولة إلا مرة واحدة عند الفوز
+    """
+
+    __slots__ = ('check', 'winner')
+
+    def __init__(self, router, key, check):
+        super().__init__(router, key)
+        self.check = check
+        self.winner = None
+
+    async def wait(self, timeout):
+        """انتظار الرسالة الفائزة، أو asyncio.TimeoutError بعد المهلة"""
+        if self.winner is not None:
+            return self.winner
+        return await super().wait(timeout)
+
+    def feed(self, message):
+        """فحص الرسالة، ويرجع True إذا كانت الفائزة"""
+        if self.winner is not None or not self.check(message):
+            return False
+        self.winner = message
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(message)
+        return True
+
+
+class GameSessionRouter:
+    """جدول الجلسات النشطة: {(channel_id, author_id): GameSession}
+
+    جولات القناة المفتوحة للجميع مفتاحها (channel_id, None)
+    """
+
+    def __init__(self, wheel=None):
+        self.sessions = {}
+        self.wheel = wheel or TimerWheel()
+
+    def open_session(self, channel_id, author_id):
+        """فتح جلسة جديدة، أو None إذا كان للاعب جلسة جارية في القناة"""
+        key = (channel_id, author_id)
+        if key in self.sessions:
+            return None
+        session = self.sessions[key] = GameSession(self, key)
+        return session
+
+    def open_round(self, channel_id, check):
+        """فتح جولة للقناة كلها، أو None إذا كانت فيها جولة جارية"""
+        key = (channel_id, None)
+        if key in self.sessions:
+            return None
+        session = self.sessions[key] = RoundSession(self, key, check)
+        return session
+
+    def dispatch(self, message):
+        """توجيه الرسالة إلى جلستها إن وجدت، ويرجع True إذا استُهلكت"""
+        if not self.sessions:
+            return False
+        channel_id = message.channel.id
+        session = self.sessions.get((channel_id, message.author.id))
+        if session is not None and session.feed(message):
+            return True
+        session = self.sessions.get((channel_id, None))
+        return session is not None and session.feed(message)
+
+
+def get_game_router(bot):
+    """إرجاع موجّه الجلسات المشترك للبوت، وإنشاؤه عند أول استخدام"""
+    router = getattr(bot, 'game_router', None)
+    if router is None:
+        router = GameSessionRouter()
+        bot.game_router = router
+    return router
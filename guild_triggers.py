@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+الردود المخصصة لكل خادم
+مطابق مُجمّع لكل خادم يُبنى عند أول رسالة، ويُحفظ في ذاكرة LRU فتُسقط مطابقات الخوادم الخاملة
+الخوادم بلا ردود مخصصة لا تكلف سوى بحث واحد في قاموس
+"""
+
+import os
+import random
+from collections import OrderedDict
+
+from arabic_text import normalize_arabic
+from channel_store import get_channel_store
+from keyword_matcher import KeywordMatcher
+
+# أقصى عدد مطابقات مُجمّعة في الذاكرة
+CACHE_SIZE = 1000
+
+# حدود الردود المخصصة لكل خادم
+MAX_TRIGGERS = 50
+MAX_RESPONSES = 10
+MAX_TRIGGER_LENGTH = 50
+MAX_RESPONSE_LENGTH = 500
+
+
+def normalize_trigger(text):
+    """الشكل المخزن للكلمة المخصصة: نص موحد بمسافات مفردة"""
+    return ' '.join(normalize_arabic(text).split())
+
+
+class GuildTriggers:
+    """مطابقات الردود المخصصة لكل خادم فوق مخزن القنوات"""
+
+    def __init__(self, store, cache_size=CACHE_SIZE):
+        self.store = store
+        self.cache_size = cache_size
+        # {guild_id: (قاموس الردود الذي بُني منه، KeywordMatcher)}
+        self._matchers = OrderedDict()
+        self.builds = 0
+
+    def _matcher(self, guild_str, pack):
+        """مطابق الخادم، ويُعاد بناؤه إذا تغير قاموس ردوده"""
+        entry = self._matchers.get(guild_str)
+        if entry is not None and entry[0] is pack:
+            self._matchers.move_to_end(guild_str)
+            return entry[1]
+        # الكلمات الأطول أولاً، فالعبارة المحددة تغلب الكلمة العامة داخلها
+        triggers = sorted(pack, key=len, reverse=True)
+        matcher = KeywordMatcher({trigger: [trigger] for trigger in triggers})
+        self._matchers[guild_str] = (pack, matcher)
+        self._matchers.move_to_end(guild_str)
+        if len(self._matchers) > self.cache_size:
+            self._matchers.popitem(last=False)
+        self.builds += 1
+        return matcher
+
+    def find(self, guild_id, content):
+        """الكلمة المخصصة المطابقة في النص الموحد وردودها، أو (None, None)"""
+        guild_str = str(guild_id)
+        pack = self.store.get_triggers(guild_str)
+        if not pack:
+            return None, None
+        trigger = self._matcher(guild_str, pack).find_category(content)
+        if trigger is None:
+            return None, None
+        return trigger, pack[trigger]
+
+    def pick(self, guild_id, content):
+        """رد مخصص للرسالة، ويرجع (الكلمة، الرد) أو (None, None)"""
+        trigger, responses = self.find(guild_id, content)
+        if trigger is None:
+            return None, None
+        return trigger, random.choice(responses)
+
+    def __len__(self):
+        return len(self._matchers)
+
+
+def get_guild_triggers(bot):
+    """إرجاع مطابقات الردود المخصصة المشتركة للبوت، وإنشاؤها عند أول استخدام"""
+    triggers = getattr(bot, 'guild_triggers', None)
+    if triggers is None:
+        triggers = GuildTriggers(get_channel_store(bot), int(os.getenv('TRIGGER_CACHE_SIZE', CACHE_SIZE)))
+        bot.guild_triggers = triggers
+    return triggers
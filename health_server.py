@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+خادم الصحة والمقاييس
+يعمل على حلقة أحداث البوت نفسها باستخدام aiohttp
+"""
+
+from aiohttp import web
+
+from sharding import shard_stats, latency_ms
+
+DEFAULT_PORT = 8080
+
+
+def _metric(lines, name, kind, help_text, value, labels=None):
+    """إضافة مقياس بصيغة Prometheus النصية"""
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    if labels:
+        label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value}")
+    else:
+        lines.append(f"{name} {value}")
+
+
+def collect_metrics(bot):
+    """جمع مقاييس البوت بصيغة Prometheus"""
+    lines = []
+    connected = int(bot.is_ready() and not bot.is_closed())
+    _metric(lines, 'bot_gateway_connected', 'gauge', 'Gateway connection state', connected)
+    latency = bot.latency
+    if latency == latency and latency != float('inf'):
+        _metric(lines, 'bot_latency_seconds', 'gauge', 'Gateway heartbeat latency', f"{latency:.6f}")
+    _metric(lines, 'bot_guilds', 'gauge', 'Connected guilds', len(bot.guilds))
+    _metric(lines, 'bot_extensions_loaded', 'gauge', 'Loaded extensions', len(bot.extensions))
+
+    shards = shard_stats(bot)
+    lines.append("# HELP bot_shard_latency_seconds Gateway heartbeat latency per shard")
+    lines.append("# TYPE bot_shard_latency_seconds gauge")
+    for shard_id, latency, _ in shards:
+        if latency is not None:
+            lines.append(f'bot_shard_latency_seconds{{shard="{shard_id}"}} {latency / 1000:.3f}')
+    lines.append("# HELP bot_shard_guilds Guilds per shard")
+    lines.append("# TYPE bot_shard_guilds gauge")
+    for shard_id, _, guilds in shards:
+        lines.append(f'bot_shard_guilds{{shard="{shard_id}"}} {guilds}')
+
+    startup = getattr(bot, 'startup_profile', None)
+    if startup is not None:
+        lines.append("# HELP bot_startup_phase_seconds Cold-start time per phase")
+        lines.append("# TYPE bot_startup_phase_seconds gauge")
+        for name, seconds, parent in startup.phases:
+            if parent is None:
+                lines.append(f'bot_startup_phase_seconds{{phase="{name}"}} {seconds:.6f}')
+
+    outbound = getattr(bot, 'outbound', None)
+    if outbound is not None:
+        stats = outbound.stats()
+        _metric(lines, 'bot_outbound_sent_total', 'counter', 'Messages sent through the scheduler', stats['sent'])
+        _metric(lines, 'bot_outbound_dropped_total', 'counter', 'Auto-replies dropped by rate limits', stats['dropped'])
+        _metric(lines, 'bot_outbound_coalesced_total', 'counter', 'Identical auto-replies coalesced', stats['coalesced'])
+        _metric(lines, 'bot_outbound_queue_depth', 'gauge', 'Sends waiting for a rate-limit token', stats['queue_depth'])
+
+    pipeline = getattr(bot, 'pipeline', None)
+    if pipeline is not None:
+        stats = pipeline.stats()
+        _metric(lines, 'bot_pipeline_queue_depth', 'gauge', 'Messages waiting for a worker', stats['queue_depth'])
+        _metric(lines, 'bot_pipeline_processed_total', 'counter', 'Messages handled by workers', stats['processed'])
+        _metric(lines, 'bot_pipeline_shed_total', 'counter', 'Messages dropped because the queue was full', stats['shed'])
+        _metric(lines, 'bot_pipeline_detached_total', 'counter', 'Handlers that outlived the worker budget', stats['detached'])
+        _metric(lines, 'bot_pipeline_detached_running', 'gauge', 'Detached handlers still running (capped)', stats['running_detached'])
+        _metric(lines, 'bot_pipeline_released_total', 'counter', 'Long-running game handlers that released their channel', stats['released'])
+        _metric(lines, 'bot_pipeline_errors_total', 'counter', 'Handlers that raised an exception', stats['errors'])
+
+    store = getattr(bot, 'channel_store', None)
+    if store is not None:
+        _metric(lines, 'bot_state_pending_writes', 'gauge', 'Channel-state changes waiting to be saved', store.writer.pending)
+        _metric(lines, 'bot_state_flushes_total', 'counter', 'Channel-state flushes to storage', store.writer.flush_count)
+
+    router = getattr(bot, 'game_router', None)
+    if router is not None:
+        _metric(lines, 'bot_game_sessions', 'gauge', 'Open game sessions', len(router.sessions))
+        _metric(lines, 'bot_game_timers', 'gauge', 'Scheduled game timers', len(router.wheel))
+
+    text = '\n'.join(lines) + '\n'
+    metrics = getattr(bot, 'metrics', None)
+    if metrics is not None and metrics.enabled:
+        text += metrics.render_prometheus()
+    return text
+
+
+class HealthServer:
+    """خادم HTTP صغير: /healthz و /readyz و /metrics"""
+
+    def __init__(self, bot, extensions=(), host='0.0.0.0', port=DEFAULT_PORT):
+        self.bot = bot
+        self.extensions = tuple(extensions)
+        self.host = host
+        self.port = port
+        self._runner = None
+
+        self.app = web.Application()
+        self.app.router.add_get('/', self.healthz)
+        self.app.router.add_get('/healthz', self.healthz)
+        self.app.router.add_get('/readyz', self.readyz)
+        self.app.router.add_get('/metrics', self.metrics)
+
+    async def healthz(self, request):
+        """حالة الاتصال بالبوابة"""
+        connected = self.bot.is_ready() and not self.bot.is_closed()
+        body = {
+            'status': 'ok' if connected else 'disconnected',
+            'gateway_connected': connected,
+            # زمن الاستجابة inf قبل أول نبضة حتى بعد الجاهزية
+            'latency_ms': latency_ms(self.bot.latency) if connected else None,
+            'guilds': len(self.bot.guilds),
+            'shards': [
+                {'id': shard_id, 'latency_ms': latency, 'guilds': guilds}
+                for shard_id, latency, guilds in shard_stats(self.bot)
+            ]
+        }
+        return web.json_response(body, status=200 if connected else 503)
+
+    async def readyz(self, request):
+        """جاهزية البوت: الإضافات ومخزن الحالة"""
+        missing = [name for name in self.extensions if name not in self.bot.extensions]
+        store = getattr(self.bot, 'channel_store', None)
+        store_loaded = store is not None and store.loaded
+        ready = not missing and store_loaded
+        body = {
+            'status': 'ready' if ready else 'not_ready',
+            'extensions_loaded': sorted(self.bot.extensions),
+            'extensions_missing': missing,
+            'state_store_loaded': store_loaded
+        }
+        return web.json_response(body, status=200 if ready else 503)
+
+    async def metrics(self, request):
+        """المقاييس بصيغة Prometheus"""
+        return web.Response(text=collect_metrics(self.bot), content_type='text/plain', charset='utf-8')
+
+    async def start(self):
+        """تشغيل الخادم على حلقة الأحداث الحالية"""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        print(f"🩺 خادم الصحة يعمل على المنفذ {self.port}")
+
+    async def stop(self):
+        """إيقاف الخادم"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس زمن المسار الساخن
+مدرجات زمنية لكل مرحلة ولكل أمر، وعدادات للرسائل والردود والأخطاء
+"""
+
+import os
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+# حدود خانات المدرج الزمني (بالثواني)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# أقصى عدد خوادم تُتتبع أزمنتها
+MAX_TRACKED_GUILDS = 1000
+
+# اسم التسمية (label) لكل مقياس في صيغة Prometheus
+LABEL_NAMES = {
+    'stage': 'stage',
+    'command': 'command',
+    'commands': 'command',
+    'matches': 'category',
+    'errors': 'type',
+    'routes': 'route',
+    'shed': 'route',
+}
+
+
+def _label(name, value):
+    """نص التسمية بصيغة Prometheus مع تهريب الرموز الخاصة"""
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'{LABEL_NAMES.get(name, "label")}="{escaped}"'
+
+
+class Histogram:
+    """مدرج زمني بخانات ثابتة بصيغة Prometheus"""
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """تقدير الكمّية من الخانات (الحد الأعلى للخانة)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for index, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else float('inf')
+        return float('inf')
+
+
+class _StageTimer:
+    """مؤقت مرحلة يسجل المدة عند الخروج"""
+
+    __slots__ = ('metrics', 'name', 'label', 'start')
+
+    def __init__(self, metrics, name, label):
+        self.metrics = metrics
+        self.name = name
+        self.label = label
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, self.label, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    """مؤقت لا يفعل شيئاً عند تعطيل القياس"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """سجل المقاييس: عدادات ومدرجات زمنية بتسمية واحدة لكل مفتاح"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        # {(name, label): int}
+        self.counters = {}
+        # {(name, label): Histogram}
+        self.histograms = {}
+        # {guild_id: [count, total_seconds]} بحد أقصى للذاكرة
+        self.guild_times = OrderedDict()
+
+    def inc(self, name, label=None, amount=1):
+        """زيادة عداد"""
+        if self.enabled:
+            key = (name, label)
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, label, seconds):
+        """تسجيل مدة في مدرج زمني"""
+        key = (name, label)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    def timer(self, name, label=None):
+        """مؤقت للاستخدام مع with، ولا يكلف شيئاً عند التعطيل"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name, label)
+
+    def observe_guild(self, guild_id, seconds):
+        """تجميع زمن معالجة الرسائل لكل خادم لاكتشاف الخوادم البطيئة"""
+        if not self.enabled:
+            return
+        entry = self.guild_times.get(guild_id)
+        if entry is None:
+            if len(self.guild_times) >= MAX_TRACKED_GUILDS:
+                self.guild_times.popitem(last=False)
+            entry = self.guild_times[guild_id] = [0, 0.0]
+        else:
+            self.guild_times.move_to_end(guild_id)
+        entry[0] += 1
+        entry[1] += seconds
+
+    def counter(self, name, label=None):
+        """قيمة عداد"""
+        return self.counters.get((name, label), 0)
+
+    def counters_by_label(self, name):
+        """{label: value} لعداد معين"""
+        return {label: value for (key, label), value in self.counters.items() if key == name}
+
+    def histograms_by_label(self, name):
+        """{label: Histogram} لمدرج معين"""
+        return {label: histogram for (key, label), histogram in self.histograms.items() if key == name}
+
+    def slowest_guilds(self, limit=5):
+        """الخوادم الأعلى متوسط زمن معالجة: [(guild_id, avg_seconds, count)]"""
+        ranked = sorted(
+            ((guild_id, total / count, count) for guild_id, (count, total) in self.guild_times.items()),
+            key=lambda entry: entry[1],
+            reverse=True
+        )
+        return ranked[:limit]
+
+    def render_prometheus(self):
+        """المقاييس بصيغة Prometheus النصية"""
+        lines = []
+        seen = set()
+        for (name, label), value in sorted(self.counters.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            metric = f"bot_{name}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f'{metric}{{{_label(name, label)}}} {value}' if label is not None else f"{metric} {value}")
+
+        for (name, label), histogram in sorted(self.histograms.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            metric = f"bot_{name}_seconds"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            prefix = f'{_label(name, label)},' if label is not None else ''
+            running = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, histogram.counts):
+                running += bucket_count
+                lines.append(f'{metric}_bucket{{{prefix}le="{bound}"}} {running}')
+            lines.append(f'{metric}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+            label_text = f'{{{_label(name, label)}}}' if label is not None else ''
+            lines.append(f"{metric}_sum{label_text} {histogram.total:.6f}")
+            lines.append(f"{metric}_count{label_text} {histogram.count}")
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def _ms(seconds):
+    """تنسيق المدة بالملّي ثانية"""
+    return f"{seconds * 1000:.2f}ms"
+
+
+def format_report(metrics, limit=5):
+    """ملخص نصي للمقاييس: [(العنوان، النص)]"""
+    sections = [(
+        "📨 الرسائل",
+        f"مستلمة: {metrics.counter('messages')} | ردود: {metrics.counter('replies')}"
+    )]
+
+    stages = metrics.histograms_by_label('stage')
+    handler = metrics.histograms.get(('handler', None))
+    lines = [
+        f"`{stage}` p50 {_ms(h.quantile(0.5))} | p99 {_ms(h.quantile(0.99))} ({h.count})"
+        for stage, h in sorted(stages.items())
+    ]
+    if handler is not None:
+        lines.append(f"`handler` p50 {_ms(handler.quantile(0.5))} | p99 {_ms(handler.quantile(0.99))} ({handler.count})")
+    sections.append(("⏱️ مراحل on_message", "\n".join(lines) or "لا توجد بيانات"))
+
+    command_counts = metrics.counters_by_label('commands')
+    command_times = metrics.histograms_by_label('command')
+    top_commands = sorted(command_counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+    lines = []
+    for name, count in top_commands:
+        h = command_times.get(name)
+        timing = f" | p50 {_ms(h.quantile(0.5))} | p99 {_ms(h.quantile(0.99))}" if h else ""
+        lines.append(f"`{name}` × {count}{timing}")
+    sections.append(("⌨️ الأوامر", "\n".join(lines) or "لا توجد بيانات"))
+
+    routes = metrics.counters_by_label('routes')
+    if routes:
+        sections.append(("🔀 المسارات", " | ".join(f"{route}: {count}" for route, count in sorted(routes.items()))))
+
+    shed = metrics.counters_by_label('shed')
+    if shed:
+        sections.append(("🚦 المُسقطة من الطابور", " | ".join(f"{route}: {count}" for route, count in sorted(shed.items()))))
+
+    matches = metrics.counters_by_label('matches')
+    if matches:
+        sections.append(("🔤 المطابقات", " | ".join(f"{category}: {count}" for category, count in sorted(matches.items()))))
+
+    errors = metrics.counters_by_label('errors')
+    if errors:
+        sections.append(("⚠️ الأخطاء", " | ".join(f"{kind}: {count}" for kind, count in sorted(errors.items()))))
+
+    slow = metrics.slowest_guilds(limit)
+    if slow:
+        sections.append(("🐢 أبطأ الخوادم", "\n".join(
+            f"`{guild_id}` {_ms(avg)} ({count})" for guild_id, avg, count in slow
+        )))
+
+    return sections
+
+
+class StartupProfile:
+    """أزمنة مراحل التشغيل البارد بالترتيب، لمعرفة أين يذهب وقت إعادة التشغيل"""
+
+    def __init__(self, began=None):
+        self.began = time.perf_counter() if began is None else began
+        self._last = self.began
+        # [(المرحلة، المدة بالثواني، المرحلة الأم أو None)]
+        self.phases = []
+        self.finished = None
+
+    def record(self, name, seconds, parent=None):
+        self.phases.append((name, seconds, parent))
+
+    def mark(self, name):
+        """إنهاء مرحلة تمتد من نهاية المرحلة السابقة حتى الآن"""
+        now = time.perf_counter()
+        self.record(name, now - self._last)
+        self._last = now
+
+    def finish(self, name):
+        """تسجيل المرحلة الأخيرة وتثبيت الزمن الإجمالي (مرة واحدة فقط)"""
+        if self.finished is None:
+            self.mark(name)
+            self.finished = self._last - self.began
+
+    @property
+    def total(self):
+        return self.finished if self.finished is not None else time.perf_counter() - self.began
+
+    def report(self):
+        """تقرير نصي بالمراحل ونسبة كل منها من الإجمالي"""
+        total = self.total
+        lines = [f"🚀 التشغيل البارد: {_ms(total)}"]
+        for name, seconds, parent in self.phases:
+            if parent is not None:
+                continue
+            share = f" ({seconds / total:.0%})" if total else ""
+            lines.append(f"   {name}: {_ms(seconds)}{share}")
+            # المراحل الفرعية (مثل كل إضافة) تحت مرحلتها، وقد تتداخل زمنياً
+            for child, child_seconds, child_parent in self.phases:
+                if child_parent == name:
+                    lines.append(f"      ↳ {child}: {_ms(child_seconds)}")
+        return "\n".join(lines)
+
+
+def get_metrics(bot):
+    """إرجاع سجل المقاييس المشترك للبوت (METRICS_ENABLED=0 لتعطيله)"""
+    metrics = getattr(bot, 'metrics', None)
+    if metrics is None:
+        metrics = Metrics(enabled=os.getenv('METRICS_ENABLED', '1') != '0')
+        bot.metrics = metrics
+    return metrics
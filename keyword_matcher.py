@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+محرك مطابقة الكلمات المفتاحية (Aho–Corasick)
+يُبنى مرة واحدة من جداول الكلمات ويجد أول فئة مطابقة بمرور واحد على النص
+"""
+
+from collections import deque
+
+
+class KeywordMatcher:
+    """مطابق كلمات مفتاحية مُجمّع يحافظ على ترتيب أولوية الفئات"""
+
+    def __init__(self, keywords):
+        # keywords: قاموس {الفئة: [الكلمات]} وترتيبه هو ترتيب الأولوية
+        self.categories = list(keywords)
+        self._build(keywords)
+
+    def _build(self, keywords):
+        """بناء الشجرة وروابط الفشل"""
+        goto = [{}]
+        # أفضل (أصغر) رقم فئة ينتهي عند كل حالة، None إن لم ينتهِ شيء
+        output = [None]
+
+        for priority, category in enumerate(self.categories):
+            for keyword in keywords[category]:
+                if not keyword:
+                    continue
+                state = 0
+                for char in keyword:
+                    next_state = goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][char] = next_state
+                        goto.append({})
+                        output.append(None)
+                    state = next_state
+                if output[state] is None or priority < output[state]:
+                    output[state] = priority
+
+        # حساب روابط الفشل بالعرض ودمج المخرجات على طول السلسلة
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                inherited = output[fail[next_state]]
+                if inherited is not None and (output[next_state] is None or inherited < output[next_state]):
+                    output[next_state] = inherited
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def find_category(self, text):
+        """إرجاع أول فئة مطابقة حسب الأولوية أو None"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        best = None
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = output[state]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    # الفئة الأعلى أولوية، لا داعي لإكمال المسح
+                    break
+
+        return None if best is None else self.categories[best]
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+نقاط الألعاب ولوحة الترتيب
+ترتيب مرتب لكل خادم يُحدَّث بالإدراج الثنائي، فأفضل N وترتيب أي لاعب لا يحتاجان فرز الجميع
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from bisect import bisect_left, insort
+
+from persistence import WriteBehind
+from storage import DATABASE_FILE, connect_database
+
+# مهلة تجميع النتائج قبل الكتابة (بالثواني)
+FLUSH_DELAY = 5.0
+
+# عدد الخوادم التي يبقى ترتيبها في الذاكرة
+CACHE_SIZE = 1000
+
+# النقاط: أساس الفوز + مكافأة السرعة + مكافأة السلسلة
+POINTS_PER_WIN = 10
+MAX_SPEED_BONUS = 5
+SPEED_BONUS_WINDOW = 30.0
+MAX_STREAK_BONUS = 5
+
+
+class PlayerScore:
+    """نتائج لاعب واحد في خادم واحد"""
+
+    __slots__ = ('points', 'wins', 'played', 'streak', 'best_streak', 'best_time', 'total_time')
+
+    def __init__(self, points=0, wins=0, played=0, streak=0, best_streak=0, best_time=None, total_time=0.0):
+        self.points = points
+        self.wins = wins
+        self.played = played
+        self.streak = streak
+        self.best_streak = best_streak
+        self.best_time = best_time
+        self.total_time = total_time
+
+    def rank_key(self, user_id):
+        """مفتاح الترتيب: الأعلى نقاطاً ثم الأكثر فوزاً"""
+        return (-self.points, -self.wins, user_id)
+
+    @property
+    def average_time(self):
+        """متوسط زمن الإجابة الصحيحة بالثواني"""
+        return self.total_time / self.wins if self.wins else None
+
+
+def points_for(won, response_time, streak):
+    """نقاط نتيجة واحدة (streak: السلسلة بعد احتساب هذا الفوز)"""
+    if not won:
+        return 0
+    points = POINTS_PER_WIN + min(streak - 1, MAX_STREAK_BONUS)
+    if response_time is not None and response_time < SPEED_BONUS_WINDOW:
+        points += round(MAX_SPEED_BONUS * (1 - response_time / SPEED_BONUS_WINDOW))
+    return points
+
+
+class SqliteScoreBackend:
+    """جدول النقاط: صف لكل (خادم، لاعب)"""
+
+    def __init__(self, path=DATABASE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        # الاتصال يُفتح عند أول قراءة أو كتابة (في خيط الخلفية) لا عند التشغيل
+        self._conn = None
+
+    def _connection(self):
+        """الاتصال المفتوح، أو فتحه وإنشاء الجدول عند أول استخدام (داخل القفل)"""
+        if self._conn is None:
+            conn = connect_database(self.path)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS game_scores ('
+                ' guild_id TEXT NOT NULL,'
+                ' user_id TEXT NOT NULL,'
+                ' points INTEGER NOT NULL,'
+                ' wins INTEGER NOT NULL,'
+                ' played INTEGER NOT NULL,'
+                ' streak INTEGER NOT NULL,'
+                ' best_streak INTEGER NOT NULL,'
+                ' best_time REAL,'
+                ' total_time REAL NOT NULL,'
+                ' PRIMARY KEY (guild_id, user_id)'
+                ') WITHOUT ROWID'
+            )
+            self._conn = conn
+        return self._conn
+
+    def load_guild(self, guild_id):
+        """جميع لاعبي خادم: {user_id: PlayerScore}"""
+        with self._lock:
+            rows = self._connection().execute(
+                'SELECT user_id, points, wins, played, streak, best_streak, best_time, total_time'
+                ' FROM game_scores WHERE guild_id = ?',
+                (guild_id,)
+            ).fetchall()
+        return {user_id: PlayerScore(*values) for user_id, *values in rows}
+
+    def write(self, rows):
+        """حفظ الصفوف المتغيرة في معاملة واحدة (تعمل في خيط منفصل)"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO game_scores'
+                    ' (guild_id, user_id, points, wins, played, streak, best_streak, best_time, total_time)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class Leaderboard:
+    """نقاط اللاعبين وترتيبهم لكل خادم"""
+
+    def __init__(self, backend=None, cache_size=CACHE_SIZE, flush_delay=FLUSH_DELAY):
+        self.backend = backend or SqliteScoreBackend(os.getenv('STORAGE_DB', DATABASE_FILE))
+        self.cache_size = cache_size
+        self.writer = WriteBehind(self._snapshot, self.backend.write, flush_delay)
+        # {guild_id: {user_id: PlayerScore}} بترتيب آخر استخدام
+        self._players = OrderedDict()
+        # {guild_id: [rank_key]} مرتبة تصاعدياً، فالأول هو المتصدر
+        self._rankings = {}
+
+    async def _guild(self, guild_id):
+        """لاعبو الخادم، يُحمّلون من التخزين عند أول طلب"""
+        players = self._players.get(guild_id)
+        if players is None:
+            loaded = await self.writer.read(self.backend.load_guild, guild_id)
+            # قد يكون طلب آخر حمّل الخادم أثناء الانتظار
+            players = self._players.get(guild_id)
+            if players is None:
+                players = self._players[guild_id] = loaded
+                self._rankings[guild_id] = sorted(
+                    score.rank_key(user_id) for user_id, score in loaded.items()
+                )
+                self._evict()
+        else:
+            self._players.move_to_end(guild_id)
+        return players
+
+    def _evict(self):
+        """إزالة أقدم الخوادم استخداماً عند تجاوز الحد، ويُعاد تحميلها من التخزين عند الطلب"""
+        excess = len(self._players) - self.cache_size
+        if excess <= 0:
+            return
+        # الخادم الذي لديه نقاط لم تُحفظ أو تُكتب الآن يبقى حتى يكتمل حفظها
+        pending = {guild_id for guild_id, _ in self.writer.pending_keys}
+        # الخادم المحمّل للتو (الأخير) لا يُزال
+        for guild_id in list(self._players)[:-1]:
+            if excess <= 0:
+                break
+            if guild_id in pending:
+                continue
+            del self._players[guild_id]
+            del self._rankings[guild_id]
+            excess -= 1
+
+    async def record(self, guild_id, user_id, won, response_time=None):
+        """تسجيل نتيجة لعبة، ويرجع النقاط المكتسبة"""
+        guild_id, user_id = str(guild_id), str(user_id)
+        players = await self._guild(guild_id)
+        ranking = self._rankings[guild_id]
+
+        score = players.get(user_id)
+        if score is None:
+            score = players[user_id] = PlayerScore()
+        else:
+            del ranking[bisect_left(ranking, score.rank_key(user_id))]
+
+        score.played += 1
+        if won:
+            score.wins += 1
+            score.streak += 1
+            score.best_streak = max(score.best_streak, score.streak)
+            if response_time is not None:
+                score.total_time += response_time
+                if score.best_time is None or response_time < score.best_time:
+                    score.best_time = response_time
+        else:
+            score.streak = 0
+        gained = points_for(won, response_time, score.streak)
+        score.points += gained
+
+        insort(ranking, score.rank_key(user_id))
+        self.writer.mark_dirty((guild_id, user_id))
+        return gained
+
+    async def top(self, guild_id, limit=10):
+        """أفضل اللاعبين: [(الترتيب، user_id، PlayerScore)]"""
+        guild_id = str(guild_id)
+        players = await self._guild(guild_id)
+        return [
+            (rank, user_id, players[user_id])
+            for rank, (_, _, user_id) in enumerate(self._rankings[guild_id][:limit], 1)
+        ]
+
+    async def rank(self, guild_id, user_id):
+        """ترتيب لاعب: (الترتيب، عدد اللاعبين، PlayerScore) أو None إذا لم يلعب"""
+        guild_id, user_id = str(guild_id), str(user_id)
+        players = await self._guild(guild_id)
+        score = players.get(user_id)
+        if score is None:
+            return None
+        ranking = self._rankings[guild_id]
+        return bisect_left(ranking, score.rank_key(user_id)) + 1, len(ranking), score
+
+    def _snapshot(self, dirty):
+        """صفوف اللاعبين المتغيرين
+
+        الخوادم التي لها مفاتيح معلقة لا تُزال، فمفتاح خادم غير محمّل لا بيانات له ويُتجاهل
+        """
+        rows = []
+        for guild_id, user_id in dirty:
+            players = self._players.get(guild_id)
+            if players is None:
+                print(f"⚠️ تم تجاهل نقاط الخادم {guild_id}: أُزيل من الذاكرة قبل حفظها")
+                continue
+            score = players[user_id]
+            rows.append((
+                guild_id, user_id, score.points, score.wins, score.played,
+                score.streak, score.best_streak, score.best_time, score.total_time
+            ))
+        return rows
+
+    async def close(self):
+        """حفظ ما تبقى وإغلاق التخزين"""
+        await self.writer.close()
+        self.backend.close()
+
+
+def get_leaderboard(bot):
+    """إرجاع لوحة الترتيب المشتركة للبوت، وإنشاؤها عند أول استخدام"""
+    leaderboard = getattr(bot, 'leaderboard', None)
+    if leaderboard is None:
+        leaderboard = Leaderboard(cache_size=int(os.getenv('LEADERBOARD_CACHE_SIZE', CACHE_SIZE)))
+        bot.leaderboard = leaderboard
+    return leaderboard
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+طابور معالجة الرسائل
+حدث البوابة يضع الرسالة في طابور محدود ويعود فوراً، ومجموعة ثابتة من العمال تعالجها
+رسائل القناة الواحدة تذهب دائماً للعامل نفسه فيُحفظ ترتيبها، والردود التلقائية تُسقط أولاً عند الامتلاء
+"""
+
+import asyncio
+import contextvars
+import time
+from functools import partial
+
+# عدد العمال وسعة الطابور الكلية (تُقسم بالتساوي على العمال)
+DEFAULT_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 2000
+
+# الردود التلقائية تُسقط عندما يمتلئ هذا الجزء من طابور العامل، فيبقى الباقي للأوامر
+LOW_PRIORITY_SHARE = 0.5
+
+# المعالجة الأطول من هذه المدة (لعبة تنتظر لاعباً، أو إرسال مقيد) تُكمل كمهمة منفصلة
+# حتى لا تعطل بقية قنوات العامل (بالثواني)
+HANDLER_BUDGET = 0.25
+
+# أقصى عدد للمعالجات المنفصلة، وعند الامتلاء ينتظر العامل حتى ينتهي أحدها
+MAX_DETACHED = 256
+
+PRIORITY_HIGH = 'high'
+PRIORITY_LOW = 'low'
+
+# (الطابور، القناة، مستقبل التحرير) للمعالج الجاري في المهمة الحالية
+_current = contextvars.ContextVar('message_pipeline_current', default=None)
+
+
+def release_channel():
+    """تحرير قناة المعالج الحالي قبل عمل طويل (لعبة تنتظر اللاعبين)
+
+    رسائل القناة التالية لا تنتظر انتهاءه، ولا يُحتسب ضمن حد المعالجات المنفصلة.
+    خارج الطابور لا تفعل شيئاً
+    """
+    current = _current.get()
+    if current is not None:
+        current[0].release_channel()
+
+
+class MessagePipeline:
+    """طوابير محدودة لكل عامل، والقناة تحدد العامل"""
+
+    def __init__(self, handler, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE,
+                 budget=HANDLER_BUDGET, max_detached=MAX_DETACHED, metrics=None):
+        self.handler = handler
+        self.budget = budget
+        self.max_detached = max(1, max_detached)
+        self.metrics = metrics
+        workers = max(1, workers)
+        per_worker = max(1, queue_size // workers)
+        self._queues = [asyncio.Queue(per_worker) for _ in range(workers)]
+        self._low_limit = max(1, int(per_worker * LOW_PRIORITY_SHARE))
+        self._workers = []
+        # مهام المعالجة التي تجاوزت المهلة، أو تنتظر معالجاً سابقاً في قناتها
+        self._detached = set()
+        # {channel_id: (task, released)} آخر معالج منفصل لكل قناة، والرسالة التالية منها تبدأ بعده
+        self._tails = {}
+        # معالجات حررت قناتها (ألعاب)، وعددها محدود بجلسات الألعاب
+        self._released = set()
+        # عدادات
+        self.processed = 0
+        self.shed = 0
+        self.detached = 0
+        self.chained = 0
+        self.released = 0
+        self.errors = 0
+
+    @property
+    def depth(self):
+        """عدد الرسائل المنتظرة في جميع الطوابير"""
+        return sum(queue.qsize() for queue in self._queues)
+
+    def start(self):
+        """تشغيل العمال (يتطلب حلقة أحداث)"""
+        if not self._workers:
+            loop = asyncio.get_running_loop()
+            self._workers = [loop.create_task(self._work(queue)) for queue in self._queues]
+
+    def submit(self, channel_id, priority, *args):
+        """وضع handler(*args) في طابور القناة دون انتظار، ويرجع False إذا أُسقطت"""
+        if not self._workers:
+            self.start()
+        queue = self._queues[hash(channel_id) % len(self._queues)]
+        if queue.full() or (priority is PRIORITY_LOW and queue.qsize() >= self._low_limit):
+            self.shed += 1
+            return False
+        queue.put_nowait((time.perf_counter(), channel_id, args))
+        return True
+
+    async def _work(self, queue):
+        """معالجة رسائل طابور واحد بالترتيب"""
+        loop = asyncio.get_running_loop()
+        metrics = self.metrics
+        while True:
+            enqueued, channel_id, args = await queue.get()
+            try:
+                if metrics is not None:
+                    metrics.observe('stage', 'queue', time.perf_counter() - enqueued)
+                if channel_id in self._tails:
+                    await self._wait_for_room()
+                previous = self._tails.get(channel_id)
+                released = loop.create_future()
+                task = loop.create_task(self._run(previous, (self, channel_id, released), args))
+                task.add_done_callback(partial(self._finished, channel_id))
+                if previous is not None:
+                    # القناة مشغولة بمعالج منفصل: الرسالة تنتظره في مهمتها، ويكمل العامل بقية القنوات
+                    self.chained += 1
+                    self._detach(channel_id, task, released)
+                    continue
+                # معظم الرسائل تنتهي في الخطوة الأولى دون أي إرسال، فلا حاجة لمؤقت المهلة
+                await asyncio.sleep(0)
+                if not task.done() and not released.done():
+                    await asyncio.wait((task, released), timeout=self.budget, return_when=asyncio.FIRST_COMPLETED)
+                    if not task.done() and not released.done():
+                        await self._wait_for_room(task, released)
+                    if not task.done() and not released.done():
+                        self.detached += 1
+                        self._detach(channel_id, task, released)
+            except Exception as e:
+                print(f"❌ خطأ في عامل الرسائل: {e}")
+            finally:
+                queue.task_done()
+
+    async def _run(self, previous, current, args):
+        """تشغيل المعالج بعد انتهاء معالج القناة السابق أو تحريره لها"""
+        if previous is not None:
+            await asyncio.wait(previous, return_when=asyncio.FIRST_COMPLETED)
+        _current.set(current)
+        await self.handler(*args)
+
+    async def _wait_for_room(self, *running):
+        """انتظار مكان بين المعالجات المنفصلة، أو انتهاء/تحرير المعالج الجاري running"""
+        while len(self._detached) >= self.max_detached:
+            await asyncio.wait(self._detached | set(running), return_when=asyncio.FIRST_COMPLETED)
+            if any(future.done() for future in running):
+                return
+
+    def _detach(self, channel_id, task, released):
+        """ترك المعالج يكمل وحده، ورسائل قناته التالية تنتظره"""
+        self._detached.add(task)
+        self._tails[channel_id] = (task, released)
+
+    def release_channel(self):
+        """تحرير قناة المعالج الحالي إذا كان يعمل في هذا الطابور
+
+        تستدعيه الإضافات عبر bot.pipeline دون استيراد هذه الوحدة
+        """
+        current = _current.get()
+        if current is not None and current[0] is self:
+            _, channel_id, released = current
+            self._release(channel_id, asyncio.current_task(), released)
+
+    def _release(self, channel_id, task, released):
+        """نقل المعالج إلى المحررة: لا يحجز قناته ولا مكاناً بين المنفصلة"""
+        if released.done():
+            return
+        released.set_result(None)
+        self.released += 1
+        self._detached.discard(task)
+        self._released.add(task)
+        tail = self._tails.get(channel_id)
+        if tail is not None and tail[0] is task:
+            del self._tails[channel_id]
+
+    def _finished(self, channel_id, task):
+        """تسجيل انتهاء المعالجة وطباعة أخطائها"""
+        self._detached.discard(task)
+        self._released.discard(task)
+        tail = self._tails.get(channel_id)
+        if tail is not None and tail[0] is task:
+            del self._tails[channel_id]
+        self.processed += 1
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+            print(f"❌ خطأ في معالجة رسالة: {task.exception()}")
+
+    async def join(self):
+        """انتظار معالجة كل ما في الطوابير (المهام المنفصلة والمحررة لا تُنتظر)"""
+        for queue in self._queues:
+            await queue.join()
+
+    def stats(self):
+        """إحصائيات الطابور"""
+        return {
+            'workers': len(self._queues),
+            'queue_depth': self.depth,
+            'processed': self.processed,
+            'shed': self.shed,
+            'detached': self.detached,
+            'chained': self.chained,
+            'released': self.released,
+            'errors': self.errors,
+            'running_detached': len(self._detached),
+            'running_released': len(self._released)
+        }
+
+    async def close(self):
+        """إيقاف العمال وإلغاء المعالجة الجارية"""
+        tasks = self._workers + list(self._detached) + list(self._released)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._detached.clear()
+        self._released.clear()
+        self._tails.clear()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+جدولة الرسائل الصادرة لكل قناة
+دلو رموز لكل قناة، دمج الردود التلقائية المتكررة، وإسقاط الردود منخفضة الأولوية عند الضغط
+"""
+
+import asyncio
+import time
+
+import discord
+from discord.ext import commands
+
+# إعدادات افتراضية: رسالة واحدة في الثانية مع دفعة حتى 5 رسائل
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 5
+# مدة دمج الردود التلقائية المتطابقة في القناة نفسها (بالثواني)
+DEFAULT_REPLY_COOLDOWN = 2.0
+# الفاصل بين عمليات تنظيف الحالة القديمة (بالثواني)
+PRUNE_INTERVAL = 60.0
+
+# الردود التلقائية (ومنها ردود الخوادم المخصصة) لا تنبّه أحداً، فلا يصبح @everyone في رد مخصص تنبيهاً عاماً
+AUTO_REPLY_MENTIONS = discord.AllowedMentions.none()
+
+
+class OutboundScheduler:
+    """مُرسل مع حدود معدل لكل قناة وأولويتين: أوامر وردود تلقائية"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 reply_cooldown=DEFAULT_REPLY_COOLDOWN, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.reply_cooldown = reply_cooldown
+        self._clock = clock
+        # {channel_id: [tokens, last_update]}
+        self._buckets = {}
+        # {(channel_id, key): expires_at} للردود التلقائية المدمجة
+        self._recent = {}
+        self._next_prune = clock() + PRUNE_INTERVAL
+        # عدادات الضغط
+        self.queue_depth = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def _refill(self, channel_id, now):
+        """تعبئة دلو القناة حسب الوقت المنقضي"""
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = [float(self.burst), now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    def _try_take(self, channel_id, now):
+        """أخذ رمز إن وجد، ويرجع مدة الانتظار المطلوبة (0 عند النجاح)"""
+        bucket = self._refill(channel_id, now)
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0
+        return (1 - bucket[0]) / self.rate
+
+    def _prune(self, now):
+        """حذف الدلاء الممتلئة والردود المدمجة المنتهية"""
+        self._next_prune = now + PRUNE_INTERVAL
+        self._recent = {key: expires for key, expires in self._recent.items() if expires > now}
+        full_after = self.burst / self.rate
+        self._buckets = {
+            channel_id: bucket for channel_id, bucket in self._buckets.items()
+            if now - bucket[1] < full_after
+        }
+
+    async def acquire(self, channel_id):
+        """انتظار رمز من دلو القناة (عالي الأولوية: ينتظر بدل الإسقاط)"""
+        self.queue_depth += 1
+        try:
+            while True:
+                wait = self._try_take(channel_id, self._clock())
+                if not wait:
+                    break
+                await asyncio.sleep(wait)
+        finally:
+            self.queue_depth -= 1
+        self.sent += 1
+
+    async def send(self, channel, content=None, **kwargs):
+        """إرسال عالي الأولوية: ينتظر توفر رمز بدل الإسقاط"""
+        await self.acquire(channel.id)
+        return await channel.send(content, **kwargs)
+
+    async def send_auto_reply(self, channel, content, key=None):
+        """إرسال رد تلقائي منخفض الأولوية، يُدمج أو يُسقط بدل الانتظار"""
+        now = self._clock()
+        if now >= self._next_prune:
+            self._prune(now)
+
+        if key is not None:
+            recent_key = (channel.id, key)
+            if self._recent.get(recent_key, 0) > now:
+                self.coalesced += 1
+                return None
+
+        if self._try_take(channel.id, now):
+            self.dropped += 1
+            return None
+
+        if key is not None:
+            self._recent[recent_key] = now + self.reply_cooldown
+        self.sent += 1
+        return await channel.send(content, allowed_mentions=AUTO_REPLY_MENTIONS)
+
+    def stats(self):
+        """إحصائيات الضغط على الإرسال"""
+        return {
+            'queue_depth': self.queue_depth,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'tracked_channels': len(self._buckets)
+        }
+
+
+class ScheduledContext(commands.Context):
+    """سياق أوامر يمر إرساله عبر جدولة القناة، فيُحتسب كل رد من رصيدها"""
+
+    async def send(self, content=None, **kwargs):
+        outbound = getattr(self.bot, 'outbound', None)
+        # ردود التفاعلات لا تخضع لحد رسائل القناة
+        if outbound is None or self.interaction is not None:
+            return await super().send(content, **kwargs)
+        return await outbound.send(self.channel, content, **kwargs)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+حفظ مؤجل وذري للملفات
+يجمع التغييرات خلال فترة قصيرة ثم يكتبها مرة واحدة خارج حلقة الأحداث
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+
+def atomic_write_json(path, data):
+    """كتابة ملف JSON عبر ملف مؤقت ثم استبداله، فلا يبقى ملف نصف مكتوب"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class WriteBehind:
+    """كاتب مؤجل: يجمع المفاتيح المتغيرة ويحفظها دفعة واحدة بعد مهلة"""
+
+    def __init__(self, snapshot, write, delay=2.0, on_written=None):
+        # snapshot(keys): يُستدعى داخل الحلقة لأخذ نسخة ثابتة من البيانات
+        # write(payload): يُستدعى في خيط منفصل لكتابة النسخة على القرص
+        # on_written(payload): اختياري، يُستدعى داخل الحلقة بعد نجاح الكتابة
+        self._snapshot = snapshot
+        self._write = write
+        self._on_written = on_written
+        self.delay = delay
+        self._dirty = set()
+        # المفاتيح التي تُكتب الآن، وتعود إلى _dirty إذا فشلت الكتابة
+        self._writing = frozenset()
+        self._task = None
+        self._lock = asyncio.Lock()
+        self.flush_count = 0
+
+    @property
+    def pending(self):
+        """عدد المفاتيح التي تنتظر الحفظ"""
+        return len(self._dirty)
+
+    @property
+    def pending_keys(self):
+        """نسخة من المفاتيح التي لم يكتمل حفظها، ومنها ما يُكتب الآن"""
+        return frozenset(self._dirty | self._writing)
+
+    @property
+    def busy(self):
+        """هل هناك حفظ جارٍ الآن"""
+        return self._lock.locked()
+
+    def mark_dirty(self, key):
+        """تسجيل مفتاح متغير وجدولة الحفظ"""
+        self._dirty.add(key)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # لا توجد حلقة أحداث (سكربتات وأدوات): حفظ فوري
+            self.flush_sync()
+            return
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        """انتظار المهلة ثم الحفظ، مع التكرار إذا تغيرت البيانات أثناء الكتابة"""
+        while True:
+            await asyncio.sleep(self.delay)
+            # الحماية من الإلغاء حتى لا تنقطع كتابة بدأت بالفعل
+            await asyncio.shield(self.flush())
+            if not self._dirty:
+                break
+
+    def _take_dirty(self):
+        """أخذ المفاتيح المتغيرة وتصفير القائمة"""
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    async def flush(self):
+        """حفظ جميع التغييرات المعلقة الآن"""
+        async with self._lock:
+            dirty = self._take_dirty()
+            if not dirty:
+                return
+            payload = self._snapshot(dirty)
+            self._writing = frozenset(dirty)
+            try:
+                await asyncio.to_thread(self._write, payload)
+                self.flush_count += 1
+            except Exception as e:
+                # إعادة المفاتيح لمحاولة الحفظ في المرة القادمة
+                self._dirty |= dirty
+                print(f"❌ خطأ في حفظ البيانات: {e}")
+                return
+            finally:
+                self._writing = frozenset()
+            if self._on_written is not None:
+                self._on_written(payload)
+
+    async def read(self, fn, *args):
+        """قراءة من التخزين في خيط منفصل دون تداخل مع حفظ جارٍ"""
+        async with self._lock:
+            return await asyncio.to_thread(fn, *args)
+
+    def flush_sync(self):
+        """حفظ متزامن يُستخدم خارج حلقة الأحداث"""
+        dirty = self._take_dirty()
+        if dirty:
+            payload = self._snapshot(dirty)
+            self._write(payload)
+            self.flush_count += 1
+            if self._on_written is not None:
+                self._on_written(payload)
+
+    async def close(self):
+        """إلغاء المهلة المعلقة وحفظ ما تبقى قبل الإغلاق"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+محرك اختيار الردود
+كل فئة تُجمّع مرة واحدة في جدول ثابت، والاختيار بزمن ثابت:
+دوران بكيس مخلوط لكل قناة فلا يتكرر الرد قبل استنفاد الفئة، وطريقة الأسماء المستعارة (alias) للأوزان
+حزم ردود إضافية تُقرأ من ملفات JSON في RESPONSES_DATA_DIR دون تعديل الكود
+"""
+
+import json
+import os
+import random
+from collections import OrderedDict
+
+from responses import ArabicResponses, ARABIC_EMOJIS, PRAYERS
+
+RESPONSES_DATA_DIR = 'responses_data'
+
+# أقصى عدد أكياس (قناة، حزمة، فئة) تُحفظ في الذاكرة
+MAX_BAGS = 10000
+
+# الحزم المدمجة
+PACK_REPLIES = 'replies'
+PACK_TIME = 'time'
+PACK_INTERACTIVE = 'interactive'
+PACK_EMOTIONS = 'emotions'
+PACK_EMOJIS = 'emojis'
+PACK_QUESTIONS = 'questions'
+PACK_PRAYERS = 'prayers'
+
+
+class ResponseTable:
+    """ردود فئة واحدة مع جدول الأسماء المستعارة عند وجود أوزان"""
+
+    __slots__ = ('items', '_prob', '_alias')
+
+    def __init__(self, entries):
+        """entries: [(النص، الوزن)]"""
+        self.items = tuple(text for text, _ in entries)
+        weights = [weight for _, weight in entries]
+        self._prob = self._alias = None
+        if len(set(weights)) > 1:
+            self._prob, self._alias = _build_alias(weights)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def weighted(self):
+        return self._prob is not None
+
+    def sample_index(self):
+        """فهرس عشوائي حسب الأوزان بزمن ثابت"""
+        index = random.randrange(len(self.items))
+        if self._prob is not None and random.random() >= self._prob[index]:
+            index = self._alias[index]
+        return index
+
+
+def _build_alias(weights):
+    """جدولا الاحتمال والبديل بطريقة Vose"""
+    count = len(weights)
+    total = float(sum(weights))
+    scaled = [weight * count / total for weight in weights]
+    prob = [1.0] * count
+    alias = list(range(count))
+    small = [index for index, value in enumerate(scaled) if value < 1.0]
+    large = [index for index, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+        prob[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+    return tuple(prob), tuple(alias)
+
+
+def _entries(values):
+    """تحويل عناصر الفئة إلى [(النص، الوزن)]: نص، أو {"text": ..., "weight": ...}"""
+    entries = []
+    for value in values:
+        if isinstance(value, dict):
+            weight = float(value.get('weight', 1))
+            if weight <= 0:
+                raise ValueError(f"وزن غير صالح: {weight}")
+            entries.append((str(value['text']), weight))
+        else:
+            entries.append((str(value), 1.0))
+    return entries
+
+
+class ResponseEngine:
+    """جداول الردود لكل (حزمة، فئة) وأكياس الدوران لكل قناة"""
+
+    def __init__(self, data_dir=RESPONSES_DATA_DIR, max_bags=MAX_BAGS):
+        # {(pack, category): [(النص، الوزن)]} العناصر الخام قبل التجميع
+        self._entries = {}
+        # {(pack, category): ResponseTable}
+        self._tables = {}
+        # {(channel_id, pack, category): [ترتيب الكيس، الموضع، آخر فهرس]}
+        self._bags = OrderedDict()
+        self.max_bags = max_bags
+        # {category: [كلمات]} كلمات مفتاحية جديدة من ملفات الحزم لفئات الردود التلقائية
+        self.keywords = {}
+
+        self.add_pack(PACK_TIME, ArabicResponses.TIME_RESPONSES)
+        self.add_pack(PACK_INTERACTIVE, ArabicResponses.INTERACTIVE_RESPONSES)
+        self.add_pack(PACK_EMOTIONS, ArabicResponses.EMOTION_RESPONSES)
+        self.add_pack(PACK_EMOJIS, ARABIC_EMOJIS)
+        self.add_pack(PACK_QUESTIONS, {'general': ArabicResponses.QUESTIONS})
+        self.add_pack(PACK_PRAYERS, {'general': PRAYERS})
+        if data_dir and os.path.isdir(data_dir):
+            self.load_packs(data_dir)
+
+    def add_pack(self, pack, categories):
+        """إضافة فئات حزمة (أو توسيع الموجودة) وإعادة تجميع جداولها"""
+        for category, values in categories.items():
+            key = (pack, category)
+            entries = self._entries.setdefault(key, [])
+            entries.extend(_entries(values))
+            if entries:
+                self._tables[key] = ResponseTable(entries)
+            # الأكياس القديمة بُنيت على حجم مختلف
+            for bag_key in [bag_key for bag_key in self._bags if bag_key[1:] == key]:
+                del self._bags[bag_key]
+
+    def load_packs(self, data_dir):
+        """قراءة حزم الردود من ملفات JSON
+
+        {"pack": "replies", "categories": {فئة: [ردود]}, "keywords": {فئة: [كلمات]}}
+        الرد نص، أو {"text": ..., "weight": ...} للاختيار الموزون
+        الكلمات المفتاحية تُقبل من حزم الردود التلقائية (replies) فقط، فهي وحدها تُختار منها الردود
+        """
+        loaded = 0
+        for name in sorted(os.listdir(data_dir)):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(data_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                pack = data.get('pack', PACK_REPLIES)
+                self.add_pack(pack, data['categories'])
+                keywords = data.get('keywords', {})
+                if keywords and pack != PACK_REPLIES:
+                    print(f"⚠️ تجاهل الكلمات المفتاحية في {path}: الحزمة {pack} ليست {PACK_REPLIES}")
+                    keywords = {}
+                for category, words in keywords.items():
+                    self.keywords.setdefault(category, []).extend(str(word) for word in words)
+                loaded += 1
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                print(f"❌ خطأ في تحميل حزمة الردود {path}: {e}")
+        return loaded
+
+    def has(self, pack, category):
+        return (pack, category) in self._tables
+
+    def categories(self, pack):
+        """فئات حزمة معينة"""
+        return sorted(category for table_pack, category in self._tables if table_pack == pack)
+
+    def pick(self, pack, category, channel_id=None, default=None):
+        """اختيار رد من الفئة، مع منع التكرار داخل القناة عند تمرير channel_id"""
+        table = self._tables.get((pack, category))
+        if table is None:
+            return default
+        if channel_id is None or len(table) == 1:
+            return table.items[table.sample_index()]
+
+        key = (channel_id, pack, category)
+        bag = self._bags.get(key)
+        if bag is None:
+            bag = self._bags[key] = [None, 0, None]
+            if len(self._bags) > self.max_bags:
+                self._bags.popitem(last=False)
+        else:
+            self._bags.move_to_end(key)
+
+        if table.weighted:
+            # الأوزان تحدد التكرار، فيُمنع فقط تكرار الرد نفسه مرتين متتاليتين
+            index = table.sample_index()
+            if index == bag[2]:
+                index = table.sample_index()
+        else:
+            order, position, last = bag
+            if order is None or position >= len(order):
+                order = list(range(len(table)))
+                random.shuffle(order)
+                # الكيس الجديد لا يبدأ بآخر رد من الكيس السابق
+                if order[0] == last:
+                    order[0], order[-1] = order[-1], order[0]
+                bag[0] = order
+                position = 0
+            index = order[position]
+            bag[1] = position + 1
+        bag[2] = index
+        return table.items[index]
+
+
+def get_response_engine(bot):
+    """إرجاع محرك الردود المشترك للبوت، وإنشاؤه عند أول استخدام"""
+    engine = getattr(bot, 'response_engine', None)
+    if engine is None:
+        engine = ResponseEngine(os.getenv('RESPONSES_DATA_DIR', RESPONSES_DATA_DIR))
+        bot.response_engine = engine
+    return engine
@@ -101,19 +101,24 @@ class ArabicResponses:
     ]
     
     @staticmethod
-    def get_time_based_response():
-        """الحصول على رد حسب الوقت الحالي"""
-        now = datetime.datetime.now()
-        hour = now.hour
+    def time_period(hour=None):
+        """فترة اليوم (مفتاح في TIME_RESPONSES) حسب الساعة الحالية"""
+        if hour is None:
+            hour = datetime.datetime.now().hour
         
         if 5 <= hour < 12:
-            return random.choice(ArabicResponses.TIME_RESPONSES['morning'])
+            return 'morning'
         elif 12 <= hour < 17:
-            return random.choice(ArabicResponses.TIME_RESPONSES['afternoon'])
+            return 'afternoon'
         elif 17 <= hour < 22:
-            return random.choice(ArabicResponses.TIME_RESPONSES['evening'])
+            return 'evening'
         else:
-            return random.choice(ArabicResponses.TIME_RESPONSES['night'])
+            return 'night'
+    
+    @staticmethod
+    def get_time_based_response():
+        """الحصول على رد حسب الوقت الحالي"""
+        return random.choice(ArabicResponses.TIME_RESPONSES[ArabicResponses.time_period()])
     
     @staticmethod
     def get_random_response(category):
@@ -134,6 +139,15 @@ class ArabicResponses:
         """الحصول على سؤال عشوائي للتفاعل"""
         return random.choice(ArabicResponses.QUESTIONS)
 
+# أدعية
+PRAYERS = [
+    "اللهم اهدنا فيمن هديت 🤲",
+    "ربنا آتنا في الدنيا حسنة وفي الآخرة حسنة وقنا عذاب النار 🙏",
+    "اللهم أعنا على ذكرك وشكرك وحسن عبادتك 💙",
+    "ربنا اغفر لنا ذنوبنا وإسرافنا في أمرنا 🌟",
+    "اللهم بارك لنا فيما رزقتنا ✨"
+]
+
 # إيموجي عربية شائعة
 ARABIC_EMOJIS = {
     'celebration': ['🎉', '🎊', '✨', '🌟', '💫', '🎈'],
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+وضع الشظايا (Sharding)
+يُفعّل من متغيرات البيئة، ويوفر إحصائيات زمن الاستجابة وعدد الخوادم لكل شظية
+"""
+
+import os
+
+from discord.ext import commands
+
+# رموز خروج عملية البوت، يقرؤها مشرف العنقود
+EXIT_OK = 0
+# تعطل أو انقطاع (البوابة، الشبكة): يُعاد التشغيل
+EXIT_FAILURE = 1
+# إعدادات خاطئة (توكن مفقود أو غير صالح، صلاحيات intents): إعادة التشغيل لن تفيد
+EXIT_CONFIG_ERROR = 78
+
+def parse_shard_ids(text):
+    """تحويل '0,1,4-7' إلى قائمة أرقام الشظايا"""
+    shard_ids = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            shard_ids.extend(range(int(start), int(end) + 1))
+        else:
+            shard_ids.append(int(part))
+    return sorted(set(shard_ids))
+
+
+def shard_options():
+    """إعدادات الشظايا من البيئة، أو None للوضع العادي بلا شظايا
+
+    SHARD_COUNT: عدد الشظايا الكلي، أو auto ليحدده ديسكورد
+    SHARD_IDS: الشظايا التي تتولاها هذه العملية (مثل 0-3)، وتتطلب SHARD_COUNT
+    """
+    count = os.getenv('SHARD_COUNT', '').strip().lower()
+    ids = os.getenv('SHARD_IDS', '').strip()
+    if not count:
+        if ids:
+            raise ValueError('SHARD_IDS يتطلب تحديد SHARD_COUNT')
+        return None
+    if count == 'auto':
+        if ids:
+            raise ValueError('SHARD_IDS لا يعمل مع SHARD_COUNT=auto')
+        return {}
+
+    options = {'shard_count': int(count)}
+    if options['shard_count'] < 1:
+        raise ValueError(f'SHARD_COUNT غير صالح: {count}')
+    if ids:
+        shard_ids = parse_shard_ids(ids)
+        if not shard_ids:
+            raise ValueError(f'SHARD_IDS لا يحدد أي شظية: {ids}')
+        if shard_ids[-1] >= options['shard_count']:
+            raise ValueError(f'رقم الشظية {shard_ids[-1]} خارج SHARD_COUNT={count}')
+        options['shard_ids'] = shard_ids
+    return options
+
+
+def create_bot(**kwargs):
+    """إنشاء Bot عادي أو AutoShardedBot حسب إعدادات البيئة"""
+    options = shard_options()
+    if options is None:
+        return commands.Bot(**kwargs)
+    return commands.AutoShardedBot(**kwargs, **options)
+
+
+def latency_ms(latency):
+    """زمن الاستجابة بالملّي ثانية، أو None قبل أول نبضة"""
+    if latency != latency or latency == float('inf'):
+        return None
+    return round(latency * 1000)
+
+
+def shard_stats(bot):
+    """[(shard_id, latency_ms, guilds)] لكل شظية في هذه العملية"""
+    if isinstance(bot, commands.AutoShardedBot):
+        latencies = bot.latencies
+    else:
+        latencies = [(bot.shard_id or 0, bot.latency)]
+
+    guild_counts = {}
+    if len(latencies) == 1:
+        guild_counts[latencies[0][0]] = len(bot.guilds)
+    else:
+        for guild in bot.guilds:
+            guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+
+    return [
+        (shard_id, latency_ms(latency), guild_counts.get(shard_id, 0))
+        for shard_id, latency in sorted(latencies)
+    ]
+
+
+def format_shard_stats(stats, limit=20):
+    """نص مختصر لإحصائيات الشظايا"""
+    lines = []
+    for shard_id, latency, guilds in stats[:limit]:
+        latency_text = f"{latency}ms" if latency is not None else "—"
+        lines.append(f"`#{shard_id}` {latency_text} | {guilds} خادم")
+    if len(stats) > limit:
+        lines.append(f"... و{len(stats) - limit} شظية أخرى")
+    return "\n".join(lines)
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+واجهات تخزين حالة القنوات
+ملفات JSON (الافتراضي) أو قاعدة SQLite بصف واحد لكل (خادم، قناة)
+وكلمات الرد المخصصة لكل خادم: {trigger: [ردود]}
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from persistence import atomic_write_json
+
+# ملفات وقاعدة بيانات حفظ حالة القنوات
+CHANNELS_FILE = 'active_channels.json'
+SETTINGS_FILE = 'channel_settings.json'
+TRIGGERS_FILE = 'guild_triggers.json'
+DATABASE_FILE = 'bot_state.db'
+
+
+def connect_database(path):
+    """اتصال SQLite مشترك بين الخيوط بوضع WAL، والمعاملات تُدار يدوياً"""
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+class JsonChannelBackend:
+    """تخزين حالة القنوات في ملفي JSON كما في الإصدارات السابقة، وملف ثالث للردود المخصصة"""
+
+    # جميع الخوادم تُحمّل عند التشغيل
+    lazy = False
+    # لا يدعم المشاركة بين عدة عمليات
+    shared = False
+
+    def __init__(self, channels_file=CHANNELS_FILE, settings_file=SETTINGS_FILE, triggers_file=TRIGGERS_FILE):
+        self.channels_file = channels_file
+        self.settings_file = settings_file
+        self.triggers_file = triggers_file
+
+    @staticmethod
+    def _load_json(path):
+        """قراءة ملف JSON أو إرجاع قاموس فارغ"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def load_all(self):
+        """تحميل جميع الخوادم: (القنوات النشطة، الإعدادات، الردود المخصصة)"""
+        active_channels = {
+            guild_id: set(channels)
+            for guild_id, channels in self._load_json(self.channels_file).items()
+            if channels
+        }
+        triggers = {guild_id: pack for guild_id, pack in self._load_json(self.triggers_file).items() if pack}
+        return active_channels, self._load_json(self.settings_file), triggers
+
+    def snapshot(self, dirty, active_channels, channel_settings, custom_triggers=None):
+        """نسخة ثابتة من الملفات المتغيرة فقط، تؤخذ داخل حلقة الأحداث"""
+        kinds = {kind for kind, _, _ in dirty}
+        payload = {}
+        if kinds & {'channels', 'guild'}:
+            payload[self.channels_file] = {
+                guild_id: sorted(channels) for guild_id, channels in active_channels.items()
+            }
+        if kinds & {'settings', 'guild'}:
+            payload[self.settings_file] = {
+                guild_id: {channel_id: dict(settings) for channel_id, settings in channels.items()}
+                for guild_id, channels in channel_settings.items()
+            }
+        if kinds & {'triggers', 'guild'}:
+            payload[self.triggers_file] = {
+                guild_id: {trigger: list(responses) for trigger, responses in pack.items()}
+                for guild_id, pack in (custom_triggers or {}).items()
+            }
+        return payload
+
+    def write(self, payload):
+        """كتابة الملفات (تعمل في خيط منفصل)"""
+        for path, data in payload.items():
+            atomic_write_json(path, data)
+
+    def close(self):
+        """لا توجد موارد مفتوحة"""
+
+
+class SqliteChannelBackend:
+    """تخزين حالة القنوات في SQLite، وتحميل كل خادم عند أول طلب"""
+
+    lazy = True
+    # عدة عمليات يمكنها مشاركة نفس القاعدة، مع تتبع تغييرات كل خادم
+    shared = True
+
+    def __init__(self, path=DATABASE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect_database(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS channels ('
+            ' guild_id TEXT NOT NULL,'
+            ' channel_id TEXT NOT NULL,'
+            ' active INTEGER NOT NULL DEFAULT 0,'
+            ' settings TEXT,'
+            ' updated_at REAL NOT NULL,'
+            ' PRIMARY KEY (guild_id, channel_id)'
+            ') WITHOUT ROWID'
+        )
+        # رقم إصدار لكل خادم يزداد مع كل معاملة تعدّله، لتكتشفه العمليات الأخرى
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS guild_versions ('
+            ' guild_id TEXT PRIMARY KEY,'
+            ' version INTEGER NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS guild_versions_version ON guild_versions (version)'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS guild_triggers ('
+            ' guild_id TEXT NOT NULL,'
+            ' trigger TEXT NOT NULL,'
+            ' responses TEXT NOT NULL,'
+            ' PRIMARY KEY (guild_id, trigger)'
+            ') WITHOUT ROWID'
+        )
+
+    def load_guild(self, guild_id):
+        """تحميل خادم واحد: (القنوات النشطة، الإعدادات، الردود المخصصة)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT channel_id, active, settings FROM channels WHERE guild_id = ?',
+                (guild_id,)
+            ).fetchall()
+            trigger_rows = self._conn.execute(
+                'SELECT trigger, responses FROM guild_triggers WHERE guild_id = ?',
+                (guild_id,)
+            ).fetchall()
+        channels = set()
+        settings = {}
+        for channel_id, active, settings_json in rows:
+            if active:
+                channels.add(channel_id)
+            if settings_json:
+                settings[channel_id] = json.loads(settings_json)
+        triggers = {trigger: json.loads(responses) for trigger, responses in trigger_rows}
+        return channels, settings, triggers
+
+    def snapshot(self, dirty, active_channels, channel_settings, custom_triggers=None):
+        """الصفوف المتغيرة فقط: حذف الخوادم الممسوحة ثم تحديث القنوات والردود المخصصة"""
+        reset_guilds = sorted({guild_id for kind, guild_id, _ in dirty if kind == 'guild'})
+        rows = []
+        for guild_id, channel_id in sorted({(g, c) for kind, g, c in dirty if kind in ('channels', 'settings')}):
+            active = channel_id in active_channels.get(guild_id, ())
+            settings = channel_settings.get(guild_id, {}).get(channel_id)
+            settings_json = json.dumps(settings, ensure_ascii=False) if settings else None
+            rows.append((guild_id, channel_id, int(active), settings_json))
+        # الردود المخصصة تُكتب لكل خادم كاملة، فهي قليلة ونادرة التعديل
+        triggers = []
+        for guild_id in sorted({guild_id for kind, guild_id, _ in dirty if kind == 'triggers'}):
+            pack = (custom_triggers or {}).get(guild_id, {})
+            triggers.append((guild_id, [
+                (trigger, json.dumps(list(responses), ensure_ascii=False))
+                for trigger, responses in pack.items()
+            ]))
+        return reset_guilds, rows, triggers
+
+    def write(self, payload):
+        """تطبيق التغييرات في معاملة واحدة (تعمل في خيط منفصل)"""
+        reset_guilds, rows, triggers = payload
+        now = time.time()
+        touched = set(reset_guilds) | {row[0] for row in rows} | {guild_id for guild_id, _ in triggers}
+        with self._lock:
+            conn = self._conn
+            # IMMEDIATE: قفل الكتابة من البداية حتى تتسلسل أرقام الإصدارات بين العمليات
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                version = conn.execute(
+                    'SELECT COALESCE(MAX(version), 0) + 1 FROM guild_versions'
+                ).fetchone()[0]
+                conn.executemany(
+                    'INSERT INTO guild_versions (guild_id, version) VALUES (?, ?)'
+                    ' ON CONFLICT (guild_id) DO UPDATE SET version = excluded.version',
+                    [(guild_id, version) for guild_id in touched]
+                )
+                conn.executemany(
+                    'DELETE FROM channels WHERE guild_id = ?',
+                    [(guild_id,) for guild_id in reset_guilds]
+                )
+                conn.executemany(
+                    'DELETE FROM guild_triggers WHERE guild_id = ?',
+                    [(guild_id,) for guild_id in set(reset_guilds) | {guild_id for guild_id, _ in triggers}]
+                )
+                for guild_id, pack in triggers:
+                    conn.executemany(
+                        'INSERT INTO guild_triggers (guild_id, trigger, responses) VALUES (?, ?, ?)',
+                        [(guild_id, trigger, responses) for trigger, responses in pack]
+                    )
+                for guild_id, channel_id, active, settings_json in rows:
+                    if not active and settings_json is None:
+                        conn.execute(
+                            'DELETE FROM channels WHERE guild_id = ? AND channel_id = ?',
+                            (guild_id, channel_id)
+                        )
+                    else:
+                        conn.execute(
+                            'INSERT INTO channels (guild_id, channel_id, active, settings, updated_at)'
+                            ' VALUES (?, ?, ?, ?, ?)'
+                            ' ON CONFLICT (guild_id, channel_id) DO UPDATE SET'
+                            ' active = excluded.active, settings = excluded.settings,'
+                            ' updated_at = excluded.updated_at',
+                            (guild_id, channel_id, active, settings_json, now)
+                        )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def current_version(self):
+        """آخر رقم إصدار في القاعدة"""
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(MAX(version), 0) FROM guild_versions').fetchone()[0]
+
+    def poll_changes(self, since_version, data_version):
+        """الخوادم التي عدّلتها عمليات أخرى: (data_version، آخر إصدار، الخوادم)
+
+        PRAGMA data_version لا يتغير إلا بمعاملات الاتصالات الأخرى، فيكفي فحصه
+        في أغلب المرات دون قراءة أي جدول
+        """
+        with self._lock:
+            current = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            if current == data_version:
+                return current, since_version, set()
+            rows = self._conn.execute(
+                'SELECT guild_id, version FROM guild_versions WHERE version > ?',
+                (since_version,)
+            ).fetchall()
+        latest = max((version for _, version in rows), default=since_version)
+        return current, latest, {guild_id for guild_id, _ in rows}
+
+    def import_json(self, channels_file=CHANNELS_FILE, settings_file=SETTINGS_FILE, triggers_file=TRIGGERS_FILE):
+        """استيراد ملفات JSON القديمة إلى قاعدة البيانات، ويرجع عدد الصفوف"""
+        active_channels, channel_settings, custom_triggers = JsonChannelBackend(
+            channels_file, settings_file, triggers_file
+        ).load_all()
+        dirty = set()
+        for guild_id, channels in active_channels.items():
+            dirty.update(('channels', guild_id, channel_id) for channel_id in channels)
+        for guild_id, channels in channel_settings.items():
+            dirty.update(('settings', guild_id, channel_id) for channel_id in channels)
+        dirty.update(('triggers', guild_id, None) for guild_id in custom_triggers)
+        payload = self.snapshot(dirty, active_channels, channel_settings, custom_triggers)
+        self.write(payload)
+        return len(payload[1])
+
+    def close(self):
+        """إغلاق الاتصال بقاعدة البيانات"""
+        with self._lock:
+            self._conn.close()
+
+
+def create_backend(name=None):
+    """إنشاء واجهة التخزين حسب المتغير STORAGE_BACKEND (json أو sqlite)"""
+    name = (name or os.getenv('STORAGE_BACKEND', 'json')).lower()
+    if name == 'sqlite':
+        return SqliteChannelBackend(os.getenv('STORAGE_DB', DATABASE_FILE))
+    if name == 'json':
+        return JsonChannelBackend()
+    raise ValueError(f"واجهة تخزين غير معروفة: {name}")
+
+
+def main():
+    """استيراد ملفات JSON الحالية إلى قاعدة SQLite"""
+    backend = SqliteChannelBackend(os.getenv('STORAGE_DB', DATABASE_FILE))
+    count = backend.import_json()
+    backend.close()
+    print(f"✅ تم استيراد {count} قناة إلى {backend.path}")
+
+
+if __name__ == "__main__":
+    main()
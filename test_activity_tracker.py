@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات حساب زيادات النشاط المعلقة وكتابتها الإضافية في SQLite
+"""
+
+import asyncio
+import threading
+
+from activity_tracker import ActivityTracker, SqliteActivityBackend, ActivityStats
+
+
+class FlakyBackend(SqliteActivityBackend):
+    """تخزين تفشل كتابته الأولى، أو تتوقف حتى يُسمح لها"""
+
+    def __init__(self, path, fail=0):
+        super().__init__(path)
+        self.fail = fail
+        self.gate = None
+        self.writes = []
+
+    def write(self, rows):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            self.fail -= 1
+            raise OSError('القرص غير متاح')
+        self.writes.append(sorted(rows))
+        super().write(rows)
+
+
+def test_sqlite_write_adds_to_stored_totals(tmp_path):
+    """الكتابة تضيف الزيادات، فعمليتان تكتبان للمستخدم نفسه دون فقد"""
+    path = str(tmp_path / 'state.db')
+    first, second = SqliteActivityBackend(path), SqliteActivityBackend(path)
+    try:
+        first.write([('1', '2', 3, 1, 0, 0)])
+        second.write([('1', '2', 2, 0, 1, 1), ('1', '3', 1, 0, 0, 0)])
+        first.write([('1', '2', 1, 0, 0, 0)])
+        assert first.load('1', '2') == (6, 1, 1, 1)
+        assert second.load('1', '3') == (1, 0, 0, 0)
+        assert second.load('1', '4') == (0, 0, 0, 0)
+    finally:
+        first.close()
+        second.close()
+
+
+def test_get_stats_merges_stored_and_pending(tmp_path):
+    async def run():
+        path = str(tmp_path / 'state.db')
+        seed = SqliteActivityBackend(path)
+        seed.write([('1', '2', 10, 2, 1, 1)])
+        seed.close()
+
+        tracker = ActivityTracker(SqliteActivityBackend(path), flush_delay=60)
+        try:
+            tracker.record_message(1, 2)
+            tracker.record_game(1, 2, won=True)
+            expected = ActivityStats(11, 2, 2, 2)
+            assert await tracker.get_stats(1, 2) == expected
+            # بعد الحفظ لا تُحتسب الزيادات مرتين، لا في الذاكرة ولا في المخزن
+            await tracker.writer.flush()
+            assert not tracker._pending
+            assert await tracker.get_stats(1, 2) == expected
+            tracker._totals.clear()
+            assert await tracker.get_stats(1, 2) == expected
+            tracker.record_command(1, 2)
+            assert await tracker.get_stats(1, 2) == ActivityStats(11, 3, 2, 2)
+        finally:
+            await tracker.close()
+
+    asyncio.run(run())
+
+
+def test_failed_flush_keeps_deltas_once(tmp_path):
+    """الكتابة الفاشلة تُبقي الزيادات معلقة، والمحاولة التالية تكتبها مرة واحدة"""
+    async def run():
+        backend = FlakyBackend(str(tmp_path / 'state.db'), fail=1)
+        tracker = ActivityTracker(backend, flush_delay=60)
+        try:
+            tracker.record_message(1, 2)
+            tracker.record_message(1, 2)
+            await tracker.writer.flush()
+            assert backend.writes == []
+            assert tracker._pending == {('1', '2'): [2, 0, 0, 0]}
+            assert tracker.writer.pending == 1
+
+            tracker.record_message(1, 2)
+            await tracker.writer.flush()
+            assert backend.writes == [[('1', '2', 3, 0, 0, 0)]]
+            assert not tracker._pending
+            assert backend.load('1', '2') == (3, 0, 0, 0)
+        finally:
+            await tracker.close()
+
+    asyncio.run(run())
+
+
+def test_increments_during_write_stay_pending(tmp_path):
+    """ما يُسجل أثناء كتابة جارية يبقى للمرة القادمة، ولا يُطرح مع المكتوب"""
+    async def run():
+        backend = FlakyBackend(str(tmp_path / 'state.db'))
+        backend.gate = threading.Event()
+        tracker = ActivityTracker(backend, flush_delay=60)
+        try:
+            tracker.record_message(1, 2)
+            flush = asyncio.ensure_future(tracker.writer.flush())
+            await asyncio.sleep(0.01)
+            tracker.record_message(1, 2)
+            tracker.record_command(1, 2)
+            backend.gate.set()
+            await flush
+            assert backend.writes == [[('1', '2', 1, 0, 0, 0)]]
+            assert tracker._pending == {('1', '2'): [1, 1, 0, 0]}
+
+            await tracker.writer.flush()
+            assert backend.load('1', '2') == (2, 1, 0, 0)
+            assert not tracker._pending
+        finally:
+            await tracker.close()
+
+    asyncio.run(run())
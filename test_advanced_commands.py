@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات جولات الألعاب الجماعية مع رسائل discord.Message حقيقية
+"""
+
+import os
+import subprocess
+import sys
+
+from advanced_commands import QuizRound, GuessRound, GUESS_ATTEMPTS
+from game_content import GameItem
+from game_sessions import GameSessionRouter
+from test_arabic_text import make_message
+
+
+def test_quiz_round_check_real_message():
+    """فحص إجابات الجولة الجماعية يمر عبر النص الموحد لرسالة حقيقية"""
+    question = GameItem(
+        prompt='عاصمة مصر؟', answer='القاهرة', options=('القاهرة', 'دمشق'), hint=None,
+        category=None, normalized_answer='القاهره', answers=frozenset({'القاهره', '1'})
+    )
+    quiz = QuizRound(question)
+    router = GameSessionRouter()
+    router.open_round(5, quiz.check)
+    assert not router.dispatch(make_message('دمشق', message_id=20, author_id=3))
+    assert router.dispatch(make_message('القاهرة', message_id=21, author_id=4))
+
+
+def test_guess_round_counts_only_guesses():
+    """الدردشة أثناء الجولة لا تستهلك المحاولات، والرد على رسالة الجولة يُحتسب"""
+    item = GameItem(
+        prompt='ما هو؟', answer='البحر', options=(), hint=None,
+        category=None, normalized_answer='البحر', answers=frozenset({'البحر'})
+    )
+    guess = GuessRound(item)
+    guess.message_id = 100
+    chat = 'هذا لغز صعب جدا يا جماعة'
+    for number in range(GUESS_ATTEMPTS + 2):
+        assert not guess.check(make_message(chat, message_id=30 + number, author_id=3))
+    assert guess.players == {}
+
+    # رد طويل على رسالة الجولة محاولة خاطئة، ورسالة قصيرة محاولة أيضاً
+    assert not guess.check(make_message('اظن ان الجواب هو الجبل', message_id=40, author_id=4, reply_to=100))
+    assert not guess.check(make_message('جبل', message_id=41, author_id=4))
+    assert guess.players == {4: 2}
+    assert guess.check(make_message('بحر!', message_id=42, author_id=3))
+    assert guess.players == {4: 2, 3: 1}
+
+
+def test_cog_loads_without_message_pipeline():
+    """الإضافة تحرر القناة عبر bot.pipeline فلا تستورد وحدة الطابور"""
+    code = (
+        "import sys; sys.modules['message_pipeline'] = None\n"
+        "import advanced_commands\n"
+        "cog = object.__new__(advanced_commands.AdvancedCommands)\n"
+        "cog.bot = object()\n"
+        "cog._release_channel()\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0
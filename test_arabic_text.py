@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات تطبيع النصوص مع رسائل discord.Message حقيقية (دون اتصال)
+"""
+
+import discord
+from discord.http import HTTPClient
+from discord.state import ConnectionState
+
+from arabic_text import normalize_arabic, get_normalized_content
+
+
+def make_message(content, message_id=1, channel_id=5, author_id=2, bot=False, reply_to=None):
+    """رسالة discord.Message حقيقية مبنية من حمولة البوابة (reply_to: معرّف الرسالة المردود عليها)"""
+    state = ConnectionState(
+        dispatch=lambda *args: None, handlers={}, hooks={},
+        http=HTTPClient(None), intents=discord.Intents.default()
+    )
+    data = {
+        'id': str(message_id), 'channel_id': str(channel_id), 'content': content,
+        'author': {'id': str(author_id), 'username': 'user', 'discriminator': '0', 'avatar': None, 'bot': bot},
+        'timestamp': '2024-01-01T00:00:00+00:00', 'edited_timestamp': None, 'type': 0,
+        'tts': False, 'pinned': False, 'mention_everyone': False,
+        'mentions': [], 'mention_roles': [], 'attachments': [], 'embeds': []
+    }
+    if reply_to is not None:
+        data['message_reference'] = {'message_id': str(reply_to), 'channel_id': str(channel_id)}
+    return discord.Message(state=state, channel=discord.Object(id=channel_id), data=data)
+
+
+def test_normalized_content_real_message():
+    """discord.Message يستخدم __slots__، فالتخزين المؤقت يجب ألا يكتب عليه"""
+    message = make_message('مرحباااا بكم')
+    assert get_normalized_content(message) == normalize_arabic('مرحباااا بكم')
+    assert get_normalized_content(message) == 'مرحبا بكم'
+
+
+def test_normalized_content_follows_edits():
+    """الرسالة المعدلة بالمعرّف نفسه تُطبّع من جديد"""
+    assert get_normalized_content(make_message('صباح الخير', message_id=7)) == 'صباح الخير'
+    assert get_normalized_content(make_message('مساء الخير', message_id=7)) == 'مساء الخير'
@@ -60,6 +60,25 @@ def check_bot_files():
         ('responses.py', 'ملف الردود العربية'),
         ('advanced_commands.py', 'ملف الأوامر المتقدمة'),
         ('channel_manager.py', 'مدير القنوات'),
+        ('keyword_matcher.py', 'مطابق الكلمات المفتاحية'),
+        ('arabic_text.py', 'تطبيع النصوص العربية'),
+        ('channel_store.py', 'مخزن حالة القنوات'),
+        ('persistence.py', 'الحفظ المؤجل للملفات'),
+        ('storage.py', 'واجهات التخزين'),
+        ('outbound.py', 'جدولة الرسائل الصادرة'),
+        ('embed_templates.py', 'قوالب الإمبد'),
+        ('game_sessions.py', 'موجّه جلسات الألعاب'),
+        ('game_content.py', 'محرك محتوى الألعاب'),
+        ('health_server.py', 'خادم الصحة والمقاييس'),
+        ('instrumentation.py', 'قياس زمن المعالجة'),
+        ('benchmark.py', 'قياس الأداء دون اتصال'),
+        ('sharding.py', 'وضع الشظايا'),
+        ('cluster.py', 'مشغّل العنقود'),
+        ('activity_tracker.py', 'متتبع نشاط المستخدمين'),
+        ('leaderboard.py', 'لوحة ترتيب اللاعبين'),
+        ('message_pipeline.py', 'طابور معالجة الرسائل'),
+        ('response_engine.py', 'محرك اختيار الردود'),
+        ('guild_triggers.py', 'الردود المخصصة لكل خادم'),
         ('requirements.txt', 'قائمة المكتبات المطلوبة')
     ]
     
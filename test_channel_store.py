@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات مخزن القنوات: المزامنة بين عمليتين عبر SQLite، وذاكرة الإعدادات المدمجة
+"""
+
+import asyncio
+
+from channel_store import ChannelStore
+from storage import SqliteChannelBackend
+
+
+def test_sqlite_version_sync(tmp_path):
+    """تغييرات عملية تظهر لدى الأخرى بعد sync، والتعديلات المحلية المعلقة لا تُفقد"""
+    path = str(tmp_path / 'state.db')
+
+    async def run():
+        first = ChannelStore(SqliteChannelBackend(path), flush_delay=0.01)
+        second = ChannelStore(SqliteChannelBackend(path), flush_delay=0.01)
+        try:
+            await second.load_guild(1)
+            assert second.is_channel_active(1, 10)
+
+            first.activate_channel(1, 11)
+            first.set_channel_setting(1, 11, 'response_chance', 70)
+            await first.flush()
+            assert await second.sync() == 1
+            assert second.get_active_channels(1) == {'11'}
+            assert second.resolve_settings(1, 11).response_chance == 70
+            assert await second.sync() == 0
+
+            # تعديل محلي لم يُحفظ: التحديث ينتظر حتى الحفظ
+            first.activate_channel(1, 12)
+            await first.flush()
+            second.set_channel_setting(1, 13, 'auto_react', False)
+            assert await second.sync() == 0
+            await second.flush()
+            assert await second.sync() == 1
+            assert second.get_active_channels(1) == {'11', '12'}
+            assert not second.resolve_settings(1, 13).auto_react
+
+            first.reset_guild(1)
+            await first.flush()
+            await second.sync()
+            assert second.get_active_channels(1) == set()
+        finally:
+            await first.close()
+            await second.close()
+
+    asyncio.run(run())
+
+
+def test_resolved_settings_cache_evicts_least_recent(tmp_path):
+    async def run():
+        store = ChannelStore(SqliteChannelBackend(str(tmp_path / 'state.db')), flush_delay=60, resolved_cache_size=2)
+        try:
+            store.set_channel_setting(1, 10, 'response_chance', 70)
+            assert store.resolve_settings(1, 10).response_chance == 70
+            store.resolve_settings(2, 20)
+            store.resolve_settings(1, 10)
+            store.resolve_settings(3, 30)
+            assert list(store._resolved) == ['1', '3']
+            # الخادم المُسقط يُعاد دمج إعداداته، والمعدل منها يبقى صحيحاً
+            assert store.resolve_settings(2, 20).auto_react
+            assert list(store._resolved) == ['3', '2']
+            assert store.resolve_settings(1, 10).response_chance == 70
+            assert len(store._resolved) == 2
+        finally:
+            await store.close()
+
+    asyncio.run(run())
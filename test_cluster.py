@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات توزيع الشظايا على عمليات العنقود
+"""
+
+import pytest
+
+from cluster import split_shards
+
+
+@pytest.mark.parametrize('shard_count, workers, expected', [
+    (1, 1, [[0]]),
+    (4, 2, [[0, 1], [2, 3]]),
+    (5, 2, [[0, 1, 2], [3, 4]]),
+    (7, 3, [[0, 1, 2], [3, 4], [5, 6]]),
+    (3, 8, [[0], [1], [2]]),
+    (4, 0, [[0, 1, 2, 3]]),
+    (4, -1, [[0, 1, 2, 3]]),
+])
+def test_split_shards(shard_count, workers, expected):
+    assert split_shards(shard_count, workers) == expected
+
+
+@pytest.mark.parametrize('shard_count, workers', [(n, w) for n in range(1, 20) for w in range(1, 12)])
+def test_split_shards_covers_every_shard_once(shard_count, workers):
+    """كل شظية في عملية واحدة فقط، والنطاقات متصلة ومتوازنة"""
+    groups = split_shards(shard_count, workers)
+    assert [shard for group in groups for shard in group] == list(range(shard_count))
+    assert all(groups)
+    sizes = [len(group) for group in groups]
+    assert max(sizes) - min(sizes) <= 1
+
+
+@pytest.mark.parametrize('shard_count', [0, -3])
+def test_split_shards_rejects_empty_count(shard_count):
+    with pytest.raises(ValueError):
+        split_shards(shard_count, 2)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات محرك محتوى الألعاب
+"""
+
+import asyncio
+import json
+
+from game_content import GameContent
+
+
+def write_data(directory, questions=(), riddles=(), words=()):
+    (directory / 'quiz.json').write_text(json.dumps({'questions': list(questions)}), encoding='utf-8')
+    (directory / 'riddles.json').write_text(json.dumps({'riddles': list(riddles)}), encoding='utf-8')
+    (directory / 'word_guessing.json').write_text(json.dumps({'words': list(words)}), encoding='utf-8')
+
+
+def test_commands_read_only_loaded_content(tmp_path):
+    """قبل التحميل في الخلفية لا يُقرأ القرص من مسار الأوامر، وبعده تتوفر العناصر"""
+    write_data(tmp_path, riddles=[{'riddle': 'ما هو؟', 'answer': 'الظل'}])
+    content = GameContent(str(tmp_path))
+    assert content.next_item('riddles', 1) is None
+    assert content.count('riddles') == 0
+
+    asyncio.run(content.load())
+    assert content.next_item('riddles', 1).answer == 'الظل'
+    assert content.count('riddles') == 1
+
+
+def test_invalid_entries_are_skipped(tmp_path):
+    """العناصر الناقصة أو التي إجابتها ليست من الخيارات تُتجاهل، والباقي يُحمّل"""
+    write_data(
+        tmp_path,
+        questions=[
+            {'question': 'عاصمة مصر؟', 'options': ['القاهرة', 'دمشق'], 'correct_answer': 'القاهرة'},
+            {'question': 'عاصمة سوريا؟', 'options': ['القاهرة', 'بغداد'], 'correct_answer': 'دمشق'},
+            {'question': 'بلا خيارات', 'correct_answer': 'لا شيء'},
+            'ليس قاموساً',
+        ],
+        words=[{'word': 'قمر', 'hint': 'في السماء ليلاً', 'category': 'طبيعة'}, {'word': 'بلا تلميح'}],
+    )
+    content = GameContent(str(tmp_path))
+    asyncio.run(content.load())
+    assert content.count('quiz') == 1
+    question = content.next_item('quiz', 1)
+    assert question.answer == 'القاهرة'
+    assert question.answers == {'القاهره', '1'}
+    assert content.count('words') == 1
+    assert content.categories('words') == ['طبيعة']
+    assert content.count('words', 'طبيعة') == 1
+
+
+def test_cursor_visits_every_item_once_per_cycle(tmp_path):
+    """خطوة التبديل تمر على كل العناصر مرة واحدة قبل أي تكرار، ولكل قناة مؤشرها"""
+    for size in (1, 2, 6, 7, 12):
+        write_data(tmp_path, riddles=[{'riddle': f'لغز {n}', 'answer': str(n)} for n in range(size)])
+        content = GameContent(str(tmp_path))
+        asyncio.run(content.load())
+        for channel_id in (1, 2):
+            for _ in range(3):
+                cycle = [content.next_item('riddles', channel_id).answer for _ in range(size)]
+                assert sorted(cycle) == sorted(str(n) for n in range(size))
+    assert content.next_item('quiz', 1) is None
+
+
+def test_cursor_cache_evicts_least_recent(tmp_path):
+    write_data(
+        tmp_path,
+        questions=[{'question': 'عاصمة مصر؟', 'options': ['القاهرة', 'دمشق'], 'correct_answer': 'القاهرة'}],
+        riddles=[{'riddle': f'لغز {n}', 'answer': str(n)} for n in range(5)],
+    )
+    content = GameContent(str(tmp_path), cache_size=2)
+    asyncio.run(content.load())
+    content.next_item('riddles', 1)
+    content.next_item('riddles', 2)
+    content.next_item('riddles', 1)
+    content.next_item('quiz', 3)
+    assert list(content._cursors) == [(1, 'riddles', None), (3, 'quiz', None)]
+
+    # إعادة التحميل تسقط مؤشرات النوع المتغير فقط
+    content._reload('riddles', [], None)
+    assert list(content._cursors) == [(3, 'quiz', None)]
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات عجلة المؤقتات وجلسات الألعاب
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from game_sessions import GameSessionRouter, TimerWheel, TIMER_SLOTS
+
+
+def manual_wheel():
+    """عجلة تُدار يدوياً عبر _advance دون مهمة الدوران"""
+    wheel = TimerWheel(tick=1.0)
+    wheel._task = asyncio.get_running_loop().create_future()
+    return wheel
+
+
+def message(channel_id, author_id, content=''):
+    return SimpleNamespace(
+        content=content,
+        channel=SimpleNamespace(id=channel_id),
+        author=SimpleNamespace(id=author_id, bot=False)
+    )
+
+
+def test_wheel_fires_after_full_rotations():
+    """مؤقت أطول من دورة كاملة ينتظر عدد الدورات ثم ينفذ مرة واحدة"""
+    async def run():
+        wheel = manual_wheel()
+        fired = []
+        ticks = TIMER_SLOTS * 2 + 44
+        wheel.schedule(ticks, lambda: fired.append('long'))
+        wheel.schedule(3, lambda: fired.append('short'))
+        for tick in range(1, ticks):
+            wheel._advance()
+            assert fired == ([] if tick < 3 else ['short'])
+        assert len(wheel) == 1
+        wheel._advance()
+        assert fired == ['short', 'long']
+        assert len(wheel) == 0
+        for _ in range(TIMER_SLOTS * 2):
+            wheel._advance()
+        assert fired == ['short', 'long']
+
+    asyncio.run(run())
+
+
+def test_wheel_cancel():
+    """المؤقت الملغى لا ينفذ، والإلغاء المتكرر آمن"""
+    async def run():
+        wheel = manual_wheel()
+        fired = []
+        handle = wheel.schedule(TIMER_SLOTS + 5, lambda: fired.append('cancelled'))
+        wheel.schedule(TIMER_SLOTS + 5, lambda: fired.append('kept'))
+        handle.cancel()
+        handle.cancel()
+        assert len(wheel) == 1
+        for _ in range(TIMER_SLOTS + 5):
+            wheel._advance()
+        assert fired == ['kept']
+        assert len(wheel) == 0
+
+    asyncio.run(run())
+
+
+def test_wheel_callback_error_does_not_stop_others():
+    async def run():
+        wheel = manual_wheel()
+        fired = []
+        wheel.schedule(1, lambda: 1 / 0)
+        wheel.schedule(1, lambda: fired.append('ok'))
+        wheel._advance()
+        assert fired == ['ok']
+
+    asyncio.run(run())
+
+
+def test_session_wait_times_out():
+    async def run():
+        router = GameSessionRouter(TimerWheel(tick=0.01))
+        session = router.open_session(5, 1)
+        with pytest.raises(asyncio.TimeoutError):
+            await session.wait(0.03)
+        assert len(router.wheel) == 0
+        # بعد انتهاء المهلة لا تُستهلك الرسائل
+        assert not router.dispatch(message(5, 1))
+
+    asyncio.run(run())
+
+
+def test_session_feed_and_close():
+    async def run():
+        router = GameSessionRouter(TimerWheel(tick=0.01))
+        session = router.open_session(5, 1)
+        assert router.open_session(5, 1) is None
+        waiter = asyncio.ensure_future(session.wait(5))
+        await asyncio.sleep(0)
+        # رسائل لاعب آخر أو قناة أخرى لا تصل للجلسة
+        assert not router.dispatch(message(5, 2))
+        assert not router.dispatch(message(6, 1))
+        answer = message(5, 1, 'جواب')
+        assert router.dispatch(answer)
+        assert await waiter is answer
+        # المؤقت أُلغي عند الاستلام
+        assert len(router.wheel) == 0
+        session.close()
+        assert not router.sessions
+        assert router.open_session(5, 1) is not None
+
+    asyncio.run(run())
+
+
+def test_round_session_first_correct_wins():
+    async def run():
+        router = GameSessionRouter(TimerWheel(tick=0.01))
+        session = router.open_round(5, lambda msg: msg.content == 'صح')
+        assert router.open_round(5, lambda msg: True) is None
+        assert not router.dispatch(message(5, 1, 'خطأ'))
+        winner = message(5, 2, 'صح')
+        # الإجابة قبل بدء الانتظار لا تضيع
+        assert router.dispatch(winner)
+        assert not router.dispatch(message(5, 3, 'صح'))
+        assert await session.wait(1) is winner
+        session.close()
+        assert not router.sessions
+
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات الردود المخصصة لكل خادم: إعادة بناء المطابق، وذاكرة LRU، والحفظ عبر JSON و SQLite
+"""
+
+import asyncio
+
+import pytest
+
+from channel_store import ChannelStore
+from guild_triggers import GuildTriggers, normalize_trigger
+from storage import JsonChannelBackend, SqliteChannelBackend
+
+
+def json_backend(tmp_path):
+    return JsonChannelBackend(
+        str(tmp_path / 'channels.json'), str(tmp_path / 'settings.json'), str(tmp_path / 'triggers.json')
+    )
+
+
+def sqlite_backend(tmp_path):
+    return SqliteChannelBackend(str(tmp_path / 'state.db'))
+
+
+def test_matcher_rebuilt_only_after_changes(tmp_path):
+    async def run():
+        store = ChannelStore(json_backend(tmp_path), flush_delay=60)
+        triggers = GuildTriggers(store)
+        try:
+            assert triggers.find(1, 'قهوة') == (None, None)
+            assert triggers.builds == 0
+
+            store.add_trigger(1, 'قهوة', 'جاهزة ☕')
+            assert triggers.find(1, 'اريد قهوة الان') == ('قهوة', ('جاهزة ☕',))
+            assert triggers.find(1, 'قهوة') == ('قهوة', ('جاهزة ☕',))
+            assert triggers.builds == 1
+
+            # العبارة الأطول تغلب الكلمة داخلها، والإضافة تعيد البناء
+            store.add_trigger(1, 'قهوة عربية', 'بالهيل')
+            assert triggers.find(1, 'قهوة عربية') == ('قهوة عربية', ('بالهيل',))
+            assert triggers.builds == 2
+
+            store.remove_trigger(1, 'قهوة عربية')
+            assert triggers.find(1, 'قهوة عربية') == ('قهوة', ('جاهزة ☕',))
+            assert triggers.builds == 3
+            store.remove_trigger(1, 'قهوة')
+            assert triggers.find(1, 'قهوة') == (None, None)
+        finally:
+            await store.close()
+
+    asyncio.run(run())
+
+
+def test_matcher_cache_evicts_least_recent(tmp_path):
+    async def run():
+        store = ChannelStore(json_backend(tmp_path), flush_delay=60)
+        triggers = GuildTriggers(store, cache_size=2)
+        try:
+            for guild_id in (1, 2, 3):
+                store.add_trigger(guild_id, 'شاي', f'شاي {guild_id}')
+            triggers.find(1, 'شاي')
+            triggers.find(2, 'شاي')
+            triggers.find(1, 'شاي')
+            triggers.find(3, 'شاي')
+            assert list(triggers._matchers) == ['1', '3']
+            assert triggers.builds == 3
+            # الخادم المُسقط يُعاد بناؤه عند رسالته التالية
+            assert triggers.find(2, 'شاي') == ('شاي', ('شاي 2',))
+            assert triggers.builds == 4
+            assert len(triggers) == 2
+        finally:
+            await store.close()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize('make_backend', [json_backend, sqlite_backend])
+def test_triggers_survive_reload(tmp_path, make_backend):
+    async def run():
+        store = ChannelStore(make_backend(tmp_path), flush_delay=60)
+        trigger = normalize_trigger('  صباح   الخير ')
+        store.add_trigger(1, trigger, 'صباح النور')
+        store.add_trigger(1, trigger, 'صباح الورد')
+        store.add_trigger(2, 'قهوة', 'جاهزة')
+        store.remove_trigger(2, 'قهوة')
+        await store.close()
+
+        reloaded = ChannelStore(make_backend(tmp_path), flush_delay=60)
+        try:
+            await reloaded.load_guild(1)
+            await reloaded.load_guild(2)
+            assert reloaded.get_triggers(1) == {'صباح الخير': ('صباح النور', 'صباح الورد')}
+            assert reloaded.get_triggers(2) is None
+            assert GuildTriggers(reloaded).find(1, 'صباح الخير يا جماعة')[0] == 'صباح الخير'
+        finally:
+            await reloaded.close()
+
+    asyncio.run(run())
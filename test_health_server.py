@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات نقاط الصحة والجاهزية دون اتصال بالشبكة
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from channel_store import ChannelStore
+from health_server import HealthServer
+from sharding import latency_ms
+from storage import JsonChannelBackend, SqliteChannelBackend
+
+
+class FakeBot:
+    """بوت متصل بإضافة واحدة، وزمن استجابة قابل للتغيير"""
+
+    def __init__(self, latency=float('inf'), store=None):
+        self.latency = latency
+        self.guilds = []
+        self.extensions = {'advanced_commands': object()}
+        self.shard_id = None
+        self.channel_store = store
+
+    def is_ready(self):
+        return True
+
+    def is_closed(self):
+        return False
+
+
+def body(response):
+    return json.loads(response.text)
+
+
+@pytest.mark.parametrize('latency, expected', [
+    (float('inf'), None),
+    (float('nan'), None),
+    (0.0424, 42),
+    (0, 0),
+])
+def test_latency_ms(latency, expected):
+    assert latency_ms(latency) == expected
+
+
+def test_healthz_before_first_heartbeat():
+    server = HealthServer(FakeBot())
+    response = asyncio.run(server.healthz(None))
+    assert response.status == 200
+    assert body(response)['latency_ms'] is None
+
+
+@pytest.mark.parametrize('make_backend', [
+    lambda path: JsonChannelBackend(str(path / 'a.json'), str(path / 'b.json'), str(path / 'c.json')),
+    lambda path: SqliteChannelBackend(str(path / 'state.db')),
+])
+def test_readyz_follows_store_state(tmp_path, make_backend):
+    """غير جاهز بلا مخزن أو بعد إغلاقه، وجاهز بعد التحميل الأولي"""
+    async def run():
+        bot = FakeBot()
+        server = HealthServer(bot, extensions=['advanced_commands'])
+        response = await server.readyz(None)
+        assert response.status == 503 and not body(response)['state_store_loaded']
+
+        bot.channel_store = ChannelStore(make_backend(tmp_path), flush_delay=60)
+        response = await server.readyz(None)
+        assert response.status == 200 and body(response)['state_store_loaded']
+
+        await bot.channel_store.close()
+        response = await server.readyz(None)
+        assert response.status == 503
+
+        server.extensions = ('advanced_commands', 'channel_manager')
+        bot.channel_store = SimpleNamespace(loaded=True)
+        response = await server.readyz(None)
+        assert response.status == 503
+        assert body(response)['extensions_missing'] == ['channel_manager']
+
+    asyncio.run(run())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات مطابق الكلمات المفتاحية مقارنةً بالمسح البسيط
+"""
+
+import random
+
+from keyword_matcher import KeywordMatcher
+
+
+def naive_category(keywords, text):
+    """أول فئة (حسب الترتيب) تظهر أي من كلماتها في النص"""
+    for category, words in keywords.items():
+        if any(word and word in text for word in words):
+            return category
+    return None
+
+
+def test_priority_follows_category_order():
+    """الفئة الأسبق تفوز حتى لو ظهرت كلمة فئة لاحقة أولاً أو داخلها"""
+    keywords = {
+        'greetings': ['سلام'],
+        'thanks': ['شكرا'],
+        'long': ['السلام عليكم', 'شكرا جزيلا'],
+    }
+    matcher = KeywordMatcher(keywords)
+    assert matcher.find_category('شكرا جزيلا والسلام عليكم') == 'greetings'
+    assert matcher.find_category('شكرا جزيلا') == 'thanks'
+    assert matcher.find_category('مرحبا') is None
+    assert matcher.find_category('') is None
+
+
+def test_overlapping_suffix_keywords():
+    """كلمة تنتهي داخل كلمة أطول تُكتشف عبر روابط الفشل"""
+    keywords = {'first': ['بحر'], 'second': ['ابحر', 'حر']}
+    matcher = KeywordMatcher(keywords)
+    assert matcher.find_category('ابحر') == 'first'
+    assert matcher.find_category('حرارة') == 'second'
+
+
+def test_matches_naive_scan():
+    """نتائج المطابق تطابق المسح البسيط على نصوص وكلمات عشوائية متداخلة"""
+    rng = random.Random(1234)
+    alphabet = 'ابتسلمه '
+    for _ in range(200):
+        keywords = {}
+        for category in range(rng.randint(1, 6)):
+            keywords[f'c{category}'] = [
+                ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                for _ in range(rng.randint(0, 4))
+            ]
+        matcher = KeywordMatcher(keywords)
+        for _ in range(20):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            assert matcher.find_category(text) == naive_category(keywords, text), (keywords, text)
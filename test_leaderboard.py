@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات لوحة الترتيب وإزالة الخوادم الخاملة من الذاكرة
+"""
+
+import asyncio
+import threading
+
+from leaderboard import Leaderboard, SqliteScoreBackend
+
+
+def test_idle_guilds_evicted_and_reloaded(tmp_path):
+    """تُزال أقدم الخوادم بعد حفظ نقاطها، ويُعاد تحميلها من SQLite بالترتيب نفسه"""
+    async def run():
+        board = Leaderboard(SqliteScoreBackend(str(tmp_path / 'state.db')), cache_size=2, flush_delay=60)
+        try:
+            await board.record(1, 10, True, 5.0)
+            await board.record(1, 11, False)
+            await board.record(2, 20, True)
+            # الخادم 1 لم يُحفظ بعد فيبقى رغم تجاوز الحد
+            await board.record(3, 30, True)
+            assert set(board._players) == {'1', '2', '3'}
+
+            await board.writer.flush()
+            await board.top(2)
+            await board.record(4, 40, True)
+            # بعد الحفظ يُزال الأقدم استخداماً، ويبقى 2 لأنه استُخدم مؤخراً
+            assert list(board._players) == ['2', '4']
+            assert set(board._rankings) == {'2', '4'}
+
+            leaders = await board.top(1)
+            assert [(rank, user_id) for rank, user_id, _ in leaders] == [(1, '10'), (2, '11')]
+            assert leaders[0][2].best_time == 5.0
+            assert (await board.rank(1, 11))[:2] == (2, 2)
+            assert len(board._players) == 2
+        finally:
+            await board.close()
+
+    asyncio.run(run())
+
+
+class FlakyScoreBackend(SqliteScoreBackend):
+    """كتابة تنتظر إشارة ثم تفشل عند الطلب"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.fail = False
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def write(self, rows):
+        self.gate.wait()
+        if self.fail:
+            raise OSError('القرص غير متاح')
+        super().write(rows)
+
+
+def test_guild_kept_while_its_scores_are_written(tmp_path):
+    """لا يُزال خادم نقاطه قيد الكتابة، فإذا فشلت وأُعيدت مفاتيحها يجد الحفظ التالي بياناتها"""
+    async def run():
+        backend = FlakyScoreBackend(str(tmp_path / 'state.db'))
+        board = Leaderboard(backend, cache_size=1, flush_delay=60)
+        try:
+            await board.record(1, 10, True)
+            await board.record(2, 20, True)
+            backend.fail = True
+            backend.gate.clear()
+            flush = asyncio.create_task(board.writer.flush())
+            await asyncio.sleep(0.01)
+            assert board.writer.pending == 0
+            assert board.writer.pending_keys == {('1', '10'), ('2', '20')}
+            board._evict()
+            assert list(board._players) == ['1', '2']
+
+            backend.gate.set()
+            await flush
+            assert board.writer.pending == 2
+            backend.fail = False
+            await board.writer.flush()
+            await board.record(3, 30, False)
+            assert list(board._players) == ['3']
+            assert (await board.rank(1, 10))[2].wins == 1
+        finally:
+            await board.close()
+
+    asyncio.run(run())
+
+
+def test_snapshot_skips_unloaded_guilds(tmp_path):
+    async def run():
+        board = Leaderboard(SqliteScoreBackend(str(tmp_path / 'state.db')), flush_delay=60)
+        try:
+            await board.record(1, 10, True)
+            assert board._snapshot({('9', '90'), ('1', '10')}) == [('1', '10', 10, 1, 1, 1, 1, None, 0.0)]
+        finally:
+            await board.close()
+
+    asyncio.run(run())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات طابور الرسائل: ترتيب القناة بعد الفصل، وحد المعالجات المنفصلة، وتحرير الألعاب
+"""
+
+import asyncio
+
+from message_pipeline import MessagePipeline, PRIORITY_HIGH, release_channel
+
+
+def recorder(gates=None):
+    """معالج يسجل البدء والانتهاء، وينتظر بوابة الرسالة إن وُجدت"""
+    log = []
+
+    async def handler(name):
+        log.append(('start', name))
+        gate = (gates or {}).get(name)
+        if gate is not None:
+            await gate.wait()
+        log.append(('end', name))
+
+    return handler, log
+
+
+def test_detached_handler_blocks_its_channel_only():
+    """رسائل القناة بعد معالج منفصل تنتظره بالترتيب، والقنوات الأخرى تكمل"""
+    async def run():
+        gate = asyncio.Event()
+        handler, log = recorder({'slow': gate})
+        pipeline = MessagePipeline(handler, workers=1, budget=0.01)
+        try:
+            pipeline.submit(1, PRIORITY_HIGH, 'slow')
+            pipeline.submit(1, PRIORITY_HIGH, 'after-1')
+            pipeline.submit(1, PRIORITY_HIGH, 'after-2')
+            pipeline.submit(2, PRIORITY_HIGH, 'other')
+            await pipeline.join()
+            await asyncio.sleep(0.01)
+            assert ('end', 'other') in log
+            assert ('start', 'after-1') not in log
+            assert pipeline.stats()['chained'] == 2
+
+            gate.set()
+            await asyncio.sleep(0.01)
+            order = [name for event, name in log if event == 'start' and name != 'other']
+            assert order == ['slow', 'after-1', 'after-2']
+            assert not pipeline._tails and not pipeline._detached
+        finally:
+            await pipeline.close()
+
+    asyncio.run(run())
+
+
+def test_worker_waits_when_detached_set_is_full():
+    async def run():
+        gates = {name: asyncio.Event() for name in ('a', 'b')}
+        handler, log = recorder(gates)
+        pipeline = MessagePipeline(handler, workers=1, budget=0.01, max_detached=1)
+        try:
+            pipeline.submit(1, PRIORITY_HIGH, 'a')
+            pipeline.submit(2, PRIORITY_HIGH, 'b')
+            pipeline.submit(3, PRIORITY_HIGH, 'c')
+            await asyncio.sleep(0.05)
+            # 'a' منفصل ويملأ الحد، فيبقى العامل مع 'b' ولا يبدأ 'c'
+            assert len(pipeline._detached) == 1
+            assert ('start', 'c') not in log
+
+            gates['a'].set()
+            await asyncio.sleep(0.05)
+            assert ('start', 'c') in log
+            assert len(pipeline._detached) == 1
+            gates['b'].set()
+            await asyncio.sleep(0.01)
+            assert pipeline.stats()['detached'] == 2
+            assert not pipeline._detached
+        finally:
+            await pipeline.close()
+
+    asyncio.run(run())
+
+
+def test_released_handler_frees_channel_and_slot():
+    """لعبة تحرر قناتها فلا تنتظرها رسائل القناة ولا تشغل مكاناً بين المنفصلة"""
+    async def run():
+        game_over = asyncio.Event()
+        log = []
+
+        async def handler(name):
+            log.append(name)
+            if name == 'game':
+                release_channel()
+                await game_over.wait()
+
+        pipeline = MessagePipeline(handler, workers=1, budget=5, max_detached=1)
+        try:
+            pipeline.submit(1, PRIORITY_HIGH, 'game')
+            pipeline.submit(1, PRIORITY_HIGH, 'chat')
+            await asyncio.wait_for(pipeline.join(), 1)
+            assert log == ['game', 'chat']
+            stats = pipeline.stats()
+            assert stats['released'] == 1 and stats['running_released'] == 1
+            assert stats['detached'] == 0 and not pipeline._tails
+        finally:
+            await pipeline.close()
+        assert not pipeline._released
+
+    asyncio.run(run())
+
+
+def test_release_after_detach_unblocks_waiting_messages():
+    async def run():
+        opened = asyncio.Event()
+        log = []
+
+        async def handler(name):
+            log.append(name)
+            if name == 'game':
+                await opened.wait()
+                release_channel()
+                await asyncio.sleep(10)
+
+        pipeline = MessagePipeline(handler, workers=1, budget=0.01)
+        try:
+            pipeline.submit(1, PRIORITY_HIGH, 'game')
+            pipeline.submit(1, PRIORITY_HIGH, 'chat')
+            await pipeline.join()
+            await asyncio.sleep(0)
+            assert log == ['game']
+            opened.set()
+            await asyncio.sleep(0.01)
+            assert log == ['game', 'chat']
+            assert not pipeline._detached and len(pipeline._released) == 1
+        finally:
+            await pipeline.close()
+
+    asyncio.run(run())
+
+
+def test_release_channel_outside_pipeline_is_noop():
+    release_channel()
+
+
+def test_pipeline_releases_only_its_own_handlers():
+    """bot.pipeline.release_channel يحرر معالج هذا الطابور فقط"""
+    async def run():
+        game_over = asyncio.Event()
+        log = []
+        other = MessagePipeline(lambda name: None, workers=1)
+
+        async def handler(name):
+            log.append(name)
+            if name == 'game':
+                other.release_channel()
+                assert not pipeline._released
+                pipeline.release_channel()
+                await game_over.wait()
+
+        pipeline = MessagePipeline(handler, workers=1, budget=5)
+        try:
+            pipeline.submit(1, PRIORITY_HIGH, 'game')
+            pipeline.submit(1, PRIORITY_HIGH, 'chat')
+            await asyncio.wait_for(pipeline.join(), 1)
+            assert log == ['game', 'chat'] and len(pipeline._released) == 1
+        finally:
+            game_over.set()
+            await pipeline.close()
+            await other.close()
+
+    asyncio.run(run())
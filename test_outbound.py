@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات جدولة الرسائل الصادرة بساعة وقناة وهميتين
+"""
+
+import asyncio
+
+import pytest
+
+import outbound
+from outbound import OutboundScheduler
+
+
+class FakeChannel:
+    """قناة تسجل الرسائل المرسلة مع خياراتها"""
+
+    def __init__(self, channel_id=1):
+        self.id = channel_id
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append((content, kwargs))
+        return content
+
+
+def test_auto_reply_never_pings():
+    """رد مخصص يحوي @everyone أو إشارة رتبة يُرسل دون أي تنبيه"""
+    async def run():
+        scheduler = OutboundScheduler()
+        channel = FakeChannel()
+        await scheduler.send_auto_reply(channel, '@everyone <@&123> <@456>', key='custom:x')
+        content, kwargs = channel.sent[0]
+        mentions = kwargs['allowed_mentions']
+        assert not mentions.everyone and not mentions.roles and not mentions.users
+
+    asyncio.run(run())
+
+
+class FakeClock:
+    """ساعة يدوية، والنوم فيها يقدّمها دون انتظار فعلي"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_send_waits_for_token_when_bucket_empty(monkeypatch):
+    async def run():
+        clock = FakeClock()
+        monkeypatch.setattr(outbound.asyncio, 'sleep', clock.sleep)
+        scheduler = OutboundScheduler(rate=2.0, burst=2, clock=clock)
+        channel = FakeChannel()
+        for number in range(3):
+            await scheduler.send(channel, f'رسالة {number}')
+        # الدفعة تكفي رسالتين، والثالثة تنتظر نصف ثانية (رمز واحد بمعدل 2/ث)
+        assert clock.sleeps == [pytest.approx(0.5)]
+        assert [content for content, _ in channel.sent] == ['رسالة 0', 'رسالة 1', 'رسالة 2']
+        assert scheduler.queue_depth == 0
+
+        # قناة أخرى لها دلوها الخاص
+        await scheduler.send(FakeChannel(2), 'أخرى')
+        assert len(clock.sleeps) == 1
+
+    asyncio.run(run())
+
+
+def test_auto_replies_coalesced_then_dropped():
+    async def run():
+        clock = FakeClock()
+        scheduler = OutboundScheduler(rate=1.0, burst=2, reply_cooldown=2.0, clock=clock)
+        channel = FakeChannel()
+        assert await scheduler.send_auto_reply(channel, 'أهلاً', key='greetings') == 'أهلاً'
+        # الفئة نفسها داخل مهلة الدمج تُدمج ولا تستهلك رمزاً
+        assert await scheduler.send_auto_reply(channel, 'هلا', key='greetings') is None
+        assert await scheduler.send_auto_reply(channel, 'العفو', key='thanks') == 'العفو'
+        # الدلو فارغ: الرد التلقائي يُسقط بدل الانتظار
+        assert await scheduler.send_auto_reply(channel, 'صباح النور', key='good_morning') is None
+
+        clock.now += 2.5
+        assert await scheduler.send_auto_reply(channel, 'هلا', key='greetings') == 'هلا'
+        assert scheduler.stats() == {
+            'queue_depth': 0, 'sent': 3, 'dropped': 1, 'coalesced': 1, 'tracked_channels': 1
+        }
+        assert len(channel.sent) == 3
+
+    asyncio.run(run())
+
+
+def test_commands_are_never_dropped(monkeypatch):
+    """ردود الأوامر تنتظر حتى بعد أن تستنفد الردود التلقائية الدلو"""
+    async def run():
+        clock = FakeClock()
+        monkeypatch.setattr(outbound.asyncio, 'sleep', clock.sleep)
+        scheduler = OutboundScheduler(rate=1.0, burst=1, clock=clock)
+        channel = FakeChannel()
+        await scheduler.send_auto_reply(channel, 'أهلاً', key='greetings')
+        await scheduler.send(channel, 'رد الأمر')
+        assert clock.sleeps == [pytest.approx(1.0)]
+        assert scheduler.stats()['sent'] == 2 and scheduler.stats()['dropped'] == 0
+
+    asyncio.run(run())
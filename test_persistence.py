@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات الكتابة الذرية والحفظ المؤجل
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+import persistence
+from persistence import WriteBehind, atomic_write_json
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = tmp_path / 'state.json'
+    atomic_write_json(str(path), {'1': ['10']})
+    atomic_write_json(str(path), {'1': ['10', '11'], 'نص': 'عربي'})
+    assert json.loads(path.read_text(encoding='utf-8')) == {'1': ['10', '11'], 'نص': 'عربي'}
+    assert os.listdir(tmp_path) == ['state.json']
+
+
+def test_failed_atomic_write_keeps_old_file(tmp_path, monkeypatch):
+    """فشل الكتابة في منتصفها يترك الملف القديم سليماً ولا يترك ملفاً مؤقتاً"""
+    path = tmp_path / 'state.json'
+    atomic_write_json(str(path), {'old': True})
+
+    def broken_dump(data, f, **kwargs):
+        f.write('{"new": ')
+        raise OSError('القرص ممتلئ')
+
+    monkeypatch.setattr(persistence.json, 'dump', broken_dump)
+    with pytest.raises(OSError):
+        atomic_write_json(str(path), {'new': True})
+    monkeypatch.undo()
+    assert json.loads(path.read_text(encoding='utf-8')) == {'old': True}
+    assert os.listdir(tmp_path) == ['state.json']
+
+
+class Recorder:
+    """بيانات في الذاكرة مع سجل للكتابات"""
+
+    def __init__(self):
+        self.data = {}
+        self.writes = []
+
+    def snapshot(self, keys):
+        return {key: self.data[key] for key in keys}
+
+    def write(self, payload):
+        self.writes.append(payload)
+
+
+def test_changes_within_delay_coalesce_into_one_write():
+    async def run():
+        state = Recorder()
+        writer = WriteBehind(state.snapshot, state.write, delay=0.02)
+        for value in range(5):
+            state.data['a'] = value
+            writer.mark_dirty('a')
+            state.data['b'] = value
+            writer.mark_dirty('b')
+        assert writer.pending == 2
+        await asyncio.sleep(0.1)
+        # آخر القيم فقط، في كتابة واحدة
+        assert state.writes == [{'a': 4, 'b': 4}]
+        assert writer.flush_count == 1 and writer.pending == 0
+        await writer.close()
+        assert writer.flush_count == 1
+
+    asyncio.run(run())
+
+
+def test_flush_sync_writes_latest_state():
+    """خارج حلقة الأحداث يُحفظ كل تغيير فوراً، وداخلها يكتب flush_sync أحدث قيمة مرة واحدة"""
+    state = Recorder()
+    writer = WriteBehind(state.snapshot, state.write, delay=60)
+    state.data['a'] = 1
+    writer.mark_dirty('a')
+    state.data['a'] = 2
+    writer.mark_dirty('a')
+    assert state.writes == [{'a': 1}, {'a': 2}]
+
+    async def run():
+        state.data['a'] = 3
+        writer.mark_dirty('a')
+        state.data['a'] = 4
+        writer.mark_dirty('a')
+        writer.flush_sync()
+        assert state.writes[2:] == [{'a': 4}]
+        await writer.close()
+
+    asyncio.run(run())
+    assert len(state.writes) == 3
+
+
+def test_failed_write_requeues_keys():
+    async def run():
+        state = Recorder()
+        calls = []
+
+        def write(payload):
+            calls.append(payload)
+            if len(calls) == 1:
+                raise OSError('القرص غير متاح')
+            state.write(payload)
+
+        writer = WriteBehind(state.snapshot, write, delay=60)
+        state.data['a'] = 1
+        writer.mark_dirty('a')
+        await writer.flush()
+        assert state.writes == [] and writer.pending == 1
+        state.data['a'] = 2
+        await writer.close()
+        assert state.writes == [{'a': 2}]
+        assert writer.pending == 0
+
+    asyncio.run(run())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات جداول الأسماء المستعارة ودوران الردود
+"""
+
+import json
+
+import pytest
+
+from response_engine import ResponseEngine, ResponseTable, PACK_REPLIES, _build_alias
+
+
+@pytest.mark.parametrize('weights', [
+    [1, 2, 3, 4],
+    [10, 1],
+    [0.5, 0.25, 0.25],
+    [7, 7, 1, 1, 1, 30],
+])
+def test_alias_table_probabilities(weights):
+    """الاحتمال الفعلي لكل فهرس يساوي وزنه مقسوماً على مجموع الأوزان"""
+    prob, alias = _build_alias(weights)
+    count = len(weights)
+    total = sum(weights)
+    for index, weight in enumerate(weights):
+        # يُختار العمود بالتساوي، ثم العنصر نفسه باحتمال prob أو بديله بالباقي
+        actual = prob[index] + sum(1 - prob[column] for column in range(count) if alias[column] == index)
+        assert actual / count == pytest.approx(weight / total)
+
+
+def test_equal_weights_skip_alias():
+    assert not ResponseTable([('a', 1.0), ('b', 1.0)]).weighted
+    assert ResponseTable([('a', 1.0), ('b', 2.0)]).weighted
+
+
+def test_channel_rotation_exhausts_before_repeat(tmp_path):
+    """داخل القناة لا يتكرر الرد قبل استنفاد الفئة، ولا يبدأ الكيس التالي بآخر رد"""
+    engine = ResponseEngine(data_dir=str(tmp_path))
+    engine.add_pack('test', {'items': ['a', 'b', 'c', 'd']})
+    picks = [engine.pick('test', 'items', channel_id=1) for _ in range(12)]
+    for start in range(0, 12, 4):
+        assert sorted(picks[start:start + 4]) == ['a', 'b', 'c', 'd']
+    for previous, current in zip(picks, picks[1:]):
+        assert previous != current
+    assert engine.pick('test', 'missing', default='x') == 'x'
+
+
+def test_pack_keywords_only_from_reply_packs(tmp_path):
+    """كلمات حزمة غير الردود التلقائية لا تُضاف، فلا تطابق فئة بلا ردود"""
+    (tmp_path / 'a.json').write_text(json.dumps({
+        'pack': 'emotions', 'categories': {'joy': ['😊']}, 'keywords': {'joy': ['فرحان']}
+    }), encoding='utf-8')
+    (tmp_path / 'b.json').write_text(json.dumps({
+        'categories': {'sports': ['⚽']}, 'keywords': {'sports': ['كرة']}
+    }), encoding='utf-8')
+    engine = ResponseEngine(data_dir=str(tmp_path))
+    assert engine.keywords == {'sports': ['كرة']}
+    assert engine.pick('emotions', 'joy') == '😊'
+    assert engine.pick(PACK_REPLIES, 'sports') == '⚽'
+    assert engine.pick(PACK_REPLIES, 'joy') is None
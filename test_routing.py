@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات تصنيف الرسائل في route_message قبل الطابور
+"""
+
+import pytest
+
+from game_sessions import GameSessionRouter
+from test_arabic_text import make_message
+
+
+@pytest.fixture
+def bot_module(tmp_path, monkeypatch):
+    """وحدة البوت مع جولة مفتوحة في القناة 5 إجابتها "بحر" وتسجل كل ما يصلها"""
+    monkeypatch.chdir(tmp_path)
+    import bot
+    router = GameSessionRouter()
+    claimed = []
+
+    def check(message):
+        claimed.append(message.content)
+        return message.content == 'بحر'
+
+    router.open_round(5, check)
+    monkeypatch.setattr(bot, 'game_router', router)
+    bot.claimed = claimed
+    return bot
+
+
+@pytest.mark.parametrize('content, author_bot, channel_id, route, reaches_router', [
+    ('!مرحبا', False, 5, 'ROUTE_COMMAND', False),
+    ('!لعبة كلمة', False, 5, 'ROUTE_COMMAND', False),
+    ('!مرحبا', True, 5, 'ROUTE_IGNORE', False),
+    ('بحر', False, 5, 'ROUTE_GAME', True),
+    ('', False, 6, 'ROUTE_IGNORE', False),
+    ('مرحبا بكم', False, 6, 'ROUTE_AUTO_REPLY', False),
+    ('مرحبا من بوت', True, 6, 'ROUTE_AUTO_REPLY', False),
+])
+def test_route_message(bot_module, content, author_bot, channel_id, route, reaches_router):
+    """الأوامر لا تصل أبداً لجلسات الألعاب، وإجابات الجولات لا تصل للردود التلقائية"""
+    message = make_message(content, channel_id=channel_id, bot=author_bot)
+    assert bot_module.route_message(message) is getattr(bot_module, route)
+    assert bot_module.claimed == ([content] if reaches_router else [])
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+اختبارات قراءة إعدادات الشظايا من البيئة
+"""
+
+import pytest
+
+from sharding import parse_shard_ids, shard_options
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('0', [0]),
+    ('0-3', [0, 1, 2, 3]),
+    ('0-3,7', [0, 1, 2, 3, 7]),
+    (' 4 , 1-2 ,', [1, 2, 4]),
+    ('2-3,3,1-2', [1, 2, 3]),
+    ('5-3', []),
+    ('', []),
+])
+def test_parse_shard_ids(text, expected):
+    assert parse_shard_ids(text) == expected
+
+
+@pytest.mark.parametrize('text', ['a', '1-b', '-1', '1,,x'])
+def test_parse_shard_ids_rejects_garbage(text):
+    with pytest.raises(ValueError):
+        parse_shard_ids(text)
+
+
+@pytest.mark.parametrize('count, ids, expected', [
+    ('', '', None),
+    ('  ', '', None),
+    ('auto', '', {}),
+    ('AUTO', '', {}),
+    ('4', '', {'shard_count': 4}),
+    ('8', '0-3,7', {'shard_count': 8, 'shard_ids': [0, 1, 2, 3, 7]}),
+])
+def test_shard_options(monkeypatch, count, ids, expected):
+    monkeypatch.setenv('SHARD_COUNT', count)
+    monkeypatch.setenv('SHARD_IDS', ids)
+    assert shard_options() == expected
+
+
+@pytest.mark.parametrize('count, ids', [
+    ('', '0-1'),
+    ('auto', '0'),
+    ('4', '2-4'),
+    ('4', ','),
+    ('4', '3-1'),
+    ('0', ''),
+    ('-2', ''),
+    ('four', ''),
+])
+def test_shard_options_rejects_invalid(monkeypatch, count, ids):
+    monkeypatch.setenv('SHARD_COUNT', count)
+    monkeypatch.setenv('SHARD_IDS', ids)
+    with pytest.raises(ValueError):
+        shard_options()